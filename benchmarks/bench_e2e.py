@@ -0,0 +1,115 @@
+# ============================================================================
+# ARQUIVO: benchmarks/bench_e2e.py
+# Benchmark ponta a ponta do processar: linhas/s, MB/s e pico de memória
+# Uso: python -m benchmarks.bench_e2e [--linhas 10000 1000000 10000000]
+#      [--modos serial bytes paralelo] [--largura 8]
+# Cada execução roda em um processo novo para medir o pico de RSS isolado.
+# ============================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.gerador import MIX_COLUNAS, gerar_arquivo
+from benchmarks.resultados import PASTA_RESULTADOS, salvar
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+LINHAS_PADRAO = (10_000, 1_000_000, 10_000_000)
+MODOS = {
+    "serial": {},
+    "bytes": {"modo_bytes": True},
+    "paralelo": {"workers": None},
+}
+
+
+def _pico_rss_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _executar(caminho, modo):
+    """Roda no processo filho: processa o arquivo e imprime a medição em JSON."""
+    from features.anonymizer.pipeline import processar
+
+    layout = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": "|"}
+    saida = caminho + f".{modo}.out"
+    t = time.perf_counter()
+    _, _, estatisticas = processar(caminho, os.path.basename(caminho), layout, caminho_saida=saida, **MODOS[modo])
+    tempo = time.perf_counter() - t
+    os.remove(saida)
+    print(json.dumps({"tempo_s": tempo, "pico_rss_mb": _pico_rss_mb(), "fases_s": estatisticas.fases,
+                      "tempo_tipo_s": estatisticas.medidas["tempo_tipo"]}))
+
+
+def _arquivo_dados(linhas, largura):
+    """Arquivo sintético reaproveitado entre execuções (gerar 10M linhas demora)."""
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+    caminho = os.path.join(PASTA_RESULTADOS, f"dados_{linhas}x{largura}.txt")
+    if not os.path.exists(caminho):
+        print(f"🔧 Gerando {linhas:,} linhas...")
+        gerar_arquivo(caminho, linhas, largura)
+    return caminho
+
+
+def medir(linhas, largura, modo):
+    caminho = _arquivo_dados(linhas, largura)
+    filho = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_e2e", "--executar", caminho, modo],
+        capture_output=True, text=True, check=True,
+    )
+    resultado = json.loads(filho.stdout.strip().splitlines()[-1])
+    megabytes = os.path.getsize(caminho) / (1024 * 1024)
+    tempo = resultado["tempo_s"]
+    return {
+        "nome": f"processar[{modo}, {linhas} linhas x {largura}]",
+        "metrica_principal": "linhas_por_s",
+        "modo": modo,
+        "linhas": linhas,
+        "largura": largura,
+        "megabytes": megabytes,
+        "tempo_s": tempo,
+        "linhas_por_s": linhas / tempo,
+        "mb_por_s": megabytes / tempo,
+        "pico_rss_mb": resultado["pico_rss_mb"],
+        "fases_s": resultado["fases_s"],
+        "tempo_tipo_s": resultado["tempo_tipo_s"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do processar.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=LINHAS_PADRAO)
+    parser.add_argument("--largura", type=int, default=len(MIX_COLUNAS))
+    parser.add_argument("--modos", nargs="+", choices=tuple(MODOS), default=tuple(MODOS))
+    parser.add_argument("--sem-salvar", action="store_true", help="não grava o JSON de resultados")
+    parser.add_argument("--executar", nargs=2, metavar=("ARQUIVO", "MODO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar:
+        _executar(*args.executar)
+        return
+
+    medicoes = []
+    for linhas in args.linhas:
+        for modo in args.modos:
+            m = medir(linhas, args.largura, modo)
+            medicoes.append(m)
+            rss = f"{m['pico_rss_mb']:.0f} MB" if m["pico_rss_mb"] is not None else "-"
+            print(f"{m['nome']:<44}{m['linhas_por_s']:>12,.0f} linhas/s{m['mb_por_s']:>8.1f} MB/s  pico {rss}")
+
+    if not args.sem_salvar:
+        print(f"💾 Resultados: {salvar('e2e', medicoes)}")
+
+
+if __name__ == "__main__":
+    main()
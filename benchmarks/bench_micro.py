@@ -0,0 +1,78 @@
+# ============================================================================
+# ARQUIVO: benchmarks/bench_micro.py
+# Micro-benchmarks: anonimizar/anonimizar_lote por tipo e detectar_tipos
+# Uso: python -m benchmarks.bench_micro [--valores N] [--sem-salvar]
+# ============================================================================
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.gerador import GERADORES, MIX_COLUNAS, gerar_arquivo, gerar_valores
+from benchmarks.resultados import salvar
+from features.anonymizer.anonymizer_core import anonimizar, anonimizar_lote, resetar_cache
+from features.anonymizer.column_detector import detectar_tipos
+
+REPETICOES = 3
+
+
+def _melhor_tempo(func):
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        resetar_cache()
+        t = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t)
+    return melhor
+
+
+def medir_anonimizar(n):
+    medicoes = []
+    for tipo in GERADORES:
+        valores = gerar_valores(tipo, n)
+        escalar = _melhor_tempo(lambda: [anonimizar(v, tipo, usar_cache=False) for v in valores])
+        lote = _melhor_tempo(lambda: anonimizar_lote(valores, tipo))
+        medicoes.append({"nome": f"anonimizar[{tipo}]", "metrica_principal": "valores_por_s",
+                         "valores": n, "valores_por_s": n / escalar})
+        medicoes.append({"nome": f"anonimizar_lote[{tipo}]", "metrica_principal": "valores_por_s",
+                         "valores": n, "valores_por_s": n / lote})
+    return medicoes
+
+
+def medir_detectar_tipos(linhas, caminho_tmp):
+    gerar_arquivo(caminho_tmp, linhas)
+    with open(caminho_tmp, "r", encoding="utf-8") as f:
+        amostra = [l.strip() for l in f][1:]
+    tempo = _melhor_tempo(lambda: detectar_tipos(amostra, "|"))
+    tipos = detectar_tipos(amostra, "|")
+    acertos = sum(tipos.get(i) == c for i, c in enumerate(MIX_COLUNAS))
+    return [{"nome": f"detectar_tipos[{linhas} linhas]", "metrica_principal": "linhas_por_s",
+             "linhas": linhas, "linhas_por_s": linhas / tempo,
+             "colunas_corretas": acertos, "colunas": len(MIX_COLUNAS)}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks do anonimizador.")
+    parser.add_argument("--valores", type=int, default=50_000, help="valores por tipo")
+    parser.add_argument("--sem-salvar", action="store_true", help="não grava o JSON de resultados")
+    args = parser.parse_args()
+
+    medicoes = medir_anonimizar(args.valores)
+    fd, caminho_tmp = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        medicoes += medir_detectar_tipos(200, caminho_tmp)
+        medicoes += medir_detectar_tipos(10_000, caminho_tmp)
+    finally:
+        os.remove(caminho_tmp)
+
+    for m in medicoes:
+        chave = m["metrica_principal"]
+        print(f"{m['nome']:<36}{m[chave]:>14,.0f} {chave.replace('_', ' ')}")
+    if not args.sem_salvar:
+        print(f"💾 Resultados: {salvar('micro', medicoes)}")
+
+
+if __name__ == "__main__":
+    main()
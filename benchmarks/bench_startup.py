@@ -0,0 +1,70 @@
+# ============================================================================
+# ARQUIVO: benchmarks/bench_startup.py
+# Tempo de inicialização da linha de comando (orçamento verificado)
+# Uso: python -m benchmarks.bench_startup
+# Sai com código 1 se o orçamento for estourado ou se a GUI for importada.
+# ============================================================================
+
+import subprocess
+import sys
+import time
+
+# Orçamento de inicialização, em segundos (mediana das execuções)
+ORCAMENTO_CLI_S = 1.0
+REPETICOES = 5
+
+# Módulos que a linha de comando nunca deve carregar
+_MODULOS_GUI = ("flet", "tkinter")
+
+_SONDA = (
+    "import contextlib, io, runpy, sys\n"
+    "sys.argv = ['features.anonymizer', '--help']\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    try:\n"
+    "        runpy.run_module('features.anonymizer', run_name='__main__')\n"
+    "    except SystemExit:\n"
+    "        pass\n"
+    "import features.anonymizer.pipeline\n"
+    "print(','.join(m for m in {gui!r} if m in sys.modules))\n"
+)
+
+
+def _medir(comando):
+    tempos = []
+    for _ in range(REPETICOES):
+        t = time.perf_counter()
+        subprocess.run(comando, check=True, capture_output=True)
+        tempos.append(time.perf_counter() - t)
+    return sorted(tempos)[len(tempos) // 2]
+
+
+def main():
+    ok = True
+
+    tempo_base = _medir([sys.executable, "-c", "pass"])
+    tempo_help = _medir([sys.executable, "-m", "features.anonymizer", "--help"])
+    tempo_pipeline = _medir([sys.executable, "-c", "import features.anonymizer.pipeline"])
+
+    print(f"interpretador vazio        {tempo_base * 1000:8.1f} ms")
+    print(f"--help                     {tempo_help * 1000:8.1f} ms")
+    print(f"import do pipeline         {tempo_pipeline * 1000:8.1f} ms")
+
+    for nome, tempo in (("--help", tempo_help), ("pipeline", tempo_pipeline)):
+        if tempo > ORCAMENTO_CLI_S:
+            print(f"❌ {nome} acima do orçamento de {ORCAMENTO_CLI_S:.1f} s")
+            ok = False
+
+    sonda = subprocess.run([sys.executable, "-c", _SONDA.format(gui=_MODULOS_GUI)],
+                           check=True, capture_output=True, text=True)
+    gui = sonda.stdout.strip()
+    if gui:
+        print(f"❌ Módulos de interface importados pela linha de comando: {gui}")
+        ok = False
+
+    if ok:
+        print("✅ Inicialização dentro do orçamento")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# ============================================================================
+# ARQUIVO: benchmarks/bench_tokenizer.py
+# Compara str.split, csv.reader e core.tokenizer nos formatos que recebemos
+# Uso: python -m benchmarks.bench_tokenizer [linhas]
+# ============================================================================
+
+import csv
+import random
+import sys
+import time
+
+from core.tokenizer import iter_records, split_record
+
+SEP = ";"
+REPETICOES = 3
+
+
+def _linha(rng, i, modo):
+    campos = [f"Fulano {i} da Silva", f"{rng.randint(10**10, 10**11 - 1)}",
+              "01/02/2023", f"{rng.randint(1, 9999)},{rng.randint(10, 99)}", "SP"]
+    if modo == "algumas_aspas" and i % 10 == 0:
+        campos[0] = '"Silva; Fulano"'
+    elif modo == "todas_aspas":
+        campos = [f'"{c}"' for c in campos]
+    elif modo == "multilinha" and i % 10 == 0:
+        campos[0] = '"Fulano\nda Silva"'
+    return SEP.join(campos) + "\n"
+
+
+def gerar(n, modo):
+    rng = random.Random(42)
+    texto = "".join(_linha(rng, i, modo) for i in range(n))
+    return texto.splitlines(keepends=True)
+
+
+def _split(linhas):
+    return [l.strip().split(SEP) for l in linhas]
+
+
+def _csv(linhas):
+    return list(csv.reader(linhas, delimiter=SEP))
+
+
+def _tokenizer(linhas):
+    return [split_record(texto, SEP)[0] for _, _, texto in iter_records(linhas, SEP)]
+
+
+def _medir(func, linhas):
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        t = time.perf_counter()
+        func(linhas)
+        melhor = min(melhor, time.perf_counter() - t)
+    return melhor
+
+
+def main(n=200_000):
+    print(f"{'formato':<16}{'str.split':>12}{'csv.reader':>12}{'tokenizer':>12}  (linhas/s)")
+    for modo in ("sem_aspas", "algumas_aspas", "todas_aspas", "multilinha"):
+        linhas = gerar(n, modo)
+        taxas = [n / _medir(f, linhas) for f in (_split, _csv, _tokenizer)]
+        print(f"{modo:<16}" + "".join(f"{t:>12,.0f}" for t in taxas))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,138 @@
+# ============================================================================
+# ARQUIVO: benchmarks/gerador.py
+# Gerador determinístico de arquivos delimitados com PII brasileira sintética
+# Uso: python -m benchmarks.gerador SAIDA LINHAS [--largura N] [--sep "|"]
+# ============================================================================
+
+import argparse
+import random
+
+from features.validator.validador import PESOS_CNPJ, PESOS_CPF, digito_verificador
+
+# Ordem das colunas: o mesmo mix dos arquivos reais que processamos.
+# Larguras maiores repetem o ciclo; menores usam só as primeiras.
+MIX_COLUNAS = ("pessoa", "cpf", "email", "data", "valor", "uf", "empresa", "cnpj")
+
+# Linhas geradas por escrita (o arquivo nunca fica inteiro na memória)
+LINHAS_POR_ESCRITA = 20_000
+
+_NOMES = ("Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Fernando", "Gabriela", "Henrique",
+          "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+          "Sofia", "Thiago", "Vitória", "Wagner")
+_SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+               "Pereira", "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo")
+_PALAVRAS_EMPRESA = ("Alfa", "Brasil", "Comercial", "Distribuidora", "Engenharia", "Futura",
+                     "Global", "Horizonte", "Industrial", "Logística", "Nacional", "Serviços")
+_SUFIXOS_EMPRESA = ("LTDA", "S.A", "EIRELI", "ME")
+_DOMINIOS = ("gmail.com", "hotmail.com", "yahoo.com.br", "uol.com.br", "empresa.com.br")
+_UFS = ("AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS", "MG", "PA",
+        "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO")
+
+
+def _com_verificadores(rng, pesos):
+    """
+    Base sorteada mais os dois dígitos verificadores: CPFs e CNPJs gerados
+    passam no validador, como os de um arquivo real.
+    """
+    tamanho = len(pesos[0])
+    while True:
+        digitos = [int(c) for c in f"{rng.randrange(10 ** tamanho):0{tamanho}d}"]
+        if len(set(digitos)) > 1:  # Todos iguais: inválido mesmo com os verificadores certos
+            break
+    for p in pesos:
+        digitos.append(digito_verificador(digitos, p))
+    return "".join(map(str, digitos))
+
+
+def _cpf(rng):
+    s = _com_verificadores(rng, PESOS_CPF)
+    return f"{s[:3]}.{s[3:6]}.{s[6:9]}-{s[9:]}"
+
+
+def _cnpj(rng):
+    s = _com_verificadores(rng, PESOS_CNPJ)
+    return f"{s[:2]}.{s[2:5]}.{s[5:8]}/{s[8:12]}-{s[12:]}"
+
+
+def _pessoa(rng):
+    return f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)} {rng.choice(_SOBRENOMES)}"
+
+
+def _email(rng):
+    return f"{rng.choice(_NOMES).lower()}.{rng.choice(_SOBRENOMES).lower()}{rng.randrange(1000)}@{rng.choice(_DOMINIOS)}"
+
+
+def _data(rng):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1950, 2024)}"
+
+
+def _valor(rng):
+    return f"{rng.randrange(100000)},{rng.randrange(100):02d}"
+
+
+def _uf(rng):
+    return rng.choice(_UFS)
+
+
+def _empresa(rng):
+    return f"{rng.choice(_PALAVRAS_EMPRESA)} {rng.choice(_PALAVRAS_EMPRESA)} {rng.choice(_SUFIXOS_EMPRESA)}"
+
+
+GERADORES = {
+    "pessoa": _pessoa,
+    "cpf": _cpf,
+    "cnpj": _cnpj,
+    "email": _email,
+    "data": _data,
+    "valor": _valor,
+    "uf": _uf,
+    "empresa": _empresa,
+}
+
+
+def colunas_para(largura):
+    """Tipos das colunas de um arquivo com 'largura' colunas."""
+    return [MIX_COLUNAS[i % len(MIX_COLUNAS)] for i in range(largura)]
+
+
+def gerar_valores(tipo, n, semente=42):
+    """n valores sintéticos de um tipo (para os micro-benchmarks)."""
+    rng = random.Random(f"{semente}:{tipo}")
+    gerar = GERADORES[tipo]
+    return [gerar(rng) for _ in range(n)]
+
+
+def gerar_arquivo(caminho, linhas, largura=len(MIX_COLUNAS), sep="|", semente=42, encoding="utf-8"):
+    """
+    Grava um arquivo com uma linha de cabeçalho seguida de 'linhas' linhas
+    de dados. A mesma semente sempre produz o mesmo arquivo.
+    Retorna os tipos esperados de cada coluna.
+    """
+    rng = random.Random(semente)
+    colunas = colunas_para(largura)
+    geradores = [GERADORES[c] for c in colunas]
+    cabecalho = [f"{c.upper()}_{i}" for i, c in enumerate(colunas)]
+
+    with open(caminho, "w", encoding=encoding, newline="\n") as f:
+        f.write(sep.join(cabecalho) + "\n")
+        restantes = linhas
+        while restantes > 0:
+            n = min(restantes, LINHAS_POR_ESCRITA)
+            f.write("".join(sep.join([g(rng) for g in geradores]) + "\n" for _ in range(n)))
+            restantes -= n
+    return colunas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um arquivo delimitado com PII sintética.")
+    parser.add_argument("saida")
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("--largura", type=int, default=len(MIX_COLUNAS))
+    parser.add_argument("--sep", default="|")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+    gerar_arquivo(args.saida, args.linhas, args.largura, args.sep, args.semente)
+
+
+if __name__ == "__main__":
+    main()
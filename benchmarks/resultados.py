@@ -0,0 +1,82 @@
+# ============================================================================
+# ARQUIVO: benchmarks/resultados.py
+# Gravação e comparação dos resultados dos benchmarks (JSON)
+# Uso: python -m benchmarks.resultados ANTES.json DEPOIS.json
+# ============================================================================
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+# Pasta padrão dos resultados (fora do controle de versão)
+PASTA_RESULTADOS = os.path.join(os.getcwd(), "saida", "benchmarks")
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ambiente():
+    """Dados da máquina e da versão do código, gravados junto com as medições."""
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def salvar(nome, medicoes, pasta=None):
+    """Grava {'ambiente': ..., 'medicoes': [...]} em <pasta>/<nome>_<data>.json."""
+    pasta = pasta or PASTA_RESULTADOS
+    os.makedirs(pasta, exist_ok=True)
+    dados = {"benchmark": nome, "ambiente": ambiente(), "medicoes": medicoes}
+    caminho = os.path.join(pasta, f"{nome}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def carregar(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def comparar(antes, depois, metrica=None):
+    """
+    Casa as medições pelo campo 'nome' e retorna
+    [(nome, métrica, valor_antes, valor_depois, variação), ...].
+    """
+    antigas = {m["nome"]: m for m in antes["medicoes"]}
+    linhas = []
+    for m in depois["medicoes"]:
+        anterior = antigas.get(m["nome"])
+        if anterior is None:
+            continue
+        chave = metrica or m.get("metrica_principal")
+        a, d = anterior.get(chave), m.get(chave)
+        if a and d is not None:
+            linhas.append((m["nome"], chave, a, d, d / a - 1))
+    return linhas
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Uso: python -m benchmarks.resultados ANTES.json DEPOIS.json")
+        return 2
+    antes, depois = carregar(sys.argv[1]), carregar(sys.argv[2])
+    for nome, metrica, a, d, variacao in comparar(antes, depois):
+        print(f"{nome:<40}{metrica:>18}{a:>16,.1f}{d:>16,.1f}{variacao:>+9.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
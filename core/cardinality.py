@@ -0,0 +1,61 @@
+# ============================================================================
+# ARQUIVO: core/cardinality.py
+# Estimativa de valores distintos (HyperLogLog) em memória fixa
+# ============================================================================
+
+import hashlib
+import math
+
+# Precisão padrão: 2**12 registradores (4 KB, erro típico de ~1,6%)
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value):
+    """Hash de 64 bits estável entre processos (hash() de str muda a cada execução)."""
+    if isinstance(value, str):
+        value = value.encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Contador aproximado de valores distintos (str ou bytes) em fluxo: cada
+    valor passa uma vez por add() e a memória não cresce com o volume.
+    Contadores com a mesma precisão podem ser somados com merge() (ex.: um
+    por processo). Para poucos valores a estimativa é praticamente exata.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precisão fora de 4..16: {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        x = _hash64(value)
+        bits = 64 - self.precision
+        index = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLog com precisões diferentes")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # Poucos valores: contagem linear
+        return raw
+
+    def __len__(self):
+        return int(round(self.estimate()))
@@ -0,0 +1,255 @@
+# ============================================================================
+# ARQUIVO: core/compression.py
+# Leitura e escrita transparentes de arquivos comprimidos (gzip, bz2, xz, zstd)
+# ============================================================================
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # Sem zstandard os arquivos .zst não são aceitos
+    zstandard = None
+
+# Extensão -> formato
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+# Formato -> extensão usada em arquivos novos
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
+# Assinaturas (magic bytes) no início de cada formato
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+_MAGIC_SIZE = max(len(magic) for magic, _ in _MAGIC)
+
+# Bytes de entrada comprimidos por vez em cada thread da escrita paralela
+COMPRESSION_CHUNK_SIZE = 4 * 1024 * 1024
+# Nível padrão de cada formato (equilíbrio entre velocidade e tamanho)
+_DEFAULT_LEVELS = {"gzip": 6, "bz2": 9, "xz": 6, "zstd": 3}
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("O pacote 'zstandard' é necessário para arquivos .zst (pip install zstandard).")
+
+
+def compression_from_name(path):
+    """Formato indicado pela extensão do arquivo (None se não for comprimido)."""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def detect_compression(path):
+    """
+    Formato de compressão do arquivo, pelos magic bytes (que valem mais que
+    a extensão) ou, para arquivos vazios/inexistentes, pela extensão.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_MAGIC_SIZE)
+    except OSError:
+        head = b""
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None if head else compression_from_name(path)
+
+
+def strip_compression_suffix(path):
+    """'dados.csv.gz' -> 'dados.csv' (outros nomes voltam sem mudança)."""
+    base, ext = os.path.splitext(path)
+    return base if ext.lower() in COMPRESSION_EXTENSIONS else path
+
+
+def wrap_reader(fileobj, codec):
+    """
+    Leitor binário que descomprime 'fileobj' em streaming. Fechar o leitor
+    não fecha 'fileobj' (quem o abriu pode consultar fileobj.tell() para
+    saber quantos bytes comprimidos já foram lidos).
+    """
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if codec == "bz2":
+        return bz2.BZ2File(fileobj, mode="rb")
+    if codec == "xz":
+        return lzma.LZMAFile(fileobj, mode="rb")
+    if codec == "zstd":
+        _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True, closefd=False)
+        return io.BufferedReader(reader)
+    raise ValueError(f"Formato de compressão desconhecido: {codec}")
+
+
+def open_input(path, mode="rb", encoding=None, errors=None):
+    """
+    Abre um arquivo para leitura descomprimindo se preciso (pelos magic bytes).
+    mode "rb" retorna bytes; "r"/"rt" retorna texto com 'encoding'.
+    """
+    codec = detect_compression(path)
+    if codec is None:
+        if "b" in mode:
+            return open(path, "rb")
+        return open(path, "r", encoding=encoding, errors=errors)
+
+    if codec == "zstd":
+        _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        reader = io.BufferedReader(reader)
+    else:
+        reader = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}[codec](path, "rb")
+    if "b" in mode:
+        return reader
+    return io.TextIOWrapper(reader, encoding=encoding, errors=errors)
+
+
+def _compress_function(codec, level):
+    """Função que comprime um pedaço inteiro em um membro independente."""
+    if codec == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "bz2":
+        return lambda data: bz2.compress(data, level)
+    if codec == "xz":
+        return lambda data: lzma.compress(data, preset=level)
+    raise ValueError(f"Formato de compressão desconhecido: {codec}")
+
+
+class ParallelMemberWriter(io.RawIOBase):
+    """
+    Escrita comprimida em várias threads: a entrada é cortada em pedaços
+    de COMPRESSION_CHUNK_SIZE e cada um vira um membro (gzip/bz2/xz)
+    independente, gravado na ordem original. Os três formatos aceitam
+    membros concatenados, e zlib/bz2/lzma liberam o GIL enquanto comprimem.
+    """
+
+    def __init__(self, fileobj, codec, threads=None, level=None, chunk_size=COMPRESSION_CHUNK_SIZE):
+        super().__init__()
+        self._file = fileobj
+        self._compress = _compress_function(codec, _DEFAULT_LEVELS[codec] if level is None else level)
+        self._threads = threads or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._threads)
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._written += len(data)
+        while len(self._buffer) >= self._chunk_size:
+            chunk = bytes(self._buffer[:self._chunk_size])
+            del self._buffer[:self._chunk_size]
+            self._submit(chunk)
+        return len(data)
+
+    def _submit(self, chunk):
+        self._pending.append(self._executor.submit(self._compress, chunk))
+        # Janela limitada: no máximo 2 pedaços por thread aguardando gravação
+        while len(self._pending) > self._threads * 2 or (self._pending and self._pending[0].done()):
+            self._file.write(self._pending.popleft().result())
+
+    def tell(self):
+        """Bytes descomprimidos recebidos até agora."""
+        return self._written
+
+    def flush(self):
+        """Comprime o que estiver no buffer e grava todos os membros pendentes."""
+        if self.closed or self._file.closed:
+            return
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._file.write(self._pending.popleft().result())
+        self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._file.close()
+            super().close()
+
+
+class _ZstdWriter(io.RawIOBase):
+    """Escrita zstd com as threads do próprio zstandard."""
+
+    def __init__(self, fileobj, threads=None, level=None):
+        super().__init__()
+        _require_zstandard()
+        compressor = zstandard.ZstdCompressor(level=_DEFAULT_LEVELS["zstd"] if level is None else level,
+                                              threads=threads or -1)
+        self._file = fileobj
+        self._writer = compressor.stream_writer(fileobj, closefd=False)
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._writer.write(data)
+        self._written += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._written
+
+    def flush(self):
+        if not (self.closed or self._file.closed):
+            self._writer.flush(zstandard.FLUSH_FRAME)
+            self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._writer.close()
+        finally:
+            self._file.close()
+            super().close()
+
+
+def open_output(path, codec=None, threads=None, level=None, fileobj=None):
+    """
+    Abre 'path' para escrita binária comprimindo com 'codec'
+    (None = sem compressão). gzip, bz2 e xz usam ParallelMemberWriter;
+    zstd usa as threads do zstandard. 'threads' None = todos os núcleos.
+    fileobj: arquivo binário já aberto, usado no lugar de 'path' (e
+    fechado junto com o retornado).
+    """
+    if fileobj is None:
+        fileobj = open(path, "wb")
+    if codec is None:
+        return fileobj
+    try:
+        if codec == "zstd":
+            return _ZstdWriter(fileobj, threads, level)
+        return ParallelMemberWriter(fileobj, codec, threads, level)
+    except BaseException:
+        fileobj.close()
+        raise
@@ -3,50 +3,266 @@
 # Utilitários compartilhados para manipulação de arquivos
 # ============================================================================
 
-import chardet
+import codecs
+import os
+import re
+from itertools import islice
 
+from core.compression import detect_compression, open_input
 
-def detect_encoding(file_path):
-    """Detecta o encoding do arquivo lendo os primeiros bytes."""
-    with open(file_path, 'rb') as f:
-        rawdata = f.read(10000)
+# Bytes analisados na detecção rápida de encoding
+ENCODING_SAMPLE_SIZE = 10000
+# Tamanho dos blocos lidos no modo de detecção do arquivo inteiro
+ENCODING_CHUNK_SIZE = 1024 * 1024
+
+# Extensões tratadas como planilha Excel (e não como texto delimitado)
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+# Primeiro byte fora do ASCII
+_NAO_ASCII = re.compile(rb"[\x80-\xff]")
+
+# Cache de encodings: (caminho, tamanho, mtime, arquivo_inteiro) -> encoding
+_ENCODING_CACHE = {}
+
+
+def _file_key(file_path):
+    """Identifica a versão atual do arquivo (muda se ele for alterado)."""
+    st = os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+
+def _chardet_detect(rawdata):
+    """Executa o chardet (importado só quando realmente necessário)."""
+    import chardet
     result = chardet.detect(rawdata)
     return result['encoding'] or 'utf-8'
 
 
+def _detect_sample(file_path):
+    """Detecção pelos primeiros bytes, com atalho para ASCII/UTF-8."""
+    with open_input(file_path) as f:
+        rawdata = f.read(ENCODING_SAMPLE_SIZE)
+    return detect_encoding_bytes(rawdata)
+
+
+def detect_encoding_bytes(rawdata):
+    """
+    Detecta o encoding a partir de um trecho inicial já lido (por exemplo,
+    o começo de um fluxo descomprimido), com atalho para ASCII/UTF-8.
+    """
+    if rawdata.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if rawdata.isascii():
+        return 'utf-8'
+    try:
+        # final=False: um caractere cortado no fim da amostra não invalida
+        codecs.getincrementaldecoder('utf-8')().decode(rawdata, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return _chardet_detect(rawdata)
+
+
+def sample_is_ascii(file_path):
+    """
+    True se os bytes da detecção rápida são todos ASCII: nesse caso a
+    amostra não diz nada sobre acentos mais adiante (ex.: Latin-1 no fim).
+    """
+    with open_input(file_path) as f:
+        return f.read(ENCODING_SAMPLE_SIZE).isascii()
+
+
+def _detect_full(file_path):
+    """
+    Detecção lendo o arquivo inteiro em blocos.
+    Valida UTF-8 de forma incremental; no primeiro bloco inválido passa a
+    alimentar o detector do chardet até ele chegar a uma conclusão.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    detector = None
+
+    with open_input(file_path) as f:
+        first = True
+        while True:
+            chunk = f.read(ENCODING_CHUNK_SIZE)
+            if not chunk:
+                break
+            if first and chunk.startswith(codecs.BOM_UTF8):
+                return 'utf-8-sig'
+            first = False
+
+            if detector is None:
+                if chunk.isascii():
+                    continue
+                try:
+                    decoder.decode(chunk, final=False)
+                    continue
+                except UnicodeDecodeError:
+                    from chardet import UniversalDetector
+                    detector = UniversalDetector()
+                    # Começa na linha do primeiro byte não ASCII: um longo trecho
+                    # ASCII antes dele dilui a estatística do chardet
+                    primeiro = _NAO_ASCII.search(chunk).start()
+                    chunk = chunk[chunk.rfind(b"\n", 0, primeiro) + 1:]
+
+            detector.feed(chunk)
+            if detector.done:
+                break
+
+    if detector is None:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            # Arquivo termina no meio de um caractere multibyte
+            pass
+        return 'utf-8'
+
+    detector.close()
+    return detector.result['encoding'] or 'utf-8'
+
+
+def detect_encoding(file_path, full=False):
+    """
+    Detecta o encoding do arquivo (resultado em cache por caminho/tamanho/mtime).
+    Por padrão analisa os primeiros bytes; full=True lê o arquivo inteiro,
+    pegando bytes Latin-1 que só aparecem no meio ou no fim.
+    Arquivos comprimidos (gzip, bz2, xz, zstd) são lidos descomprimidos.
+    """
+    key = _file_key(file_path)
+
+    # Uma detecção do arquivo inteiro também responde à detecção rápida
+    for cached_full in ((True,) if full else (True, False)):
+        enc = _ENCODING_CACHE.get(key + (cached_full,))
+        if enc is not None:
+            return enc
+
+    enc = _detect_full(file_path) if full else _detect_sample(file_path)
+    _ENCODING_CACHE[key + (full,)] = enc
+    return enc
+
+
+def clear_encoding_cache():
+    """Esquece os encodings já detectados."""
+    _ENCODING_CACHE.clear()
+
+
 def read_file_lines(path, num_lines=None):
     """Lê linhas do arquivo com encoding automático."""
     enc = detect_encoding(path)
-    with open(path, 'r', encoding=enc, errors="replace") as f:
+    with open_input(path, 'r', encoding=enc, errors="replace") as f:
         if num_lines:
             return [f.readline().strip() for _ in range(num_lines)]
         return f.readlines()
 
 
 def parse_file_header(path, layout, preview_limit=None):
-    """Lê o arquivo para extração baseada no layout."""
+    """
+    Extrai cabeçalho e dados conforme o layout.
+    Usa o índice de linhas: só os trechos pedidos são lidos do disco.
+    Com preview_limit e sem índice pronto, lê em sequência só até a última
+    linha da prévia (indexar o arquivo inteiro custaria mais que isso).
+    Arquivos comprimidos e encodings que não cabem no corte por bytes '\n'
+    (UTF-16/32) são lidos em sequência, decodificando como texto.
+    """
     enc = detect_encoding(path)
-    
-    with open(path, 'r', encoding=enc, errors="replace") as f:
-        lines = f.readlines()
-
     hs = layout["header"]["start_line"]
     he = layout["header"]["end_line"]
     ds = layout["data"]["start_line"]
 
+    if detect_compression(path) or not supports_byte_offsets(enc):
+        return _parse_sequential(path, enc, hs, he, ds, preview_limit)
+
+    from core.line_index import cached_line_index, get_line_index
+    index = cached_line_index(path)
+    if index is None and preview_limit and ds is not None:
+        return _parse_sequential(path, enc, hs, he, ds, preview_limit, raw=True)
+    if index is None:
+        index = get_line_index(path)
+
     # Extrai cabeçalho
     if hs is not None and he is not None:
-        header = [line.strip() for line in lines[hs : he + 1]]
+        header = index.read_lines(hs, he + 1, enc)
     else:
         header = []
 
     # Extrai dados
     if ds is not None:
-        data = [line.strip() for line in lines[ds:]]
+        stop = ds + preview_limit if preview_limit else None
+        data = index.read_lines(ds, stop, enc)
+    else:
+        data = []
+
+    return header, data
+
+
+def _parse_sequential(path, enc, hs, he, ds, preview_limit, raw=False):
+    """
+    parse_file_header sem índice: lê só até a última linha pedida.
+    raw=True lê o arquivo em bytes e corta só em '\n', como o índice.
+    """
+    ends = [he + 1 if hs is not None and he is not None else 0]
+    if ds is not None:
+        ends.append(ds + preview_limit if preview_limit else None)
+    stop = None if None in ends else max(ends)
+    if raw:
+        with open(path, 'rb') as f:
+            lines = [line.decode(enc, errors="replace").strip() for line in islice(f, stop)]
     else:
+        with open_input(path, 'r', encoding=enc, errors="replace") as f:
+            lines = [line.strip() for line in islice(f, stop)]
+
+    header = lines[hs:he + 1] if hs is not None and he is not None else []
+    if ds is None:
         data = []
+    else:
+        data = lines[ds:ds + preview_limit] if preview_limit else lines[ds:]
+    return header, data
+
+
+def is_excel_file(path):
+    """Indica se o arquivo é uma planilha .xlsx/.xlsm."""
+    return os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS
+
+
+def supports_byte_offsets(encoding):
+    """Indica se o arquivo pode ser cortado em bytes '\n' (ASCII, UTF-8, Latin-1...)."""
+    try:
+        return "\n".encode(encoding) == b"\n"
+    except LookupError:
+        return False
+
+
+def sample_lines(path, encoding, start_offset=0, max_lines=200, windows=10, strip=True):
+    """
+    Amostra linhas espalhadas pelo arquivo inteiro.
+    Lê 'max_lines // windows' linhas em cada uma de 'windows' posições
+    distribuídas entre start_offset e o fim, descartando linhas parciais.
+    Em arquivos pequenos as janelas se encostam e a leitura vira sequencial.
+    strip=False mantém os espaços das pontas (arquivos de largura fixa).
+    """
+    size = os.path.getsize(path)
+    per_window = max(1, max_lines // windows)
+    span = max(0, size - start_offset)
+    lines = []
+
+    with open(path, 'rb') as f:
+        last_end = start_offset
+        for k in range(windows):
+            target = start_offset + span * k // windows
+            if target > last_end:
+                # Posiciona no início da próxima linha completa
+                f.seek(target - 1)
+                f.readline()
+            else:
+                f.seek(last_end)
+
+            for _ in range(per_window):
+                raw = f.readline()
+                if not raw:
+                    break
+                line = raw.decode(encoding, errors="replace")
+                line = line.strip() if strip else line.rstrip("\r\n")
+                if line.strip():
+                    lines.append(line)
+            last_end = f.tell()
 
-    if preview_limit:
-        return header, data[:preview_limit]
-    
-    return header, data
\ No newline at end of file
+    return lines
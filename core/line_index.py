@@ -0,0 +1,334 @@
+# ============================================================================
+# ARQUIVO: core/line_index.py
+# Índice de offsets de linha para acesso aleatório a arquivos grandes
+# ============================================================================
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+# Bytes lidos por vez na construção do índice
+INDEX_CHUNK_SIZE = 8 * 1024 * 1024
+# Extensão do arquivo de índice salvo ao lado do original
+SIDECAR_SUFFIX = ".lidx"
+
+# Cabeçalho do sidecar: assinatura, tamanho e mtime do arquivo indexado
+_MAGIC = b"LIDX0001"
+_HEADER = struct.Struct("<8sQq")
+
+# Linhas por janela lida sob demanda e janelas mantidas em memória (LineSource)
+WINDOW_LINES = 256
+WINDOW_CACHE_SIZE = 64
+# Arquivos sem acesso aleatório (comprimidos, UTF-16/32): linhas do início mantidas
+SEQUENTIAL_LINE_LIMIT = 100_000
+
+# Índices já construídos nesta execução: caminho -> LineIndex, do menos para o
+# mais usado. Cada índice ocupa 8 bytes por linha; só os últimos ficam em memória
+INDEX_CACHE_SIZE = 4
+_INDEX_CACHE = OrderedDict()
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def _numpy():
+    """NumPy só na primeira indexação: a interface abre sem carregá-lo."""
+    try:
+        import numpy
+    except ImportError:  # Sem NumPy a indexação usa bytes.find
+        return None
+    return numpy
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class LineIndex:
+    """
+    Offsets (em bytes) do início de cada linha de um arquivo.
+    offsets[i] é o início da linha i e offsets[-1] é o tamanho do arquivo,
+    então a linha i ocupa os bytes [offsets[i], offsets[i + 1]).
+    As linhas são separadas por '\\n' (o '\\r' de '\\r\\n' fica na linha).
+    """
+
+    def __init__(self, path, offsets, size, mtime_ns):
+        self.path = path
+        self.offsets = offsets
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    # ------------------------------------------------------------------
+    # Construção e persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, path):
+        """Constrói o índice com uma única leitura sequencial do arquivo."""
+        size, mtime_ns = _stat_key(path)
+        offsets = array('Q', [0])
+        np = _numpy()
+
+        with open(path, 'rb') as f:
+            base = 0
+            while True:
+                chunk = f.read(INDEX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if np is not None:
+                    pos = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                    offsets.frombytes((pos + (base + 1)).astype(np.uint64).tobytes())
+                else:
+                    pos = chunk.find(b"\n")
+                    while pos != -1:
+                        offsets.append(base + pos + 1)
+                        pos = chunk.find(b"\n", pos + 1)
+                base += len(chunk)
+
+        # Última linha sem '\n' no final
+        if offsets[-1] != base:
+            offsets.append(base)
+        return cls(path, offsets, size, mtime_ns)
+
+    def save(self, sidecar_path=None):
+        """Grava o índice em um arquivo ao lado do original."""
+        sidecar_path = sidecar_path or self.path + SIDECAR_SUFFIX
+        with open(sidecar_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, self.mtime_ns))
+            f.write(array('Q', self.offsets).tobytes())
+        return sidecar_path
+
+    @classmethod
+    def load(cls, path, sidecar_path=None):
+        """
+        Abre um índice salvo via mmap (sem copiar os offsets para a memória).
+        Retorna None se o sidecar não existir ou estiver desatualizado.
+        """
+        sidecar_path = sidecar_path or path + SIDECAR_SUFFIX
+        try:
+            with open(sidecar_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mm) < _HEADER.size:
+            mm.close()
+            return None
+        magic, size, mtime_ns = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or (size, mtime_ns) != _stat_key(path):
+            mm.close()
+            return None
+
+        offsets = memoryview(mm)[_HEADER.size:].cast('Q')
+        return cls(path, offsets, size, mtime_ns)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    @property
+    def line_count(self):
+        return len(self.offsets) - 1
+
+    def __len__(self):
+        return self.line_count
+
+    def _clamp(self, start, stop):
+        n = self.line_count
+        if stop is None or stop > n:
+            stop = n
+        start = max(0, min(start, stop))
+        return start, stop
+
+    def span(self, start, stop=None):
+        """Intervalo de bytes (início, fim) das linhas [start, stop)."""
+        start, stop = self._clamp(start, stop)
+        return self.offsets[start], self.offsets[stop]
+
+    def read_raw(self, start, stop=None):
+        """Bytes brutos das linhas [start, stop), lidos com um único seek."""
+        begin, end = self.span(start, stop)
+        with open(self.path, 'rb') as f:
+            f.seek(begin)
+            return f.read(end - begin)
+
+    def read_lines(self, start, stop=None, encoding='utf-8', strip=True):
+        """Linhas [start, stop) decodificadas, sem ler o resto do arquivo."""
+        raw = self.read_raw(start, stop)
+        if not raw:
+            return []
+        lines = raw.decode(encoding, errors="replace").split("\n")
+        if raw.endswith(b"\n"):
+            lines.pop()
+        return [line.strip() for line in lines] if strip else lines
+
+    def tail(self, n, encoding='utf-8'):
+        """Últimas n linhas do arquivo."""
+        return self.read_lines(max(0, self.line_count - n), None, encoding)
+
+    def line_at(self, offset):
+        """Número da linha que contém o byte 'offset'."""
+        return max(0, bisect_right(self.offsets, offset) - 1)
+
+    def chunks(self, start_line, target_bytes):
+        """
+        Divide as linhas a partir de start_line em blocos de ~target_bytes.
+        Retorna [(primeira_linha, byte_inicio, byte_fim), ...], sempre em
+        limites de linha, para distribuição entre processos.
+        """
+        result = []
+        line = min(start_line, self.line_count)
+        while line < self.line_count:
+            begin = self.offsets[line]
+            # Primeira linha que começa depois do tamanho alvo
+            stop = bisect_right(self.offsets, begin + target_bytes - 1, line + 1)
+            stop = min(max(stop, line + 1), self.line_count)
+            result.append((line, begin, self.offsets[stop]))
+            line = stop
+        return result
+
+
+def cached_line_index(path):
+    """Índice já construído nesta execução e ainda válido (None se não houver)."""
+    key = _stat_key(path)
+    with _INDEX_CACHE_LOCK:
+        index = _INDEX_CACHE.get(os.path.abspath(path))
+        if index is None or (index.size, index.mtime_ns) != key:
+            return None
+        _INDEX_CACHE.move_to_end(os.path.abspath(path))
+    return index
+
+
+def get_line_index(path, persist=False):
+    """
+    Retorna o índice de linhas do arquivo, reaproveitando o que já existir.
+    persist=True carrega/grava o sidecar '<arquivo>.lidx' para outras execuções.
+    Só os INDEX_CACHE_SIZE índices usados por último ficam em memória.
+    """
+    index = cached_line_index(path)
+    if index is not None:
+        return index
+
+    index = LineIndex.load(path) if persist else None
+    if index is None:
+        index = LineIndex.build(path)
+        if persist:
+            try:
+                index.save()
+            except OSError:
+                pass  # Pasta sem permissão de escrita: segue só em memória
+
+    with _INDEX_CACHE_LOCK:
+        _INDEX_CACHE[os.path.abspath(path)] = index
+        _INDEX_CACHE.move_to_end(os.path.abspath(path))
+        while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+class LineSource:
+    """
+    Linhas de um arquivo sob demanda, para telas que rolam por arquivos
+    enormes. Com o índice (open_index), qualquer trecho é lido com um seek
+    e só as janelas recentes ficam em memória (LRU de WINDOW_CACHE_SIZE).
+    Sem ele (antes de o índice ficar pronto, ou em arquivos comprimidos e
+    UTF-16/32) o início do arquivo é lido em sequência, até sequential_limit
+    linhas. Pode ser usada por várias threads.
+    """
+
+    def __init__(self, path, encoding, sequential_limit=SEQUENTIAL_LINE_LIMIT):
+        from core.compression import detect_compression
+        from core.file_utils import supports_byte_offsets
+
+        self.path = path
+        self.encoding = encoding
+        self.sequential_limit = sequential_limit
+        self.seekable = detect_compression(path) is None and supports_byte_offsets(encoding)
+        self.index = None
+        self.truncated = False  # Leitura sequencial parou no limite antes do fim
+        self._windows = OrderedDict()
+        self._head = []
+        self._reader = None
+        self._eof = False
+        self._lock = threading.Lock()
+
+    def open_index(self):
+        """Constrói (ou reaproveita) o índice: uma leitura completa do arquivo. Retorna se há índice."""
+        if self.seekable and self.index is None:
+            index = get_line_index(self.path)
+            with self._lock:
+                self.index = index
+                self._close_reader()
+        return self.index is not None
+
+    @property
+    def line_count(self):
+        """Total de linhas com o índice; sem ele, as lidas até agora."""
+        if self.index is not None:
+            return self.index.line_count
+        return len(self._head)
+
+    @property
+    def complete(self):
+        """Indica se line_count já é o total do arquivo."""
+        return self.index is not None or (self._eof and not self.truncated)
+
+    def read_lines(self, start, stop):
+        """Linhas [start, stop) sem a quebra de linha (menos, se o arquivo acabar antes)."""
+        with self._lock:
+            if self.index is None:
+                self._read_head(stop)
+                return self._head[start:stop]
+
+            stop = min(stop, self.index.line_count)
+            lines = []
+            if start >= stop:
+                return lines
+            for number in range(start // WINDOW_LINES, (stop - 1) // WINDOW_LINES + 1):
+                base = number * WINDOW_LINES
+                lines.extend(self._window(number)[max(start - base, 0):stop - base])
+            return lines
+
+    def _window(self, number):
+        window = self._windows.get(number)
+        if window is not None:
+            self._windows.move_to_end(number)
+            return window
+        start = number * WINDOW_LINES
+        lines = self.index.read_lines(start, start + WINDOW_LINES, self.encoding, strip=False)
+        window = self._windows[number] = [line.rstrip("\r") for line in lines]
+        if len(self._windows) > WINDOW_CACHE_SIZE:
+            self._windows.popitem(last=False)
+        return window
+
+    def _read_head(self, stop):
+        """Lê o início do arquivo em sequência até ter 'stop' linhas (ou até o limite)."""
+        if self._eof or len(self._head) >= stop:
+            return
+        if self._reader is None:
+            from core.compression import open_input
+            self._reader = open_input(self.path, "r", encoding=self.encoding, errors="replace")
+        limit = min(stop, self.sequential_limit)
+        while len(self._head) < limit:
+            line = self._reader.readline()
+            if not line:
+                self._eof = True
+                break
+            self._head.append(line.rstrip("\r\n"))
+        if not self._eof and len(self._head) >= self.sequential_limit:
+            self._eof = self.truncated = True
+        if self._eof:
+            self._close_reader()
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def close(self):
+        with self._lock:
+            self._close_reader()
+            self._windows.clear()
@@ -0,0 +1,241 @@
+# ============================================================================
+# ARQUIVO: core/tokenizer.py
+# Divisão de registros delimitados com suporte a aspas (str ou bytes)
+# ============================================================================
+
+# Máximo de linhas físicas juntadas em um único registro com aspas abertas.
+# Acima disso as aspas são tratadas como texto literal (arquivo malformado).
+MAX_RECORD_LINES = 1000
+
+
+def _parse(text, sep, quote):
+    """
+    Divide 'text' em campos no estilo CSV: campos que começam com aspas vão
+    até a aspa de fechamento e "" representa uma aspa literal.
+    Retorna (campos, marcados_com_aspas), ou None se alguma aspa ficou
+    aberta (o registro continua na próxima linha).
+    Usa apenas find/startswith, então funciona com str e com bytes.
+    """
+    n_quote = len(quote)
+    if len(text) >= 2 * n_quote and text.startswith(quote) and text.endswith(quote):
+        # Todos os campos entre aspas e sem aspas internas: um único split.
+        # A contagem garante que nenhuma aspa ficou dentro de algum campo.
+        fields = text[n_quote:-n_quote].split(quote + sep + quote)
+        if text.count(quote) == 2 * len(fields):
+            return fields, [True] * len(fields)
+
+    fields = []
+    quoted = []
+    empty = text[:0]
+    n_sep = len(sep)
+    pos = 0
+
+    while True:
+        if text.startswith(quote, pos):
+            parts = []
+            p = pos + n_quote
+            while True:
+                q = text.find(quote, p)
+                if q == -1:
+                    return None
+                parts.append(text[p:q])
+                if text.startswith(quote, q + n_quote):  # "" escapado
+                    parts.append(quote)
+                    p = q + 2 * n_quote
+                    continue
+                p = q + n_quote
+                break
+
+            # Texto solto entre a aspa de fechamento e o separador é mantido
+            nxt = text.find(sep, p)
+            end = len(text) if nxt == -1 else nxt
+            parts.append(text[p:end])
+            fields.append(empty.join(parts))
+            quoted.append(True)
+        else:
+            nxt = text.find(sep, pos)
+            end = len(text) if nxt == -1 else nxt
+            fields.append(text[pos:end])
+            quoted.append(False)
+
+        if nxt == -1:
+            return fields, quoted
+        pos = nxt + n_sep
+
+
+def split_record(text, sep, quote='"'):
+    """
+    Divide um registro em campos.
+    Retorna (campos, quoted): quoted é None no caminho rápido (registro
+    sem aspas, equivalente a text.split(sep)) ou a lista de flags indicando
+    quais campos estavam entre aspas.
+    """
+    if not quote or quote not in text:
+        return text.split(sep), None
+    parsed = _parse(text, sep, quote)
+    if parsed is None:
+        # Aspas sem fechamento: trata a linha como texto simples
+        return text.split(sep), None
+    return parsed
+
+
+def split_fields(text, sep, quote='"', spans=None):
+    """
+    Somente os valores dos campos (para quem não precisa regravar).
+    spans: colunas de largura fixa [(início, tamanho)] (ver split_fixed).
+    """
+    if spans:
+        return split_fixed(text, spans)
+    return split_record(text, sep, quote)[0]
+
+
+def is_complete(text, sep, quote='"'):
+    """False se o registro termina com um campo entre aspas ainda aberto."""
+    if not quote or quote not in text:
+        return True
+    return _parse(text, sep, quote) is not None
+
+
+def join_record(fields, sep, quoted=None, quote='"'):
+    """
+    Monta o registro de volta. Campos que estavam entre aspas voltam entre
+    aspas; campos que passaram a conter o separador ou quebra de linha
+    também são protegidos.
+    """
+    if quoted is None and not quote:
+        return sep.join(fields)
+
+    newline = "\n" if isinstance(sep, str) else b"\n"
+    out = []
+    for i, value in enumerate(fields):
+        protect = (quoted is not None and i < len(quoted) and quoted[i])
+        if not protect and quote and (sep in value or newline in value):
+            protect = True
+        if protect:
+            value = quote + value.replace(quote, quote + quote) + quote
+        out.append(value)
+    return sep.join(out)
+
+
+def iter_records(lines, sep, quote='"', strip=True):
+    """
+    Agrupa linhas físicas em registros lógicos.
+    Gera (indice_primeira_linha, qtd_linhas, texto) — um registro com campo
+    entre aspas que contém quebra de linha ocupa várias linhas físicas.
+    """
+    if isinstance(sep, str):
+        newline, eol = "\n", "\r\n"
+    else:
+        newline, eol = b"\n", b"\r\n"
+    pending = None
+    start = 0
+
+    for idx, line in enumerate(lines):
+        if pending is None:
+            text = line.strip() if strip else line.rstrip(eol)
+            if not is_complete(text, sep, quote):
+                pending, start = [text], idx
+                continue
+            yield idx, 1, text
+            continue
+
+        pending.append(line.rstrip(eol))
+        record = newline.join(pending)
+        if is_complete(record, sep, quote) or len(pending) >= MAX_RECORD_LINES:
+            yield start, len(pending), record
+            pending = None
+
+    if pending is not None:
+        yield start, len(pending), newline.join(pending)
+
+
+def iter_layout_records(lines, sep, quote='"', header=(None, None), data_start=0, first_idx=0, strip=True):
+    """
+    Registros de dados de um arquivo com layout: pula o cabeçalho
+    (header = (linha_inicial, linha_final)), as linhas antes de data_start
+    e as linhas vazias. Gera (indice_primeira_linha, texto); first_idx é o
+    índice da primeira linha de 'lines' no arquivo.
+    strip=False mantém os espaços das pontas (arquivos de largura fixa).
+    """
+    header_start, header_end = header
+    has_header = header_start is not None and header_end is not None
+    pending = None
+    start = first_idx
+
+    for idx, line in enumerate(lines, first_idx):
+        if pending is not None:
+            # Continuação de um registro com quebra de linha entre aspas
+            pending.append(line.rstrip("\r\n"))
+            record = "\n".join(pending)
+            if is_complete(record, sep, quote) or len(pending) >= MAX_RECORD_LINES:
+                pending = None
+                yield start, record
+            continue
+
+        text = line.strip()
+        if has_header and header_start <= idx <= header_end:
+            continue
+        if idx < data_start or not text:
+            continue
+        if quote and quote in text and not is_complete(text, sep, quote):
+            pending, start = [text], idx
+            continue
+        yield idx, text if strip else line.rstrip("\r\n")
+
+    if pending is not None:
+        yield start, "\n".join(pending)
+
+
+def check_fixed_spans(spans):
+    """
+    Confere as colunas de um layout de largura fixa: [(início, tamanho)],
+    em ordem, sem sobreposição e com tamanho positivo. Retorna tuplas.
+    """
+    checked = []
+    end = 0
+    for span in spans:
+        start, length = (int(v) for v in span)
+        if start < end or length <= 0:
+            raise ValueError(f"colunas de largura fixa fora de ordem ou sobrepostas: {start}:{length}")
+        checked.append((start, length))
+        end = start + length
+    if not checked:
+        raise ValueError("layout de largura fixa sem colunas")
+    return checked
+
+
+def split_fixed(text, spans):
+    """Campos de largura fixa: fatias [início, início + tamanho) de 'text' (str ou bytes)."""
+    return [text[start:start + length] for start, length in spans]
+
+
+def infer_fixed_spans(lines, min_gap=2):
+    """
+    Colunas de um arquivo de largura fixa a partir de algumas linhas: cada
+    coluna começa logo depois de uma faixa de pelo menos 'min_gap' espaços
+    comum a todas as linhas e vai até o início da seguinte (o preenchimento
+    fica com o campo). Retorna [(início, tamanho)].
+    Com min_gap=1, um espaço interno que cai na mesma posição em todas as
+    linhas (ex.: nomes do mesmo tamanho) cortaria a coluna em duas; por isso
+    o padrão exige dois espaços. Colunas separadas por um só espaço (ou
+    coladas) ficam juntas: nesses arquivos informe as posições.
+    """
+    lines = [line.rstrip("\r\n") for line in lines if line.strip()]
+    if not lines:
+        return []
+    width = max(map(len, lines))
+    blank = bytearray(b"\x01") * width
+    for line in lines:
+        for i, char in enumerate(line):
+            if char != " ":
+                blank[i] = 0
+    starts = [0]  # Espaços no início de todas as linhas ficam com a primeira coluna
+    run = 0
+    for i in range(width):
+        if blank[i]:
+            run += 1
+            continue
+        if run >= min_gap and i - run > 0:
+            starts.append(i)
+        run = 0
+    return [(start, end - start) for start, end in zip(starts, starts[1:] + [width])]
@@ -3,6 +3,9 @@
 # Componentes UI reutilizáveis entre features
 # ============================================================================
 
+import threading
+import time
+
 import flet as ft
 
 
@@ -80,4 +83,298 @@ class StatusText(ft.Text):
     
     def set_error(self, text):
         self.value = text
-        self.color = "red"
\ No newline at end of file
+        self.color = "red"
+
+def _refresh(control):
+    """update() de um controle só se ele já estiver na página."""
+    try:
+        control.update()
+    except (AssertionError, RuntimeError):
+        pass  # Ainda não adicionado à página: aparece no próximo page.update()
+
+
+class VirtualRows(ft.Column):
+    """
+    Lista virtualizada para arquivos de qualquer tamanho: só 'visible_rows'
+    linhas existem como controles e são reaproveitadas ao rolar; cada
+    posição é pedida a fetch(start, count), que devolve uma lista de
+    (key, label, texts). 'key' identifica a linha (é o que chega em
+    on_row_click e em row_style), 'label' vai na margem esquerda e
+    'texts' preenche as colunas. row_style(key) devolve a cor de fundo.
+    """
+
+    def __init__(self, fetch, columns=1, visible_rows=30, on_row_click=None, row_style=None,
+                 colors=None, headers=None, **kwargs):
+        super().__init__(expand=True, spacing=4, **kwargs)
+        self.fetch = fetch
+        self.visible_rows = visible_rows
+        self.on_row_click = on_row_click
+        self.row_style = row_style or (lambda key: "white")
+        self.total = 0
+        self.exact = True
+        self.position = 0
+        self._keys = [None] * visible_rows
+
+        colors = colors or ["black"] * columns
+        self._rows = []
+        for _ in range(visible_rows):
+            label = ft.Text("", size=11, color=ft.Colors.GREY_500, width=70, font_family="Consolas")
+            cells = [ft.Text("", size=12, font_family="Consolas", color=color, expand=True,
+                             selectable=on_row_click is None)
+                     for color in colors]
+            self._rows.append(ft.Container(
+                content=ft.Row([label] + cells, vertical_alignment=ft.CrossAxisAlignment.START),
+                padding=5,
+                bgcolor="white",
+                border=get_border("#E0E0E0"),
+                visible=False,
+                on_click=self._on_click if on_row_click else None,
+            ))
+
+        self.lbl_position = ft.Text("", size=11, color=ft.Colors.GREY_700)
+        self.sld_position = ft.Slider(min=0, max=1, value=0, expand=True, disabled=True,
+                                      on_change_end=lambda e: self.go_to(int(e.control.value)))
+        self.txt_go_to = ft.TextField(label="Ir para", width=120, text_size=12, dense=True,
+                                      keyboard_type=ft.KeyboardType.NUMBER, on_submit=self._on_go_to)
+        navigation = ft.Row([
+            ft.IconButton(ft.Icons.FIRST_PAGE, tooltip="Início", on_click=lambda e: self.go_to(0)),
+            ft.IconButton(ft.Icons.KEYBOARD_ARROW_UP, tooltip="Página anterior",
+                          on_click=lambda e: self.go_to(self.position - self.visible_rows)),
+            ft.IconButton(ft.Icons.KEYBOARD_ARROW_DOWN, tooltip="Próxima página",
+                          on_click=lambda e: self.go_to(self.position + self.visible_rows)),
+            ft.IconButton(ft.Icons.LAST_PAGE, tooltip="Fim", on_click=lambda e: self.go_to(self.total)),
+            self.sld_position,
+            self.lbl_position,
+            self.txt_go_to,
+        ])
+
+        rows = ft.Column(self._rows, spacing=4, scroll="auto", expand=True)
+        if headers:
+            rows.controls.insert(0, ft.Row([ft.Container(width=70)] + [
+                ft.Text(text, weight="bold", color=color, expand=True) for text, color in zip(headers, colors)
+            ]))
+        # A roda do mouse também anda pelo arquivo (3 linhas por passo)
+        self.controls = [ft.GestureDetector(content=rows, on_scroll=self._on_scroll, expand=True), navigation]
+
+    def set_total(self, total, exact=True):
+        """Total de linhas navegáveis; exact=False quando ainda pode haver mais."""
+        self.total, self.exact = total, exact
+        self.sld_position.max = max(total - 1, 1)
+        self.sld_position.disabled = total <= self.visible_rows
+        self._update_label()
+
+    def go_to(self, position):
+        """Mostra as linhas a partir de 'position' (0-based), buscando só essa janela."""
+        if self.exact:
+            position = min(position, self.total - self.visible_rows)
+        self.position = max(position, 0)
+        items = self.fetch(self.position, self.visible_rows)
+        for i, row in enumerate(self._rows):
+            if i < len(items):
+                key, label, texts = items[i]
+                row.content.controls[0].value = "" if label is None else str(label)
+                for cell, text in zip(row.content.controls[1:], texts):
+                    cell.value = text
+                row.bgcolor = self.row_style(key)
+                row.data = self._keys[i] = key
+                row.visible = True
+            else:
+                row.data = self._keys[i] = None
+                row.visible = False
+        self.sld_position.value = min(self.position, self.sld_position.max)
+        self._update_label()
+        _refresh(self)
+
+    def refresh_styles(self):
+        """Recalcula as cores e redesenha só as linhas cuja cor mudou."""
+        for key, row in zip(self._keys, self._rows):
+            if key is None:
+                continue
+            color = self.row_style(key)
+            if color != row.bgcolor:
+                row.bgcolor = color
+                _refresh(row)
+
+    def _update_label(self):
+        shown = sum(key is not None for key in self._keys)
+        last = self.position + shown
+        total = f"{self.total:,}" + ("" if self.exact else "+")
+        self.lbl_position.value = f"{self.position + 1 if shown else 0:,}–{last:,} de {total}".replace(",", ".")
+
+    def _on_click(self, e):
+        if e.control.data is not None:
+            self.on_row_click(e.control.data)
+
+    def _on_scroll(self, e):
+        step = 3 if e.scroll_delta_y > 0 else -3
+        if e.scroll_delta_y:
+            self.go_to(self.position + step)
+
+    def _on_go_to(self, e):
+        try:
+            self.go_to(int(e.control.value) - 1)
+        except ValueError:
+            pass
+
+
+# Intervalo mínimo entre atualizações de progresso na tela (segundos)
+PROGRESS_INTERVAL_S = 0.25
+
+
+def pick_file():
+    """Abre o seletor de arquivos nativo; devolve o caminho escolhido ou None."""
+    try:
+        # tkinter só é carregado quando o seletor de arquivos é aberto
+        import tkinter as tk
+        from tkinter import filedialog
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes('-topmost', True)
+        path = filedialog.askopenfilename()
+        root.destroy()
+        return path or None
+    except:
+        return None
+
+
+class TaskTab(ft.Container):
+    """
+    Base das abas que rodam uma tarefa longa sobre um arquivo delimitado
+    (conversor, validador): campos do layout (separador, linha do cabeçalho
+    e início dos dados), botões executar/cancelar, barra e texto de
+    andamento, e a thread que mantém a interface respondendo.
+    A subclasse monta a tela em _build_ui com esses controles, informa o
+    arquivo em _selected_path e devolve em _task(path, layout) a função
+    executada fora da thread da interface (com progresso=self._on_progress
+    e cancelar=self._cancel_event).
+    """
+
+    def __init__(self, page, action_text, action_icon, busy_text, cancelled_text, unit="linhas"):
+        super().__init__()
+        self.main_page = page
+        self.expand = True
+        self._cancel_event = None
+        self._last_progress = 0.0
+        self._action = (action_text, action_icon)
+        self._busy_text = busy_text
+        self._cancelled_text = cancelled_text
+        self._unit = unit
+
+        self.txt_status = StatusText()
+        self.dd_sep = ft.Dropdown(
+            label="Separador",
+            options=[
+                ft.dropdown.Option("|", "| Pipe"),
+                ft.dropdown.Option("TAB", "TAB"),
+                ft.dropdown.Option(";", "; Ponto-vírgula"),
+                ft.dropdown.Option(",", ", Vírgula"),
+            ],
+            value="|",
+            width=120
+        )
+        self.txt_header = ft.TextField(label="Linha do cabeçalho", width=140, text_size=12,
+                                       hint_text="vazio = sem", keyboard_type=ft.KeyboardType.NUMBER)
+        self.txt_data = ft.TextField(label="Início dos dados", width=130, text_size=12, value="1",
+                                     keyboard_type=ft.KeyboardType.NUMBER)
+        self.btn_process = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(action_icon), ft.Text(action_text)]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE, color="white"),
+            on_click=self._run_process
+        )
+        self.btn_cancel = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(ft.Icons.STOP), ft.Text("Cancelar")]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.RED_400, color="white"),
+            on_click=self._cancel_process,
+            visible=False
+        )
+        self.pb_progress = ft.ProgressBar(visible=False)
+        self._build_ui()
+
+    def _build_ui(self):
+        raise NotImplementedError
+
+    def _selected_path(self):
+        raise NotImplementedError
+
+    def _task(self, path, layout):
+        raise NotImplementedError
+
+    def _layout(self):
+        """Layout no formato do pipeline a partir dos campos da tela (ValueError se inválido)."""
+        sep = "\t" if self.dd_sep.value == "TAB" else self.dd_sep.value
+        cabecalho = int(self.txt_header.value) if (self.txt_header.value or "").strip() else None
+        return {
+            "header": {"start_line": cabecalho, "end_line": cabecalho},
+            "data": {"start_line": int(self.txt_data.value or 0)},
+            "separator": sep
+        }
+
+    def _run_process(self, e):
+        try:
+            layout = self._layout()
+        except ValueError:
+            layout = None
+        path = self._selected_path()
+        if not path or layout is None:
+            self.main_page.snack_bar = ft.SnackBar(ft.Text("❌ Selecione o arquivo e informe linhas válidas!"))
+            self.main_page.snack_bar.open = True
+            self.main_page.update()
+            return
+
+        self._cancel_event = threading.Event()
+        self._last_progress = 0.0
+        task = self._task(path, layout)  # Lê os campos ainda na thread da interface
+
+        self.btn_process.disabled = True
+        self.btn_process.content = ft.Row([ft.ProgressRing(width=16, height=16), ft.Text(f" {self._busy_text}")])
+        self.btn_cancel.visible = True
+        self.btn_cancel.disabled = False
+        self.pb_progress.value = None  # Indeterminado até o primeiro evento
+        self.pb_progress.visible = True
+        self.txt_status.set_info(f"⏳ {self._busy_text}")
+        self.main_page.update()
+        threading.Thread(target=self._run_task, args=(task,), daemon=True).start()
+
+    def _run_task(self, task):
+        """Executado fora da thread da interface."""
+        try:
+            task()
+        except Exception as err:
+            if self._cancel_event.is_set():
+                # ProcessamentoCancelado: o pedido de cancelamento chegou à tarefa
+                self.txt_status.set_info(self._cancelled_text)
+            else:
+                import traceback
+                traceback.print_exc()
+                self.txt_status.set_error(f"Erro fatal: {str(err)}")
+        finally:
+            text, icon = self._action
+            self.btn_process.disabled = False
+            self.btn_process.content = ft.Row([ft.Icon(icon), ft.Text(text)])
+            self.btn_cancel.visible = False
+            self.pb_progress.visible = False
+            self.main_page.update()
+
+    def _on_progress(self, evento):
+        """Recebe os eventos da tarefa; a tela é atualizada poucas vezes por segundo."""
+        agora = time.monotonic()
+        if agora - self._last_progress < PROGRESS_INTERVAL_S:
+            return
+        self._last_progress = agora
+
+        total, lidos = evento["bytes_total"], evento["bytes_lidos"]
+        texto = f"⏳ {evento['linhas']:,} {self._unit} • {evento['linhas_por_segundo']:,.0f} {self._unit}/s"
+        if total and lidos is not None:
+            self.pb_progress.value = min(lidos / total, 1.0)
+            texto += f" • {lidos / total:.0%}"
+        if evento["eta_s"] is not None:
+            texto += f" • faltam ~{evento['eta_s']:.0f}s"
+        self.txt_status.set_info(texto.replace(",", "."))
+        self.main_page.update()
+
+    def _cancel_process(self, e):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.btn_cancel.disabled = True
+            self.txt_status.set_info("⏳ Cancelando...")
+            self.main_page.update()
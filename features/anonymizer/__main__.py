@@ -0,0 +1,203 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/__main__.py
+# Linha de comando do anonimizador (sem interface gráfica)
+# Uso: python -m features.anonymizer ENTRADA [opções]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+
+# Separadores que podem ser passados pelo nome (o mesmo padrão da interface)
+SEPARADORES = {"TAB": "\t", "PIPE": "|"}
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m features.anonymizer",
+        description="Anonimiza um arquivo delimitado (CSV/TXT, também .gz/.bz2/.xz/.zst) ou planilha .xlsx "
+                    "sem abrir a interface.",
+    )
+    parser.add_argument("entrada", help="arquivo a anonimizar")
+    parser.add_argument("-l", "--layout", help="arquivo JSON com o layout (mesmo formato usado por processar)")
+    parser.add_argument("--header-start", type=int, help="linha inicial do cabeçalho (0-based)")
+    parser.add_argument("--header-end", type=int, help="linha final do cabeçalho (padrão: igual à inicial)")
+    parser.add_argument("--data-start", type=int, help="primeira linha de dados (0-based)")
+    parser.add_argument("-s", "--sep", help="separador: caractere ou TAB/PIPE (padrão: |)")
+    parser.add_argument("--quote", help="caractere de aspas (padrão: \"; use '' para desativar)")
+    parser.add_argument("--largura-fixa", nargs="+", metavar="INICIO:TAMANHO",
+                        help="arquivo de largura fixa: colunas por posição (0-based), ou 'auto' para inferir "
+                             "(colunas separadas por 2+ espaços em todas as linhas; com um só espaço entre "
+                             "colunas, informe as posições)")
+    parser.add_argument("-o", "--saida", help="arquivo de saída (padrão: saida/ANON_<arquivo>)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="processos em paralelo (0 = todos os núcleos)")
+    parser.add_argument("--bloco-mb", type=int, help="tamanho dos blocos paralelos, em MB")
+    parser.add_argument("--modo-bytes", action="store_true", help="lê via mmap e separa os campos em bytes")
+    parser.add_argument("--manter-encoding", action="store_true", help="no modo bytes, grava no encoding de origem")
+    parser.add_argument("--encoding-completo", action="store_true",
+                        help="se o início do arquivo for só ASCII, detecta o encoding lendo o arquivo inteiro")
+    parser.add_argument("--estatisticas", nargs="?", const="-", metavar="ARQUIVO.json",
+                        help="mostra as estatísticas da execução (ou grava em JSON)")
+    parser.add_argument("--mapeamento", metavar="ARQUIVO.sqlite",
+                        help="reaproveita os pseudônimos de execuções anteriores (e grava os novos)")
+    parser.add_argument("--comprimir", choices=("gzip", "bz2", "xz", "zstd"),
+                        help="grava a saída comprimida (padrão: segue a extensão da saída)")
+    parser.add_argument("--partes-registros", type=int, metavar="N",
+                        help="divide a saída em partes de até N registros, com manifesto (JSON)")
+    parser.add_argument("--partes-mb", type=int, metavar="MB",
+                        help="divide a saída em partes de até MB megabytes (descomprimidos), com manifesto")
+    parser.add_argument("--repetir-cabecalho", action="store_true",
+                        help="com partes, copia o cabeçalho no início de cada uma")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="grava checkpoints e retoma uma execução interrompida de onde parou")
+    parser.add_argument("--incremental", action="store_true",
+                        help="anonimiza só as linhas acrescentadas desde a última execução com checkpoint")
+    parser.add_argument("--sem-cache", type=int, nargs="*", default=(), metavar="COLUNA",
+                        help="índices de colunas que não passam pelo cache")
+    parser.add_argument("-p", "--perfil", metavar="NOME",
+                        help="usa um perfil salvo (perfis/NOME.json ou caminho .json): layout, encoding e tipos "
+                             "sem detecção; as opções de layout acima têm precedência")
+    parser.add_argument("--salvar-perfil", metavar="NOME",
+                        help="salva o layout, o encoding e os tipos detectados como perfil antes de processar")
+    parser.add_argument("--manter", type=int, nargs="*", default=(), metavar="COLUNA",
+                        help="índices de colunas copiadas sem anonimizar (gravado no perfil)")
+    return parser
+
+
+def _colunas_largura_fixa(itens):
+    """'auto' ou itens INICIO:TAMANHO -> valor de 'fixed_width' no layout (ValueError se inválido)."""
+    if len(itens) == 1 and itens[0].lower() == "auto":
+        return "auto"
+    colunas = []
+    for item in itens:
+        inicio, _, tamanho = item.partition(":")
+        colunas.append([int(inicio), int(tamanho)])
+    return colunas
+
+
+def montar_layout(args, base=None):
+    """
+    Layout a partir do JSON (se houver) com as opções da linha de comando
+    por cima. base: layout de partida (ex.: o de um perfil salvo).
+    """
+    layout = {"header": {}, "data": {}, "separator": "|"}
+    if base:
+        layout["header"].update(base.get("header") or {})
+        layout["data"].update(base.get("data") or {})
+        for chave in ("separator", "quote", "fixed_width"):
+            if chave in base:
+                layout[chave] = base[chave]
+    if args.layout:
+        with open(args.layout, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        layout["header"].update(dados.get("header") or {})
+        layout["data"].update(dados.get("data") or {})
+        for chave in ("separator", "quote", "fixed_width"):
+            if chave in dados:
+                layout[chave] = dados[chave]
+
+    if args.header_start is not None:
+        layout["header"]["start_line"] = args.header_start
+        layout["header"]["end_line"] = args.header_start
+    if args.header_end is not None:
+        layout["header"]["end_line"] = args.header_end
+    if args.data_start is not None:
+        layout["data"]["start_line"] = args.data_start
+    if args.sep is not None:
+        layout["separator"] = SEPARADORES.get(args.sep.upper(), args.sep)
+    if args.quote is not None:
+        layout["quote"] = args.quote or None
+    if getattr(args, "largura_fixa", None):
+        layout["fixed_width"] = _colunas_largura_fixa(args.largura_fixa)
+
+    if "start_line" not in layout["data"]:
+        # Sem indicação: dados logo após o cabeçalho (ou desde a primeira linha)
+        fim_cabecalho = layout["header"].get("end_line")
+        layout["data"]["start_line"] = 0 if fim_cabecalho is None else fim_cabecalho + 1
+    return layout
+
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.entrada):
+        parser.error(f"arquivo não encontrado: {args.entrada}")
+    if args.perfil and args.salvar_perfil:
+        parser.error("use --perfil ou --salvar-perfil, não os dois")
+    if args.repetir_cabecalho and not (args.partes_registros or args.partes_mb):
+        parser.error("--repetir-cabecalho só vale com --partes-registros ou --partes-mb")
+
+    # O pipeline (e NumPy) só é importado depois de validar os argumentos
+    perfil = None
+    if args.perfil:
+        from features.anonymizer.perfis import carregar_perfil, layout_do_perfil
+        try:
+            perfil = carregar_perfil(args.perfil)
+        except (OSError, ValueError, KeyError) as err:
+            parser.error(f"perfil inválido: {err}")
+    try:
+        layout = montar_layout(args, layout_do_perfil(perfil) if perfil else None)
+    except (OSError, ValueError) as err:
+        parser.error(f"layout inválido: {err}")
+
+    from features.anonymizer.pipeline import TAMANHO_BLOCO_PADRAO, processar
+    from features.anonymizer.perfis import criar_perfil, salvar_perfil
+
+    if perfil is not None:
+        for coluna in perfil["colunas"]:
+            if coluna["indice"] in args.manter:
+                coluna["manter"] = True
+    elif args.salvar_perfil or args.manter:
+        try:
+            perfil = criar_perfil(args.entrada, layout, manter=args.manter, sem_cache=args.sem_cache,
+                                  encoding_completo=args.encoding_completo)
+            if args.salvar_perfil:
+                print(f"📋 Perfil salvo em: {salvar_perfil(perfil, args.salvar_perfil)}")
+            if "fixed_width" in perfil["layout"]:
+                layout["fixed_width"] = perfil["layout"]["fixed_width"]  # Colunas já resolvidas
+        except Exception as err:
+            print(f"❌ Erro ao criar o perfil: {err}", file=sys.stderr)
+            return 1
+
+    caminho_saida = args.saida
+    if caminho_saida:
+        pasta = os.path.dirname(os.path.abspath(caminho_saida))
+        os.makedirs(pasta, exist_ok=True)
+
+    try:
+        caminho_saida, _, estatisticas = processar(
+            args.entrada,
+            os.path.basename(args.entrada),
+            layout,
+            workers=args.workers or None,
+            tamanho_bloco=args.bloco_mb * 1024 * 1024 if args.bloco_mb else TAMANHO_BLOCO_PADRAO,
+            colunas_sem_cache=args.sem_cache,
+            modo_bytes=args.modo_bytes,
+            manter_encoding=args.manter_encoding,
+            caminho_saida=caminho_saida,
+            mapeamento=args.mapeamento,
+            checkpoint=args.checkpoint,
+            incremental=args.incremental,
+            compressao_saida=args.comprimir,
+            perfil=perfil,
+            registros_por_parte=args.partes_registros,
+            bytes_por_parte=args.partes_mb * 1024 * 1024 if args.partes_mb else None,
+            repetir_cabecalho=args.repetir_cabecalho,
+            encoding_completo=args.encoding_completo,
+        )
+    except Exception as err:
+        print(f"❌ Erro: {err}", file=sys.stderr)
+        return 1
+
+    if args.estatisticas == "-":
+        print(estatisticas.resumo())
+    elif args.estatisticas:
+        with open(args.estatisticas, "w", encoding="utf-8") as f:
+            json.dump(estatisticas.como_dict(), f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,40 +4,252 @@
 # ============================================================================
 
 import hashlib
-import random
+import os
 import re
+import threading
+from collections import Counter, OrderedDict
 
-_CACHE = {}
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele o lote usa o caminho escalar
+    np = None
 
-def _hash(valor: str) -> int:
-    """Gera um seed numérico determinístico baseado no valor original."""
-    # Cria um hash SHA256 e pega os primeiros 8 caracteres para criar um inteiro
-    return int(hashlib.sha256(valor.encode('utf-8', errors='ignore')).hexdigest()[:8], 16)
+# Limite padrão de valores memorizados pelo cache de anonimização
+CACHE_MAX_ITENS = 200_000
+# Custo fixo aproximado (em bytes) de cada entrada do cache
+_CUSTO_ENTRADA = 160
 
-def _preservar_estrutura_numero(original: str, seed: int) -> str:
+
+class CacheAnonimizacao:
+    """
+    Cache LRU limitado para os valores já anonimizados.
+    Aceita limite por quantidade de itens e/ou por bytes aproximados e
+    mantém contadores de acertos, falhas e descartes por tipo.
+    """
+
+    def __init__(self, max_itens=CACHE_MAX_ITENS, max_bytes=None):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._dados = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def __len__(self):
+        return len(self._dados)
+
+    def get(self, chave):
+        """Retorna o valor memorizado (ou None) e atualiza os contadores."""
+        tipo = chave[1]
+        with self._lock:
+            novo = self._dados.get(chave)
+            if novo is None:
+                self.misses[tipo] += 1
+                return None
+            self._dados.move_to_end(chave)
+            self.hits[tipo] += 1
+            return novo
+
+    def put(self, chave, novo):
+        """Memoriza um valor, descartando os menos usados se passar do limite."""
+        custo = _CUSTO_ENTRADA + len(chave[0]) + len(novo)
+        with self._lock:
+            antigo = self._dados.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= _CUSTO_ENTRADA + len(chave[0]) + len(antigo)
+            self._dados[chave] = novo
+            self._bytes += custo
+
+            while self._dados and (
+                (self.max_itens is not None and len(self._dados) > self.max_itens)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                (valor, tipo), descartado = self._dados.popitem(last=False)
+                self._bytes -= _CUSTO_ENTRADA + len(valor) + len(descartado)
+                self.evictions[tipo] += 1
+
+    def limpar(self):
+        """Remove todos os valores memorizados (mantém os contadores)."""
+        with self._lock:
+            self._dados.clear()
+            self._bytes = 0
+
+    def resetar(self):
+        """Remove os valores e zera os contadores."""
+        with self._lock:
+            self._dados.clear()
+            self._bytes = 0
+            self.hits.clear()
+            self.misses.clear()
+            self.evictions.clear()
+
+    def estatisticas(self):
+        """Resumo por tipo: acertos, falhas, descartes e taxa de acerto."""
+        with self._lock:
+            tipos = set(self.hits) | set(self.misses) | set(self.evictions)
+            por_tipo = {}
+            for tipo in sorted(tipos):
+                hits, misses = self.hits[tipo], self.misses[tipo]
+                por_tipo[tipo] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "evictions": self.evictions[tipo],
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return {
+                "itens": len(self._dados),
+                "bytes_aprox": self._bytes,
+                "max_itens": self.max_itens,
+                "max_bytes": self.max_bytes,
+                "por_tipo": por_tipo,
+            }
+
+
+_CACHE = CacheAnonimizacao()
+
+
+def configurar_cache(max_itens=CACHE_MAX_ITENS, max_bytes=None):
+    """Redefine os limites do cache global (os valores atuais são descartados)."""
+    global _CACHE
+    _CACHE = CacheAnonimizacao(max_itens=max_itens, max_bytes=max_bytes)
+
+
+def limpar_cache():
+    """Libera a memória do cache global, mantendo as estatísticas."""
+    _CACHE.limpar()
+
+
+def resetar_cache():
+    """Limpa o cache global e zera as estatísticas."""
+    _CACHE.resetar()
+
+
+def estatisticas_cache():
+    """Estatísticas do cache global (acertos/falhas/descartes por tipo)."""
+    return _CACHE.estatisticas()
+
+
+def contadores_cache():
+    """Cópias dos contadores (acertos, falhas) por tipo do cache global."""
+    with _CACHE._lock:
+        return Counter(_CACHE.hits), Counter(_CACHE.misses)
+
+
+# Erros de anonimização por tipo. Só os primeiros são exibidos: uma coluna
+# problemática não pode inundar o terminal (e travar a execução).
+LIMITE_AVISOS_ERRO = 10
+_ERROS = Counter()
+
+
+def _registrar_erro(valor, tipo, erro):
+    _ERROS[tipo] += 1
+    total = sum(_ERROS.values())
+    if total <= LIMITE_AVISOS_ERRO:
+        print(f"Erro ao anonimizar '{valor}' (tipo: {tipo}): {erro}")
+        if total == LIMITE_AVISOS_ERRO:
+            print("   Demais erros serão apenas contados (veja estatisticas_erros()).")
+
+
+def estatisticas_erros():
+    """Quantidade de valores que falharam (e foram mantidos), por tipo."""
+    return dict(_ERROS)
+
+
+def resetar_erros():
+    """
+    Zera a contagem de erros do processo, e com ela o limite de avisos
+    exibidos. Chamado no início de cada processar e ao iniciar cada worker
+    (que, criado via fork, herdaria a contagem do processo pai).
+    """
+    _ERROS.clear()
+
+# Chave derivada do segredo do projeto (vazia = sem segredo)
+_CHAVE = b""
+
+_LETRAS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_ESTADOS = ('AC','AL','AP','AM','BA','CE','DF','ES','GO','MA','MT','MS','MG','PA','PB','PR','PE','PI','RJ','RN','RS','RO','RR','SC','SP','SE','TO')
+# Tabela byte -> dígito ASCII usada para converter o fluxo do hash em números
+_TAB_DIGITOS = bytes(48 + b % 10 for b in range(256))
+
+_RE_DATA_PONTO = re.compile(r'\d{2}\.\d{2}\.\d{4}')
+_RE_DATA_BARRA = re.compile(r'\d{2}/\d{2}/\d{4}')
+_RE_DATA_ISO = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def definir_segredo(segredo=None):
+    """
+    Define o segredo do projeto usado como chave do hash.
+    Com segredo, os valores fictícios só são reproduzíveis por quem tem a chave.
+    """
+    if isinstance(segredo, str):
+        segredo = segredo.encode('utf-8')
+    usar_chave(hashlib.blake2b(segredo, digest_size=32).digest() if segredo else b"")
+
+
+def chave_atual() -> bytes:
+    """Chave derivada em uso (repassada aos processos do modo paralelo)."""
+    return _CHAVE
+
+
+def usar_chave(chave: bytes):
+    """Aplica uma chave já derivada por definir_segredo."""
+    global _CHAVE
+    if chave != _CHAVE:
+        _CHAVE = chave
+        # Valores memorizados com a chave anterior deixam de valer
+        _CACHE.limpar()
+
+
+# Segredo opcional vindo do ambiente, para uso sem alterar código
+definir_segredo(os.environ.get("ANON_SEGREDO"))
+
+
+class _Gerador:
+    """
+    Fluxo de bytes determinístico derivado do valor original (SHAKE-256
+    com a chave do projeto). Cada chamada cria o seu próprio gerador, sem
+    estado global compartilhado entre threads.
+    """
+    __slots__ = ("_xof", "_buf", "_pos")
+
+    def __init__(self, valor: str, dominio: bytes = b"v"):
+        self._xof = hashlib.shake_256(_CHAVE + dominio + valor.encode('utf-8', errors='ignore'))
+        self._buf = b""
+        self._pos = 0
+
+    def bytes(self, n: int) -> bytes:
+        fim = self._pos + n
+        if fim > len(self._buf):
+            # O XOF é determinístico: pedir mais bytes preserva os anteriores
+            self._buf = self._xof.digest(max(fim, 2 * len(self._buf), 64))
+        trecho = self._buf[self._pos:fim]
+        self._pos = fim
+        return trecho
+
+    def abaixo(self, n: int) -> int:
+        """Inteiro em [0, n) a partir de 2 bytes do fluxo."""
+        return int.from_bytes(self.bytes(2), 'big') % n
+
+
+def _preservar_estrutura_numero(original: str, g: _Gerador) -> str:
     """Mantém a estrutura exata de números (pontos, vírgulas, tamanho)."""
-    # Extrai apenas os dígitos
-    digitos = ''.join(c for c in original if c.isdigit())
-    if not digitos:
+    # Conta apenas os dígitos
+    qtd_digitos = sum(1 for c in original if c.isdigit())
+    if not qtd_digitos:
         return original
     
-    # Gera novos dígitos com mesmo tamanho usando o seed
-    random.seed(seed)
-    novos_digitos = ''.join(str(random.randint(0, 9)) for _ in range(len(digitos)))
+    # Gera novos dígitos com mesmo tamanho a partir do fluxo do hash
+    novos_digitos = g.bytes(qtd_digitos).translate(_TAB_DIGITOS).decode('ascii')
+    if qtd_digitos == len(original):
+        return novos_digitos
     
     # Reconstrói mantendo a estrutura
-    resultado = []
-    idx_digito = 0
-    for char in original:
-        if char.isdigit():
-            resultado.append(novos_digitos[idx_digito])
-            idx_digito += 1
-        else:
-            resultado.append(char)
-    
-    return ''.join(resultado)
+    it = iter(novos_digitos)
+    return ''.join(next(it) if char.isdigit() else char for char in original)
 
-def _preservar_estrutura_texto(original: str, seed: int, percentual_troca=0.5) -> str:
+def _preservar_estrutura_texto(original: str, g: _Gerador, percentual_troca=0.5) -> str:
     """
     Mantém tamanho e estrutura do texto, trocando apenas parte das letras.
     percentual_troca: 0.5 = troca 50% das letras.
@@ -45,10 +257,6 @@ def _preservar_estrutura_texto(original: str, seed: int, percentual_troca=0.5) -
     if not original or len(original) < 2:
         return original
     
-    random.seed(seed)
-    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    letras_lower = letras.lower()
-    
     resultado = list(original)
     indices = [i for i, c in enumerate(original) if c.isalpha()]
     
@@ -56,45 +264,43 @@ def _preservar_estrutura_texto(original: str, seed: int, percentual_troca=0.5) -
     num_trocar = max(1, int(len(indices) * percentual_troca))
     
     if indices:
-        indices_trocar = random.sample(indices, min(num_trocar, len(indices)))
+        k = min(num_trocar, len(indices))
+        # Fisher-Yates parcial: sorteia k posições distintas
+        for j in range(k):
+            r = j + g.abaixo(len(indices) - j)
+            indices[j], indices[r] = indices[r], indices[j]
         
-        for idx in indices_trocar:
-            char = resultado[idx]
-            if char.isupper():
-                resultado[idx] = random.choice(letras)
-            else:
-                resultado[idx] = random.choice(letras_lower)
+        sorteio = g.bytes(k)
+        for j in range(k):
+            idx = indices[j]
+            letra = _LETRAS[sorteio[j] % 26]
+            resultado[idx] = letra if resultado[idx].isupper() else letra.lower()
     
     return ''.join(resultado)
 
-def _anonimizar_data(original: str, seed: int) -> str:
+def _anonimizar_data(original: str, g: _Gerador) -> str:
     """Mantém formato de data mas altera os valores."""
-    random.seed(seed)
-    
     # Tenta identificar o formato
-    if re.match(r'\d{2}\.\d{2}\.\d{4}', original):  # DD.MM.YYYY
-        dia = random.randint(1, 28)
-        mes = random.randint(1, 12)
-        ano = random.randint(2020, 2025)
-        return f"{dia:02d}.{mes:02d}.{ano}"
-    elif re.match(r'\d{2}/\d{2}/\d{4}', original):  # DD/MM/YYYY
-        dia = random.randint(1, 28)
-        mes = random.randint(1, 12)
-        ano = random.randint(2020, 2025)
-        return f"{dia:02d}/{mes:02d}/{ano}"
-    elif re.match(r'\d{4}-\d{2}-\d{2}', original):  # YYYY-MM-DD
-        dia = random.randint(1, 28)
-        mes = random.randint(1, 12)
-        ano = random.randint(2020, 2025)
-        return f"{ano}-{mes:02d}-{dia:02d}"
+    if _RE_DATA_PONTO.match(original):  # DD.MM.YYYY
+        modelo = "{d:02d}.{m:02d}.{a}"
+    elif _RE_DATA_BARRA.match(original):  # DD/MM/YYYY
+        modelo = "{d:02d}/{m:02d}/{a}"
+    elif _RE_DATA_ISO.match(original):  # YYYY-MM-DD
+        modelo = "{a}-{m:02d}-{d:02d}"
+    else:
+        # Se não identificou, preserva estrutura de número
+        return _preservar_estrutura_numero(original, g)
     
-    # Se não identificou, preserva estrutura de número
-    return _preservar_estrutura_numero(original, seed)
+    dia = 1 + g.abaixo(28)
+    mes = 1 + g.abaixo(12)
+    ano = 2020 + g.abaixo(6)
+    return modelo.format(d=dia, m=mes, a=ano)
 
-def anonimizar(valor: str, tipo: str) -> str:
+def anonimizar(valor: str, tipo: str, usar_cache: bool = True) -> str:
     """
     Anonimiza preservando a estrutura e tamanho do dado original.
     Mantém formatação, pontuação e tamanho.
+    usar_cache=False evita memorizar colunas de valores únicos (IDs, etc.).
     """
     if not valor or not str(valor).strip():
         return valor
@@ -103,10 +309,12 @@ def anonimizar(valor: str, tipo: str) -> str:
 
     # Chave para cache (valor + tipo) para performance
     chave = (valor, tipo)
-    if chave in _CACHE:
-        return _CACHE[chave]
+    if usar_cache:
+        memorizado = _CACHE.get(chave)
+        if memorizado is not None:
+            return memorizado
 
-    seed = _hash(valor)
+    g = _Gerador(valor)
     
     novo = valor
     try:
@@ -117,59 +325,405 @@ def anonimizar(valor: str, tipo: str) -> str:
                 local = partes[0]
                 dominio = partes[1] if len(partes) > 1 else ""
                 
-                novo_local = _preservar_estrutura_texto(local, seed, 0.7)
+                novo_local = _preservar_estrutura_texto(local, g, 0.7)
+                # O domínio usa um fluxo separado do da parte local
+                g_dominio = _Gerador(valor, b"d")
                 if '.' in dominio:
                     nome_dom, ext_dom = dominio.rsplit('.', 1)
-                    novo_dominio = _preservar_estrutura_texto(nome_dom, seed + 1, 0.7)
+                    novo_dominio = _preservar_estrutura_texto(nome_dom, g_dominio, 0.7)
                     novo = f"{novo_local}@{novo_dominio}.{ext_dom}"
                 else:
-                    novo = f"{novo_local}@{_preservar_estrutura_texto(dominio, seed + 1, 0.7)}"
+                    novo = f"{novo_local}@{_preservar_estrutura_texto(dominio, g_dominio, 0.7)}"
             else:
-                novo = _preservar_estrutura_texto(valor, seed, 0.7)
+                novo = _preservar_estrutura_texto(valor, g, 0.7)
         
         # CPF/CNPJ: mantém pontos, traços e tamanho
         elif tipo in ["cpf", "cnpj"]:
-            novo = _preservar_estrutura_numero(valor, seed)
+            novo = _preservar_estrutura_numero(valor, g)
         
         # EMPRESA/PESSOA: troca apenas 40% das letras para parecer real
         elif tipo in ["empresa", "pessoa"]:
-            novo = _preservar_estrutura_texto(valor, seed, 0.4)
+            novo = _preservar_estrutura_texto(valor, g, 0.4)
         
         # CIDADE: troca 50% das letras
         elif tipo == "cidade":
-            novo = _preservar_estrutura_texto(valor, seed, 0.5)
+            novo = _preservar_estrutura_texto(valor, g, 0.5)
         
         # UF: mantém 2 letras maiúsculas
         elif tipo == "uf":
-            random.seed(seed)
-            estados = ['AC','AL','AP','AM','BA','CE','DF','ES','GO','MA','MT','MS','MG','PA','PB','PR','PE','PI','RJ','RN','RS','RO','RR','SC','SP','SE','TO']
-            novo = random.choice(estados)
+            novo = _ESTADOS[g.abaixo(len(_ESTADOS))]
         
         # NÚMERO: mantém estrutura exata
         elif tipo == "numero":
-            novo = _preservar_estrutura_numero(valor, seed)
+            novo = _preservar_estrutura_numero(valor, g)
         
         # VALOR: mantém vírgulas, pontos e casas decimais
         elif tipo == "valor":
-            novo = _preservar_estrutura_numero(valor, seed)
+            novo = _preservar_estrutura_numero(valor, g)
         
         # DATA: mantém formato mas altera valores
         elif tipo == "data":
-            novo = _anonimizar_data(valor, seed)
+            novo = _anonimizar_data(valor, g)
         
         # TEXTO GENÉRICO: troca 30% das letras (mais conservador)
         else:
             if any(c.isalpha() for c in valor):
-                novo = _preservar_estrutura_texto(valor, seed, 0.3)
+                novo = _preservar_estrutura_texto(valor, g, 0.3)
             elif any(c.isdigit() for c in valor):
-                novo = _preservar_estrutura_numero(valor, seed)
+                novo = _preservar_estrutura_numero(valor, g)
             else:
                 novo = valor  # Mantém símbolos e espaços
                 
     except Exception as e:
-        # Fallback seguro
-        print(f"Erro ao anonimizar '{valor}' (tipo: {tipo}): {e}")
+        # Fallback seguro: mantém o valor e conta o erro
+        _registrar_erro(valor, tipo, e)
         novo = valor
 
-    _CACHE[chave] = novo
-    return novo
\ No newline at end of file
+    if usar_cache:
+        _CACHE.put(chave, novo)
+    return novo
+
+
+# ============================================================================
+# ANONIMIZAÇÃO EM LOTE (coluna inteira)
+# ============================================================================
+
+# Tipos cujo resultado é só substituição de dígitos (vetorizável)
+TIPOS_NUMERICOS = ("cpf", "cnpj", "numero", "valor")
+# Abaixo disso o custo de montar os arrays supera o ganho
+_LOTE_MINIMO_VETORIZADO = 32
+
+
+def _fluxos(brutos, tamanhos):
+    """Concatena os primeiros 'n' bytes do fluxo de cada valor (mesmo do _Gerador)."""
+    prefixo = _CHAVE + b"v"
+    shake = hashlib.shake_256
+    return b"".join(shake(prefixo + b).digest(n) for b, n in zip(brutos, tamanhos) if n)
+
+
+def _lote_numerico(brutos):
+    """
+    Versão vetorizada de _preservar_estrutura_numero para valores ASCII (bytes).
+    Todos os valores são concatenados em um único array de bytes; o k-ésimo
+    dígito do lote recebe o k-ésimo byte dos fluxos concatenados.
+    """
+    tamanhos = np.fromiter(map(len, brutos), dtype=np.int64, count=len(brutos))
+    inicios = np.zeros(len(brutos), dtype=np.int64)
+    np.cumsum(tamanhos[:-1], out=inicios[1:])
+
+    arr = np.frombuffer(b"".join(brutos), dtype=np.uint8).copy()
+    eh_digito = (arr >= 48) & (arr <= 57)
+    qtd_digitos = np.add.reduceat(eh_digito.astype(np.int64), inicios)
+
+    fluxo = np.frombuffer(_fluxos(brutos, qtd_digitos.tolist()), dtype=np.uint8)
+    arr[eh_digito] = 48 + fluxo % 10
+
+    saida = arr.tobytes()
+    return [saida[i:i + n] for i, n in zip(inicios.tolist(), tamanhos.tolist())]
+
+
+def _lote_data(brutos, formato=None):
+    """
+    Versão vetorizada de _anonimizar_data para valores ASCII (bytes).
+    O formato (DD.MM.YYYY, DD/MM/YYYY, YYYY-MM-DD) é reconhecido pelos 10
+    primeiros bytes; o que não for data segue o caminho numérico.
+    formato: um dos FORMATOS_DATA (coluna compilada) para conferir só ele.
+    """
+    resultado = [None] * len(brutos)
+    candidatos = [i for i, b in enumerate(brutos) if len(b) >= 10]
+
+    if candidatos:
+        mat = np.frombuffer(b"".join(brutos[i][:10] for i in candidatos), dtype=np.uint8).reshape(-1, 10)
+        dig = (mat >= 48) & (mat <= 57)
+        nenhum = np.zeros(len(candidatos), dtype=bool)
+        if formato == "AAAA-MM-DD":
+            ponto = barra = nenhum
+        else:
+            ddmm = dig[:, [0, 1, 3, 4, 6, 7, 8, 9]].all(axis=1)
+            ponto = ddmm & (mat[:, 2] == 46) & (mat[:, 5] == 46) if formato in (None, "DD.MM.AAAA") else nenhum
+            barra = ddmm & (mat[:, 2] == 47) & (mat[:, 5] == 47) if formato in (None, "DD/MM/AAAA") else nenhum
+        if formato in (None, "AAAA-MM-DD"):
+            iso = dig[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1) & (mat[:, 4] == 45) & (mat[:, 7] == 45)
+        else:
+            iso = nenhum
+        eh_data = ponto | barra | iso
+
+        datas = [candidatos[j] for j in np.flatnonzero(eh_data).tolist()]
+        if datas:
+            fluxo = np.frombuffer(_fluxos([brutos[i] for i in datas], [6] * len(datas)), dtype=np.uint8)
+            fluxo = fluxo.reshape(-1, 3, 2).astype(np.int64)
+            sorteio = fluxo[:, :, 0] * 256 + fluxo[:, :, 1]
+            dia = 1 + sorteio[:, 0] % 28
+            mes = 1 + sorteio[:, 1] % 12
+            ano = 2020 + sorteio[:, 2] % 6
+
+            # Monta os 10 bytes de saída de acordo com o formato de cada valor
+            saida = np.empty((len(datas), 10), dtype=np.uint8)
+            eh_iso = iso[eh_data]
+            d1, d2 = 48 + dia // 10, 48 + dia % 10
+            m1, m2 = 48 + mes // 10, 48 + mes % 10
+            a = [48 + ano // 1000 % 10, 48 + ano // 100 % 10, 48 + ano // 10 % 10, 48 + ano % 10]
+            sep_data = mat[eh_data][:, 2]
+
+            saida[:, 0] = np.where(eh_iso, a[0], d1)
+            saida[:, 1] = np.where(eh_iso, a[1], d2)
+            saida[:, 2] = np.where(eh_iso, a[2], sep_data)
+            saida[:, 3] = np.where(eh_iso, a[3], m1)
+            saida[:, 4] = np.where(eh_iso, 45, m2)
+            saida[:, 5] = np.where(eh_iso, m1, sep_data)
+            saida[:, 6] = np.where(eh_iso, m2, a[0])
+            saida[:, 7] = np.where(eh_iso, 45, a[1])
+            saida[:, 8] = np.where(eh_iso, d1, a[2])
+            saida[:, 9] = np.where(eh_iso, d2, a[3])
+
+            bloco = saida.tobytes()
+            for j, i in enumerate(datas):
+                resultado[i] = bloco[j * 10:(j + 1) * 10]
+
+    # Valores que não são data: mesma regra do tipo numérico
+    restantes = [i for i, r in enumerate(resultado) if r is None]
+    if restantes:
+        numericos = _lote_numerico([brutos[i] for i in restantes])
+        for i, novo in zip(restantes, numericos):
+            resultado[i] = novo
+
+    return resultado
+
+
+def _vetorizavel(tipo, tamanho_lote):
+    return (np is not None and (tipo in TIPOS_NUMERICOS or tipo == "data")
+            and tamanho_lote >= _LOTE_MINIMO_VETORIZADO)
+
+
+def _lote_ascii(brutos, tipo):
+    """
+    Anonimiza valores ASCII distintos (bytes) pelo caminho vetorizado.
+    Não passa pelo cache: recalcular em lote custa menos que a contabilidade
+    do LRU valor a valor. Retorna {bytes_original: bytes_novo}.
+    """
+    calculados = _lote_data(brutos) if tipo == "data" else _lote_numerico(brutos)
+    return dict(zip(brutos, calculados))
+
+
+def anonimizar_lote(valores, tipo: str, usar_cache: bool = True) -> list:
+    """
+    Anonimiza uma coluna inteira (lista/array de strings) de um mesmo tipo.
+    O resultado é idêntico a chamar anonimizar() valor a valor; os tipos
+    numéricos e 'data' usam substituição vetorizada com NumPy (e, nesse
+    caminho, dispensam o cache).
+    """
+    valores = list(valores)
+    if not _vetorizavel(tipo, len(valores)):
+        # Valores repetidos dentro do lote são anonimizados uma única vez
+        lote = {}
+        for v in valores:
+            if v not in lote:
+                lote[v] = anonimizar(v, tipo, usar_cache)
+        return [lote[v] for v in valores]
+
+    # Caso comum: coluna toda ASCII e sem campos vazios, sem triagem
+    if all(isinstance(v, str) for v in valores) and "".join(valores).isascii() and all(map(str.strip, valores)):
+        brutos = [v.encode('ascii') for v in valores]
+        novos = _lote_data(brutos) if tipo == "data" else _lote_numerico(brutos)
+        return [b.decode('ascii') for b in novos]
+
+    resultado = list(valores)
+    pendentes = {}  # valor -> posições no lote (repetidos calculados uma vez)
+    for i, valor in enumerate(valores):
+        if not valor or not str(valor).strip():
+            continue
+        pendentes.setdefault(str(valor), []).append(i)
+
+    ascii_ = [v for v in pendentes if v.isascii()]
+    if ascii_:
+        novos = _lote_ascii([v.encode('ascii') for v in ascii_], tipo)
+        for valor in ascii_:
+            novo = novos[valor.encode('ascii')].decode('ascii')
+            for i in pendentes[valor]:
+                resultado[i] = novo
+
+    # Valores com caracteres fora do ASCII seguem o caminho escalar
+    for valor, posicoes in pendentes.items():
+        if not valor.isascii():
+            novo = anonimizar(valor, tipo, usar_cache)
+            for i in posicoes:
+                resultado[i] = novo
+
+    return resultado
+
+
+def anonimizar_lote_bytes(valores, tipo: str, encoding='utf-8', encoding_saida='utf-8',
+                          usar_cache: bool = True) -> list:
+    """
+    Versão de anonimizar_lote para campos ainda em bytes (modo bytes do pipeline).
+    Campos ASCII de tipos numéricos e 'data' são reescritos direto nos bytes,
+    sem decodificar; os demais são decodificados, anonimizados e codificados
+    de volta em 'encoding_saida'.
+    """
+    valores = list(valores)
+    resultado = list(valores)
+    texto = []  # posições que precisam passar pelo caminho de strings
+
+    if _vetorizavel(tipo, len(valores)):
+        # Caso comum: coluna toda ASCII e sem campos vazios, sem triagem
+        if b"".join(valores).isascii() and all(map(bytes.strip, valores)):
+            return _lote_data(valores) if tipo == "data" else _lote_numerico(valores)
+
+        pendentes = {}
+        for i, b in enumerate(valores):
+            if b.isascii() and b.strip():
+                pendentes.setdefault(b, []).append(i)
+            else:
+                texto.append(i)
+        if pendentes:
+            novos = _lote_ascii(list(pendentes), tipo)
+            for b, posicoes in pendentes.items():
+                for i in posicoes:
+                    resultado[i] = novos[b]
+    else:
+        texto = range(len(valores))
+
+    if texto:
+        decodificados = [valores[i].decode(encoding, errors="replace") for i in texto]
+        for i, novo in zip(texto, anonimizar_lote(decodificados, tipo, usar_cache)):
+            resultado[i] = novo.encode(encoding_saida, errors="replace")
+
+    return resultado
+
+
+# ============================================================================
+# COLUNAS COMPILADAS (formato fixo, vindo de um perfil salvo)
+# ============================================================================
+
+# Formatos de data reconhecidos por _anonimizar_data: regex e modelo de saída
+FORMATOS_DATA = {
+    "DD.MM.AAAA": (_RE_DATA_PONTO, "{d:02d}.{m:02d}.{a}"),
+    "DD/MM/AAAA": (_RE_DATA_BARRA, "{d:02d}/{m:02d}/{a}"),
+    "AAAA-MM-DD": (_RE_DATA_ISO, "{a}-{m:02d}-{d:02d}"),
+}
+# Dígitos ASCII -> '9' (a máscara de um valor numérico)
+_PARA_MASCARA = str.maketrans("012345678", "999999999")
+
+
+def mascara_de(valor: str):
+    """Máscara de um valor numérico ASCII ('123.456.789-09' -> '999.999.999-99'), ou None."""
+    valor = valor.strip()
+    if not valor or not valor.isascii() or not any(c.isdigit() for c in valor):
+        return None
+    return valor.translate(_PARA_MASCARA)
+
+
+def formato_data_de(valor: str):
+    """Nome do formato de data de um valor (chave de FORMATOS_DATA), ou None."""
+    for nome, (regex, _) in FORMATOS_DATA.items():
+        if regex.match(valor):
+            return nome
+    return None
+
+
+class ColunaCompilada:
+    """
+    Anonimização de uma coluna cujo formato é fixo e conhecido de antemão
+    (máscara de dígitos para CPF/CNPJ/números, ou um formato de data).
+    Cada valor no formato vira o preenchimento direto de um modelo, sem
+    passar pela escolha do tipo nem pelo reconhecimento do formato; o que
+    fugir do formato segue o caminho normal. O resultado é idêntico ao de
+    anonimizar_lote. Os métodos têm a mesma assinatura das funções de lote.
+    """
+
+    def __init__(self, tipo, mascara=None, formato=None):
+        self.tipo = tipo
+        self.mascara = mascara
+        self.formato = formato
+        if mascara is not None:
+            self._posicoes = [i for i, c in enumerate(mascara) if c == "9"]
+            # '999.999.999-99' -> '{0[0]}{0[1]}{0[2]}.{0[3]}...' (preenchido com os dígitos novos)
+            it = iter(range(len(self._posicoes)))
+            self._modelo = "".join(f"{{0[{next(it)}]}}" if c == "9" else c.replace("{", "{{").replace("}", "}}")
+                                   for c in mascara)
+        else:
+            self._regex, self._modelo = FORMATOS_DATA[formato]
+
+    def _preencher(self, valor):
+        """Valor novo pelo modelo, ou None se 'valor' não estiver no formato."""
+        if self.mascara is not None:
+            if len(valor) != len(self.mascara) or valor.translate(_PARA_MASCARA) != self.mascara:
+                return None
+            digitos = _Gerador(valor).bytes(len(self._posicoes)).translate(_TAB_DIGITOS).decode("ascii")
+            return self._modelo.format(digitos)
+        if not self._regex.match(valor):
+            return None
+        g = _Gerador(valor)
+        dia = 1 + g.abaixo(28)
+        mes = 1 + g.abaixo(12)
+        ano = 2020 + g.abaixo(6)
+        return self._modelo.format(d=dia, m=mes, a=ano)
+
+    def _lote_vetorizado(self, brutos):
+        """Valores ASCII não vazios (bytes) pelo caminho NumPy, já sabendo o formato."""
+        if self.formato is not None:
+            return _lote_data(brutos, self.formato)
+
+        largura = len(self.mascara)
+        resultado = [None] * len(brutos)
+        # Caso comum: todos com a largura da máscara, sem triagem
+        no_formato = range(len(brutos)) if set(map(len, brutos)) == {largura} else \
+            [i for i, b in enumerate(brutos) if len(b) == largura]
+        if no_formato:
+            selecionados = brutos if len(no_formato) == len(brutos) else [brutos[i] for i in no_formato]
+            mat = np.frombuffer(b"".join(selecionados), dtype=np.uint8).reshape(-1, largura).copy()
+            esperado = np.frombuffer(self.mascara.encode("ascii"), dtype=np.uint8)
+            confere = np.where(esperado == 57, (mat >= 48) & (mat <= 57), mat == esperado).all(axis=1)
+            if not confere.all():
+                linhas = np.flatnonzero(confere)
+                no_formato = [no_formato[j] for j in linhas.tolist()]
+                selecionados = [selecionados[j] for j in linhas.tolist()]
+                mat = mat[linhas]
+            if no_formato:
+                n = len(self._posicoes)
+                fluxo = np.frombuffer(_fluxos(selecionados, [n] * len(selecionados)), dtype=np.uint8)
+                mat[:, self._posicoes] = 48 + fluxo.reshape(-1, n) % 10
+                bloco = mat.tobytes()
+                for k, i in enumerate(no_formato):
+                    resultado[i] = bloco[k * largura:(k + 1) * largura]
+
+        # Fora da máscara: mesma regra do tipo numérico
+        restantes = [i for i, r in enumerate(resultado) if r is None]
+        if restantes:
+            for i, novo in zip(restantes, _lote_numerico([brutos[i] for i in restantes])):
+                resultado[i] = novo
+        return resultado
+
+    def lote(self, valores, tipo=None, usar_cache: bool = True) -> list:
+        """Como anonimizar_lote, para a coluna compilada."""
+        tipo = self.tipo
+        valores = list(valores)
+        if _vetorizavel(tipo, len(valores)):
+            if all(isinstance(v, str) for v in valores) and "".join(valores).isascii() and all(map(str.strip, valores)):
+                novos = self._lote_vetorizado([v.encode("ascii") for v in valores])
+                return [b.decode("ascii") for b in novos]
+            return anonimizar_lote(valores, tipo, usar_cache)
+
+        # Lote pequeno (ou sem NumPy): modelo valor a valor, repetidos uma vez só
+        lote = {}
+        for v in valores:
+            if v in lote:
+                continue
+            novo = _CACHE.get((v, tipo)) if usar_cache else None
+            if novo is None:
+                novo = self._preencher(v) if isinstance(v, str) else None
+                if novo is None:
+                    novo = anonimizar(v, tipo, usar_cache)
+                elif usar_cache:
+                    _CACHE.put((v, tipo), novo)
+            lote[v] = novo
+        return [lote[v] for v in valores]
+
+    def lote_bytes(self, valores, tipo=None, encoding='utf-8', encoding_saida='utf-8',
+                   usar_cache: bool = True) -> list:
+        """Como anonimizar_lote_bytes, para a coluna compilada."""
+        valores = list(valores)
+        if _vetorizavel(self.tipo, len(valores)) and b"".join(valores).isascii() and all(map(bytes.strip, valores)):
+            return self._lote_vetorizado(valores)
+        decodificados = [v.decode(encoding, errors="replace") for v in valores]
+        return [n.encode(encoding_saida, errors="replace") for n in self.lote(decodificados, usar_cache=usar_cache)]
@@ -0,0 +1,156 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/checkpoint.py
+# Checkpoints do processar: retomada após interrupção e modo incremental
+# ============================================================================
+
+import hashlib
+import json
+import os
+import time
+
+from features.anonymizer.anonymizer_core import chave_atual
+
+# Extensão do arquivo de checkpoint, gravado ao lado da saída
+SUFIXO_CHECKPOINT = ".ckpt"
+# Intervalo mínimo entre dois checkpoints (cada um faz fsync da saída)
+INTERVALO_CHECKPOINT_S = 10.0
+# Bytes da entrada usados na assinatura (início do arquivo e antes do offset)
+_JANELA_ASSINATURA = 64 * 1024
+_VERSAO = 1
+
+
+def assinatura_entrada(entrada, ate):
+    """
+    Hash do início do arquivo e dos bytes logo antes de 'ate'. Confirma que
+    o trecho já processado continua igual (o arquivo só ganhou linhas).
+    """
+    h = hashlib.blake2b(str(ate).encode("ascii"), digest_size=16)
+    with open(entrada, "rb") as f:
+        h.update(f.read(min(ate, _JANELA_ASSINATURA)))
+        if ate > _JANELA_ASSINATURA:
+            inicio = max(ate - _JANELA_ASSINATURA, _JANELA_ASSINATURA)
+            f.seek(inicio)
+            h.update(f.read(ate - inicio))
+    return h.hexdigest()
+
+
+def impressao_digital(layout, tipos, enc, enc_saida, modo_bytes):
+    """
+    Resumo de tudo que define a saída: layout, tipos das colunas, encodings,
+    modo e o segredo do projeto (só o hash dele). Se algo mudar, o
+    checkpoint não vale mais e o arquivo é processado do início.
+    """
+    dados = {
+        "header": [layout["header"].get("start_line"), layout["header"].get("end_line")],
+        "data": layout["data"]["start_line"],
+        "separator": layout.get("separator"),
+        "quote": layout.get("quote", '"'),
+        "tipos": {str(i): t for i, t in tipos.items()},
+        "enc": enc,
+        "enc_saida": enc_saida,
+        "modo_bytes": modo_bytes,
+        "chave": hashlib.blake2b(chave_atual(), digest_size=16).hexdigest(),
+    }
+    if layout.get("fixed_width"):
+        # Só quando presente: checkpoints de arquivos delimitados continuam valendo
+        dados["fixed_width"] = [list(coluna) for coluna in layout["fixed_width"]]
+    return hashlib.blake2b(json.dumps(dados, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def carregar_retomada(caminho_saida, caminho_parcial, entrada, incremental=False):
+    """
+    Estado salvo para continuar o processamento de 'entrada', ou None.
+    Um checkpoint incompleto retoma a execução interrompida (a partir de
+    'caminho_parcial'); um completo só é usado no modo incremental, para
+    anonimizar apenas as linhas acrescentadas desde a última execução.
+    """
+    try:
+        with open(caminho_saida + SUFIXO_CHECKPOINT, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if dados.get("versao") != _VERSAO:
+        return None
+
+    if dados["completo"]:
+        if not incremental:
+            return None
+        arquivo = caminho_saida if os.path.exists(caminho_saida) else caminho_parcial
+    else:
+        arquivo = caminho_parcial
+
+    if not os.path.exists(arquivo) or os.path.getsize(arquivo) < dados["bytes_saida"]:
+        print("⚠️ Checkpoint sem o arquivo de saída correspondente; processando do início.")
+        return None
+    if (os.path.getsize(entrada) < dados["bytes_entrada"]
+            or assinatura_entrada(entrada, dados["bytes_entrada"]) != dados["assinatura"]):
+        print("⚠️ A entrada mudou desde o checkpoint; processando do início.")
+        return None
+
+    dados["arquivo"] = arquivo
+    dados["tipos"] = {int(i): t for i, t in dados["tipos"].items()}
+    return dados
+
+
+class GravadorCheckpoint:
+    """
+    Grava periodicamente onde o processamento está: offset na entrada
+    (sempre no início de um registro), offset na saída, linhas e índice da
+    próxima linha, junto com a impressão digital do layout e dos tipos.
+    limite: início do último registro quando a entrada não termina em '\n'.
+    Esse registro ainda pode crescer (o modo incremental acrescenta o resto
+    dele), então nenhum checkpoint passa do limite e o que chega nele é
+    sempre gravado: a próxima execução refaz o registro inteiro.
+    """
+
+    def __init__(self, caminho_saida, entrada, impressao, enc, tipos, linhas_base=0,
+                 intervalo=INTERVALO_CHECKPOINT_S, limite=None):
+        self.caminho = caminho_saida + SUFIXO_CHECKPOINT
+        self.entrada = entrada
+        self.linhas_base = linhas_base  # Linhas gravadas por execuções anteriores
+        self.intervalo = intervalo
+        self.limite = limite
+        self.estado = {
+            "versao": _VERSAO,
+            "impressao": impressao,
+            "enc": enc,
+            "tipos": {str(i): t for i, t in tipos.items()},
+            "completo": False,
+        }
+        self._ultimo = time.perf_counter()
+
+    def registrar(self, bytes_entrada, proximo_idx, linhas, fout, forcar=False):
+        """
+        Grava um checkpoint se o intervalo já passou (ou se forcar=True).
+        'linhas' são as linhas anonimizadas nesta execução.
+        """
+        if self.limite is not None:
+            if bytes_entrada > self.limite:
+                return
+            forcar = forcar or bytes_entrada == self.limite
+        if not forcar and time.perf_counter() - self._ultimo < self.intervalo:
+            return
+        # A saída precisa estar no disco antes do checkpoint que aponta para ela
+        fout.flush()
+        os.fsync(fout.fileno())
+        bruto = getattr(fout, "buffer", fout)
+        self.estado.update({
+            "bytes_entrada": bytes_entrada,
+            "bytes_saida": bruto.tell(),
+            "proximo_idx": proximo_idx,
+            "linhas": self.linhas_base + linhas,
+            "assinatura": assinatura_entrada(self.entrada, bytes_entrada),
+        })
+        self._gravar()
+
+    def concluir(self):
+        """Marca a execução como completa (base para o modo incremental)."""
+        self.estado["completo"] = True
+        self._gravar()
+
+    def _gravar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f)
+        os.replace(temporario, self.caminho)
+        self._ultimo = time.perf_counter()
@@ -1,67 +1,129 @@
 import re
 from collections import Counter
+from datetime import date, datetime
+from core.tokenizer import split_fields
 
-def detectar_tipos(linhas, sep):
+# Regras de detecção (Inteligência) combinadas em um único padrão compilado.
+# As alternativas seguem a ordem de prioridade: a primeira que casar vence.
+_RE_CLASSIFICADOR = re.compile(
+    r"(?P<email>[^@]+@[^@]+\.[^@]+$)"
+    r"|(?P<cnpj>\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}$)"
+    r"|(?P<cpf>\d{3}\.?\d{3}\.?\d{3}-?\d{2}$)"
+    r"|(?P<data>\d{2}[-/.]\d{2}[-/.]\d{4}|\d{4}[-/.]\d{2}[-/.]\d{2})"
+    r"|(?P<valor>\d+[.,]\d{2}$)"
+    r"|(?P<numero>\d+$)"
+    r"|(?P<uf>[A-Za-z]{2}$)"
+    r"|(?P<empresa>(?is:.*?(?:LTDA|S\.A| SA|EIRELI|MEI|INC)))"
+)
+
+# Fração mínima de votos para aceitar o tipo vencedor de uma coluna
+CONFIANCA_MINIMA = 0.3
+
+
+def classificar_valor(c):
+    """Classifica um único valor (já sem espaços nas pontas) em um tipo."""
+    m = _RE_CLASSIFICADOR.match(c)
+    if m:
+        return m.lastgroup
+    if c.isdigit():
+        return "numero"
+    if " " in c and sum(1 for char in c if char.isalpha()) > 3:
+        # Nome de pessoa geralmente tem espaço e letras
+        return "pessoa"
+    return "texto"
+
+
+def detectar_tipos_com_confianca(linhas, sep, max_linhas=None, aspas='"', larguras=None):
     """
     Analisa as colunas e determina o tipo de dado predominante em cada uma.
-    Usa uma abordagem de 'votação' para evitar falsos positivos em linhas sujas.
+    Retorna (tipos, confianca), onde confianca[i] é a fração dos valores
+    não vazios da coluna que concordam com o tipo escolhido.
+    larguras: colunas de largura fixa, no lugar do separador.
     """
     if not linhas:
-        return {}
+        return {}, {}
 
-    num_colunas = len(linhas[0].split(sep))
+    amostra = linhas[:max_linhas] if max_linhas else linhas
+    linhas_campos = [split_fields(linha, sep, aspas, larguras) for linha in amostra]
+    num_colunas = max(map(len, linhas_campos))
     contagem_tipos = {i: Counter() for i in range(num_colunas)}
-    
-    # Analisa uma amostra maior para melhor precisão (até 100 linhas)
-    amostra = linhas[:100]
 
-    for linha in amostra:
-        campos = linha.split(sep)
+    for campos in linhas_campos:
         for i, c in enumerate(campos):
-            if i >= num_colunas: break
-            
             c = c.strip()
-            if not c:
-                continue
-
-            # Regras de detecção (Inteligência)
-            if re.match(r"^[^@]+@[^@]+\.[^@]+$", c):
-                contagem_tipos[i]["email"] += 1
-            elif re.match(r"^\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}$", c):
-                contagem_tipos[i]["cnpj"] += 1
-            elif re.match(r"^\d{3}\.?\d{3}\.?\d{3}-?\d{2}$", c):
-                contagem_tipos[i]["cpf"] += 1
-            elif re.match(r"^\d{2}[-/.]\d{2}[-/.]\d{4}", c) or re.match(r"^\d{4}[-/.]\d{2}[-/.]\d{2}", c):
-                contagem_tipos[i]["data"] += 1
-            elif re.match(r"^\d+([.,]\d{2})?$", c) and ("." in c or "," in c):
-                contagem_tipos[i]["valor"] += 1
-            elif c.isdigit():
-                contagem_tipos[i]["numero"] += 1
-            elif re.fullmatch(r"[A-Z]{2}", c.upper()):
-                contagem_tipos[i]["uf"] += 1
-            elif any(x in c.upper() for x in ["LTDA", "S.A", " SA", "EIRELI", "MEI", "INC"]):
-                contagem_tipos[i]["empresa"] += 1
-            elif " " in c and sum(1 for char in c if char.isalpha()) > 3:
-                # Nome de pessoa geralmente tem espaço e letras
-                contagem_tipos[i]["pessoa"] += 1
-            else:
-                contagem_tipos[i]["texto"] += 1
+            if c:
+                contagem_tipos[i][classificar_valor(c)] += 1
+
+    return _votar(contagem_tipos)
+
+
+def classificar_celula(v):
+    """
+    Classifica uma célula tipada de planilha. Números e datas já vêm
+    com o tipo certo; só os textos passam pelas expressões regulares.
+    Retorna None para células vazias ou sem tipo relevante.
+    """
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, int):
+        return "numero"
+    if isinstance(v, float):
+        return "numero" if v.is_integer() else "valor"
+    if isinstance(v, (datetime, date)):
+        return "data"
+    c = str(v).strip()
+    return classificar_valor(c) if c else None
+
+
+def detectar_tipos_celulas(linhas, max_linhas=None):
+    """
+    Igual a detectar_tipos_com_confianca, mas para linhas de células
+    (tuplas de valores lidas de uma planilha).
+    """
+    if not linhas:
+        return {}, {}
 
+    amostra = linhas[:max_linhas] if max_linhas else linhas
+    num_colunas = max(map(len, amostra))
+    contagem_tipos = {i: Counter() for i in range(num_colunas)}
+
+    for celulas in amostra:
+        for i, v in enumerate(celulas):
+            tipo = classificar_celula(v)
+            if tipo:
+                contagem_tipos[i][tipo] += 1
+
+    return _votar(contagem_tipos)
+
+
+def _votar(contagem_tipos):
+    """Escolhe o tipo vencedor de cada coluna a partir da contagem de votos."""
     tipos_finais = {}
-    
+    confianca = {}
+
     # Define o tipo vencedor para cada coluna
     for i, counter in contagem_tipos.items():
         if not counter:
             tipos_finais[i] = "texto"
+            confianca[i] = 0.0
+            continue
+
+        # Pega o tipo mais comum na coluna
+        tipo, qtd = counter.most_common(1)[0]
+        total = sum(counter.values())
+        # Se a confiança for muito baixa (menos de 30% das linhas não vazias), assume texto
+        if (qtd / total) > CONFIANCA_MINIMA:
+            tipos_finais[i] = tipo
         else:
-            # Pega o tipo mais comum na coluna
-            comum = counter.most_common(1)[0]
-            tipo, qtd = comum
-            # Se a confiança for muito baixa (menos de 30% das linhas não vazias), assume texto
-            total = sum(counter.values())
-            if (qtd / total) > 0.3:
-                tipos_finais[i] = tipo
-            else:
-                tipos_finais[i] = "texto"
-
-    return tipos_finais
\ No newline at end of file
+            tipos_finais[i] = "texto"
+        confianca[i] = counter[tipos_finais[i]] / total
+
+    return tipos_finais, confianca
+
+
+def detectar_tipos(linhas, sep, max_linhas=None, aspas='"', larguras=None):
+    """
+    Analisa as colunas e determina o tipo de dado predominante em cada uma.
+    Usa uma abordagem de 'votação' para evitar falsos positivos em linhas sujas.
+    """
+    return detectar_tipos_com_confianca(linhas, sep, max_linhas, aspas, larguras)[0]
@@ -0,0 +1,199 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/estatisticas.py
+# Estatísticas de execução do pipeline e gancho de profiling
+# ============================================================================
+
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from features.anonymizer.anonymizer_core import contadores_cache, estatisticas_erros
+
+# Variável de ambiente que liga o profiling do processar:
+# "1" imprime as funções mais caras; um caminho também grava o .prof
+VARIAVEL_PROFILING = "ANON_PROFILE"
+# Quantas funções o resumo do profiling mostra
+LINHAS_PROFILING = 25
+
+
+def novas_medidas():
+    """Acumuladores de um processo (serial ou worker), somados depois no pai."""
+    return {
+        "tempo_coluna": Counter(),
+        "tempo_tipo": Counter(),
+        "valores_tipo": Counter(),
+        "cache_hits": Counter(),
+        "cache_misses": Counter(),
+        "erros": Counter(),
+        "mapa_hits": Counter(),
+        "mapa_misses": Counter(),
+        "tabela_hits": Counter(),
+        "tabela_misses": Counter(),
+    }
+
+
+def medir_coluna(medidas, coluna, tipo, valores, segundos):
+    """Registra o tempo gasto para anonimizar um pedaço de uma coluna."""
+    medidas["tempo_coluna"][coluna] += segundos
+    medidas["tempo_tipo"][tipo] += segundos
+    medidas["valores_tipo"][tipo] += valores
+
+
+def somar_medidas(destino, origem):
+    for chave, contador in origem.items():
+        destino[chave].update(contador)
+
+
+def contadores_globais():
+    """Cópia dos contadores globais do processo (cache e erros)."""
+    hits, misses = contadores_cache()
+    return {"cache_hits": hits, "cache_misses": misses, "erros": Counter(estatisticas_erros())}
+
+
+def diferenca_contadores(antes):
+    """O que os contadores globais acumularam desde 'antes'."""
+    agora = contadores_globais()
+    return {chave: agora[chave] - antes[chave] for chave in agora}
+
+
+class EstatisticasProcessamento:
+    """
+    Números de uma execução do processar: tempos por fase, tempo por coluna
+    e por tipo, valores por tipo, acertos do cache, linhas, bytes e erros,
+    e a estratégia escolhida para cada coluna com a cardinalidade estimada.
+    encoding e encoding_saida são os usados na leitura e na gravação (a
+    visualização lê a saída com o segundo).
+    """
+
+    def __init__(self, entrada):
+        self.entrada = entrada
+        self.linhas = 0
+        self.bytes = 0
+        self.encoding = None
+        self.encoding_saida = None
+        self.fases = {}
+        self.medidas = novas_medidas()
+        self.estrategias = {}  # {coluna: {"estrategia", "cardinalidade_estimada", "valores_amostra"}}
+        self.total_s = 0.0
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def fase(self, nome):
+        """Cronometra um trecho do pipeline (acumula se repetido)."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nome] = self.fases.get(nome, 0.0) + time.perf_counter() - t
+
+    def somar(self, medidas):
+        somar_medidas(self.medidas, medidas)
+
+    def finalizar(self, linhas):
+        self.linhas = linhas
+        self.bytes = os.path.getsize(self.entrada)
+        self.total_s = time.perf_counter() - self._inicio
+        return self
+
+    @property
+    def taxa_acerto_cache(self):
+        hits = sum(self.medidas["cache_hits"].values())
+        total = hits + sum(self.medidas["cache_misses"].values())
+        return hits / total if total else 0.0
+
+    @property
+    def taxa_reuso_mapeamento(self):
+        """Fração dos valores encontrada no mapeamento persistente (None se não usado)."""
+        hits = sum(self.medidas["mapa_hits"].values())
+        total = hits + sum(self.medidas["mapa_misses"].values())
+        return hits / total if total else None
+
+    @property
+    def taxa_acerto_tabelas(self):
+        """Fração dos valores das colunas com tabela que já estavam nela (None se nenhuma)."""
+        hits = sum(self.medidas["tabela_hits"].values())
+        total = hits + sum(self.medidas["tabela_misses"].values())
+        return hits / total if total else None
+
+    @property
+    def erros(self):
+        return sum(self.medidas["erros"].values())
+
+    @property
+    def linhas_por_segundo(self):
+        return self.linhas / self.total_s if self.total_s else 0.0
+
+    def como_dict(self):
+        return {
+            "entrada": self.entrada,
+            "linhas": self.linhas,
+            "bytes": self.bytes,
+            "encoding": self.encoding,
+            "encoding_saida": self.encoding_saida,
+            "total_s": self.total_s,
+            "linhas_por_segundo": self.linhas_por_segundo,
+            "fases_s": dict(self.fases),
+            "tempo_coluna_s": {str(c): s for c, s in sorted(self.medidas["tempo_coluna"].items())},
+            "tempo_tipo_s": dict(self.medidas["tempo_tipo"]),
+            "valores_tipo": dict(self.medidas["valores_tipo"]),
+            "taxa_acerto_cache": self.taxa_acerto_cache,
+            "taxa_reuso_mapeamento": self.taxa_reuso_mapeamento,
+            "erros_por_tipo": dict(self.medidas["erros"]),
+            "estrategia_coluna": {
+                str(c): dict(e, acertos_tabela=self.medidas["tabela_hits"][c],
+                             falhas_tabela=self.medidas["tabela_misses"][c])
+                for c, e in sorted(self.estrategias.items())
+            },
+            "taxa_acerto_tabelas": self.taxa_acerto_tabelas,
+        }
+
+    def resumo(self):
+        """Texto curto para o terminal."""
+        fases = ", ".join(f"{nome} {s:.2f}s" for nome, s in self.fases.items())
+        linhas = [
+            f"   {self.linhas:,} linhas em {self.total_s:.2f}s ({self.linhas_por_segundo:,.0f} linhas/s)",
+            f"   Fases: {fases}",
+            f"   Cache: {self.taxa_acerto_cache:.0%} de acertos • Erros: {self.erros}",
+        ]
+        if self.taxa_reuso_mapeamento is not None:
+            linhas.append(f"   Mapeamento: {self.taxa_reuso_mapeamento:.0%} dos valores reaproveitados")
+        if self.estrategias:
+            por_estrategia = {}
+            for c, e in sorted(self.estrategias.items()):
+                por_estrategia.setdefault(e["estrategia"], []).append(f"{c} (~{e['cardinalidade_estimada']})")
+            linhas.append("   Estratégias: " + " • ".join(f"{nome}: {', '.join(colunas)}"
+                                                         for nome, colunas in por_estrategia.items()))
+        if self.taxa_acerto_tabelas is not None:
+            linhas.append(f"   Tabelas: {self.taxa_acerto_tabelas:.0%} dos valores já estavam na tabela")
+        por_tipo = self.medidas["tempo_tipo"].most_common()
+        if por_tipo:
+            linhas.append("   Tempo por tipo: " + ", ".join(f"{t} {s:.2f}s" for t, s in por_tipo))
+        return "\n".join(linhas)
+
+
+@contextmanager
+def perfilador():
+    """
+    Profiling opcional, ligado pela variável de ambiente ANON_PROFILE
+    (sem mudar código). Com workers > 1 só o processo principal é medido.
+    """
+    destino = os.environ.get(VARIAVEL_PROFILING)
+    if not destino:
+        yield
+        return
+
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        if destino != "1":
+            perfil.dump_stats(destino)
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(LINHAS_PROFILING)
+        print(texto.getvalue())
@@ -0,0 +1,56 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/estrategias.py
+# Estratégia de cada coluna a partir da cardinalidade estimada na amostra
+# ============================================================================
+
+from core.cardinality import HyperLogLog
+
+# Estratégias por coluna
+ESTRATEGIA_TABELA = "tabela"        # Poucos valores: tabela completa montada uma vez
+ESTRATEGIA_CACHE = "cache"          # Intermediária: cache LRU global (comportamento padrão)
+ESTRATEGIA_SEM_CACHE = "sem_cache"  # Quase tudo distinto: memorizar só custa
+ESTRATEGIA_MANTER = "manter"        # Copiada sem anonimizar (perfil)
+
+# Tabela: no máximo este número de distintos na amostra, e cada valor
+# repetido em média pelo menos 1 / FRACAO_MAXIMA_TABELA vezes
+LIMITE_TABELA = 64
+FRACAO_MAXIMA_TABELA = 0.25
+# Sem cache: distintos em pelo menos esta fração dos valores da amostra
+FRACAO_MINIMA_SEM_CACHE = 0.9
+# Com menos valores não dá para decidir: fica no cache
+AMOSTRA_MINIMA = 50
+# Valores fora da amostra entram na tabela até este limite (por processo)
+TABELA_MAX_ITENS = 4096
+# Precisão dos contadores: a amostra tem poucas centenas de valores
+PRECISAO_HLL = 10
+
+
+def estimar_cardinalidades(linhas_campos):
+    """
+    Valores distintos estimados por coluna: {índice: (estimativa, valores)},
+    onde 'valores' é quantos campos não vazios a coluna teve na amostra.
+    """
+    contadores = {}
+    valores = {}
+    for campos in linhas_campos:
+        for i, campo in enumerate(campos):
+            if not campo.strip():
+                continue
+            if i not in contadores:
+                contadores[i] = HyperLogLog(PRECISAO_HLL)
+                valores[i] = 0
+            contadores[i].add(campo)
+            valores[i] += 1
+    # Com poucos valores o erro pode passar do total; distintos nunca passam
+    return {i: (min(len(contador), valores[i]), valores[i]) for i, contador in contadores.items()}
+
+
+def escolher_estrategia(estimativa, valores):
+    """Estratégia de uma coluna com 'estimativa' distintos em 'valores' campos da amostra."""
+    if valores < AMOSTRA_MINIMA:
+        return ESTRATEGIA_CACHE
+    if estimativa <= LIMITE_TABELA and estimativa <= valores * FRACAO_MAXIMA_TABELA:
+        return ESTRATEGIA_TABELA
+    if estimativa >= valores * FRACAO_MINIMA_SEM_CACHE:
+        return ESTRATEGIA_SEM_CACHE
+    return ESTRATEGIA_CACHE
@@ -0,0 +1,447 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/excel.py
+# Leitura e escrita de planilhas .xlsx em streaming (openpyxl)
+# ============================================================================
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import partial
+
+try:
+    import openpyxl
+except ImportError:  # Sem openpyxl só os arquivos delimitados são aceitos
+    openpyxl = None
+
+from core.line_index import WINDOW_CACHE_SIZE, WINDOW_LINES
+from features.anonymizer.column_detector import detectar_tipos_celulas
+from features.anonymizer.estatisticas import (
+    EstatisticasProcessamento, contadores_globais, diferenca_contadores, medir_coluna,
+    novas_medidas, somar_medidas,
+)
+from features.anonymizer.mapeamento import abrir_mapeamento, fechar_mapeamento
+from features.anonymizer.anonymizer_core import (
+    TIPOS_NUMERICOS, anonimizar_lote, chave_atual, limpar_cache, resetar_erros, usar_chave,
+)
+from features.anonymizer.leitura import AMOSTRA_LINHAS, Progresso
+from features.anonymizer.pipeline import LIMITE_COMPARACAO, SUFIXO_PARCIAL, caminho_saida_para
+
+# Linhas de uma planilha anonimizadas por vez (coluna a coluna)
+TAMANHO_LOTE_EXCEL = 5_000
+
+
+def _exigir_openpyxl():
+    if openpyxl is None:
+        raise ImportError("O pacote 'openpyxl' é necessário para arquivos Excel (pip install openpyxl).")
+
+
+def _abrir(entrada):
+    """Abre a planilha em modo somente leitura (as linhas são lidas sob demanda)."""
+    _exigir_openpyxl()
+    return openpyxl.load_workbook(entrada, read_only=True, data_only=True)
+
+
+def nomes_planilhas(entrada):
+    wb = _abrir(entrada)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def ler_linhas_xlsx(entrada, planilha=None, inicio=0, max_linhas=None):
+    """
+    Gera as linhas (tuplas de valores) de uma planilha sem carregar o
+    arquivo inteiro. planilha=None usa a primeira; inicio é 0-based.
+    """
+    wb = _abrir(entrada)
+    try:
+        ws = wb[planilha] if planilha else wb.worksheets[0]
+        max_row = inicio + max_linhas if max_linhas else None
+        yield from ws.iter_rows(min_row=inicio + 1, max_row=max_row, values_only=True)
+    finally:
+        wb.close()
+
+
+def celula_para_texto(v):
+    """Representação de uma célula para a prévia e a comparação."""
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.strftime("%d/%m/%Y %H:%M:%S") if v.time() != datetime.min.time() else v.strftime("%d/%m/%Y")
+    if isinstance(v, date):
+        return v.strftime("%d/%m/%Y")
+    return str(v)
+
+
+def linha_para_texto(celulas, sep=" | "):
+    return sep.join(celula_para_texto(v) for v in celulas)
+
+
+class FontePlanilha:
+    """
+    Linhas de uma planilha (como texto) sob demanda para a prévia, com a
+    mesma interface de LineSource. A pasta de trabalho fica aberta e a
+    leitura avança em um único fluxo: cada janela de WINDOW_LINES linhas é
+    lida uma vez e as recentes ficam em memória (LRU de WINDOW_CACHE_SIZE).
+    Só voltar a uma janela já descartada relê a planilha desde o início.
+    Pode ser usada por várias threads.
+    """
+
+    def __init__(self, entrada, planilha=None):
+        self.entrada = entrada
+        self.planilha = planilha
+        self._wb = None
+        self._linhas = None    # Fluxo de linhas da planilha
+        self._proxima = 0      # Linha que o fluxo entrega em seguida
+        self._lidas = 0        # Linhas já vistas (total conhecido até agora)
+        self._fim = False
+        self._janelas = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def line_count(self):
+        return self._lidas
+
+    @property
+    def complete(self):
+        return self._fim
+
+    def read_lines(self, start, stop):
+        """Linhas [start, stop) já convertidas em texto (menos, se a planilha acabar antes)."""
+        with self._lock:
+            linhas = []
+            for numero in range(start // WINDOW_LINES, max(stop - 1, start) // WINDOW_LINES + 1):
+                base = numero * WINDOW_LINES
+                janela = self._janela(numero)
+                linhas.extend(janela[max(start - base, 0):stop - base])
+                if len(janela) < WINDOW_LINES:
+                    break
+            return linhas
+
+    def _janela(self, numero):
+        janela = self._janelas.get(numero)
+        if janela is not None:
+            self._janelas.move_to_end(numero)
+            return janela
+        inicio = numero * WINDOW_LINES
+        if self._linhas is None or self._proxima > inicio:
+            self._reabrir()
+        # Pula até a janela pedida (o fluxo do openpyxl só anda para frente)
+        for _ in range(inicio - self._proxima):
+            if next(self._linhas, None) is None:
+                break
+            self._proxima += 1
+        janela = []
+        if self._proxima == inicio:
+            for celulas in self._linhas:
+                janela.append(linha_para_texto(celulas))
+                if len(janela) == WINDOW_LINES:
+                    break
+            self._proxima += len(janela)
+        if len(janela) < WINDOW_LINES:
+            self._fim = True
+        self._lidas = max(self._lidas, self._proxima)
+        self._janelas[numero] = janela
+        if len(self._janelas) > WINDOW_CACHE_SIZE:
+            self._janelas.popitem(last=False)
+        return janela
+
+    def _reabrir(self):
+        if self._wb is None:
+            self._wb = _abrir(self.entrada)
+        ws = self._wb[self.planilha] if self.planilha else self._wb.worksheets[0]
+        self._linhas = ws.iter_rows(values_only=True)
+        self._proxima = 0
+
+    def close(self):
+        with self._lock:
+            self._janelas.clear()
+            self._linhas = None
+            if self._wb is not None:
+                self._wb.close()
+                self._wb = None
+
+
+def _anonimizar_coluna(coluna, tipo, usar_cache, anonimizar=anonimizar_lote):
+    """
+    Anonimiza uma coluna de células mantendo o tipo de cada uma: números
+    continuam números e datas continuam datas. Textos usam o tipo da coluna.
+    'anonimizar' é a função de lote (a do mapeamento persistente, se houver).
+    """
+    resultado = list(coluna)
+    # Grupos por tipo efetivo: tipo -> (posições, textos)
+    grupos = {}
+
+    def incluir(tipo_celula, i, texto):
+        posicoes, textos = grupos.setdefault(tipo_celula, ([], []))
+        posicoes.append(i)
+        textos.append(texto)
+
+    for i, v in enumerate(coluna):
+        if v is None or isinstance(v, bool):
+            continue
+        if isinstance(v, (int, float)):
+            incluir(tipo if tipo in TIPOS_NUMERICOS else "numero", i, repr(v))
+        elif isinstance(v, (datetime, date)):
+            incluir("data", i, v.strftime("%Y-%m-%d"))
+        elif isinstance(v, str):
+            incluir(tipo, i, v)
+
+    for tipo_celula, (posicoes, textos) in grupos.items():
+        novos = anonimizar(textos, tipo_celula, usar_cache=usar_cache)
+        for i, novo in zip(posicoes, novos):
+            resultado[i] = _restaurar_tipo(coluna[i], novo)
+    return resultado
+
+
+def _restaurar_tipo(original, novo):
+    """Converte o texto anonimizado de volta para o tipo da célula original."""
+    try:
+        if isinstance(original, int):
+            return int(novo)
+        if isinstance(original, float):
+            return float(novo)
+        if isinstance(original, (datetime, date)):
+            ano, mes, dia = map(int, novo.split("-"))
+            return original.replace(year=ano, month=mes, day=dia)
+    except ValueError:
+        pass  # Formato inesperado: grava o texto anonimizado
+    return novo
+
+
+def _anonimizar_lote_celulas(lote, cfg):
+    anonimizar = anonimizar_lote
+    if cfg.get("mapeamento"):
+        mapa = abrir_mapeamento(cfg["mapeamento"], somente_leitura=cfg.get("mapa_somente_leitura", False))
+        anonimizar = partial(mapa.anonimizar_lote, anonimizar_lote=anonimizar_lote, medidas=cfg["medidas"])
+    largura = max(map(len, lote))
+    linhas = [list(celulas) + [None] * (largura - len(celulas)) for celulas in lote]
+    colunas = []
+    for i, coluna in enumerate(zip(*linhas)):
+        tipo = cfg["tipos"].get(i, "texto")
+        t = time.perf_counter()
+        colunas.append(_anonimizar_coluna(coluna, tipo, i not in cfg["sem_cache"], anonimizar))
+        medir_coluna(cfg["medidas"], i, tipo, len(coluna), time.perf_counter() - t)
+    return [list(celulas) for celulas in zip(*colunas)]
+
+
+def _linhas_planilha(entrada, planilha, cfg, comparacao):
+    """
+    Gera (linha, anonimizada) para cada linha de saída de uma planilha,
+    aplicando as regras do layout (cabeçalho copiado, dados em lotes).
+    """
+    hs, he = cfg["hs"], cfg["he"]
+    start_data_idx = cfg["start_data_idx"]
+
+    # Tipos detectados pelas células tipadas da amostra de dados
+    amostra = list(ler_linhas_xlsx(entrada, planilha, start_data_idx, AMOSTRA_LINHAS))
+    cfg = dict(cfg, tipos=detectar_tipos_celulas(amostra)[0])
+
+    lote = []
+
+    def descarregar():
+        novas = _anonimizar_lote_celulas(lote, cfg)
+        faltam = LIMITE_COMPARACAO - len(comparacao)
+        if faltam > 0:
+            comparacao.extend((linha_para_texto(o), linha_para_texto(n))
+                              for o, n in zip(lote[:faltam], novas[:faltam]))
+        lote.clear()
+        return [(linha, True) for linha in novas]
+
+    for idx, celulas in enumerate(ler_linhas_xlsx(entrada, planilha)):
+        if hs is not None and he is not None and hs <= idx <= he:
+            if lote:
+                yield from descarregar()
+            yield list(celulas), False
+            continue
+
+        if idx < start_data_idx or all(v is None for v in celulas):
+            continue
+
+        lote.append(celulas)
+        if len(lote) >= TAMANHO_LOTE_EXCEL:
+            yield from descarregar()
+
+    if lote:
+        yield from descarregar()
+
+
+def _processar_planilha(entrada, planilha, cfg):
+    """
+    Anonimiza uma planilha inteira em um worker. As linhas são gravadas
+    em lotes (pickle) num arquivo temporário, lido depois pelo escritor.
+    """
+    usar_chave(cfg["chave"])
+    # Só o processo principal grava no mapeamento persistente
+    cfg = dict(cfg, medidas=novas_medidas(), mapa_somente_leitura=True)
+    antes = contadores_globais()
+    comparacao = []
+    count = 0
+    fd, caminho_temp = tempfile.mkstemp(suffix=".rows")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            lote = []
+            for linha, anonimizada in _linhas_planilha(entrada, planilha, cfg, comparacao):
+                lote.append(linha)
+                count += anonimizada
+                if len(lote) >= TAMANHO_LOTE_EXCEL:
+                    pickle.dump(lote, f, pickle.HIGHEST_PROTOCOL)
+                    lote = []
+            if lote:
+                pickle.dump(lote, f, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        # O processo principal só conhece o arquivo se a planilha terminar
+        os.remove(caminho_temp)
+        raise
+    somar_medidas(cfg["medidas"], diferenca_contadores(antes))
+    novos_mapa = abrir_mapeamento(cfg["mapeamento"], True).retirar_pendentes() if cfg["mapeamento"] else {}
+    return caminho_temp, comparacao, count, cfg["medidas"], novos_mapa
+
+
+def _ler_temp(caminho_temp):
+    """Lê de volta as linhas gravadas por _processar_planilha."""
+    with open(caminho_temp, "rb") as f:
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                break
+
+
+def _descartar_temporarios(futuros):
+    """
+    Cancela as planilhas pendentes e apaga os temporários que ainda
+    existirem (de todas as planilhas, lidas ou não). Espera as que já
+    estão em andamento: o temporário delas só aparece no resultado.
+    """
+    for futuro in futuros:
+        if futuro.cancel() or futuro.exception() is not None:
+            continue
+        caminho_temp = futuro.result()[0]
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+
+
+def _descartar_saida(wb_saida):
+    """
+    Apaga os temporários que o openpyxl cria para cada planilha write-only:
+    ele só os remove ao salvar ou ao encerrar o processo.
+    """
+    for ws in wb_saida.worksheets:
+        escritor = ws._writer
+        if escritor is None:
+            continue
+        try:
+            if ws._rows is not None:
+                ws._rows.close()
+            escritor.close()
+        finally:
+            if os.path.exists(escritor.out):
+                escritor.cleanup()
+
+
+def processar_xlsx(entrada, filename_original, layout, workers=1, colunas_sem_cache=None, caminho_saida=None,
+                   progresso=None, cancelar=None, mapeamento=None):
+    """
+    Anonimiza todas as planilhas de um .xlsx e grava outro .xlsx em 'saida/'.
+    Leitura em modo somente leitura e escrita em modo write-only: nenhuma das
+    duas pastas de trabalho fica inteira na memória.
+    workers > 1 processa as planilhas em paralelo (uma por processo).
+    As linhas do layout valem para todas as planilhas.
+    progresso/cancelar: como em pipeline.processar (sem bytes_lidos/eta_s).
+    mapeamento: como em pipeline.processar.
+    Retorna (caminho_saida, comparacao, estatisticas).
+    """
+    _exigir_openpyxl()
+    print("🚀 Iniciando pipeline (Excel)...")
+    estatisticas = EstatisticasProcessamento(entrada)
+    if caminho_saida is None:
+        caminho_saida = caminho_saida_para(filename_original)
+
+    cfg = {
+        "hs": layout["header"].get("start_line"),
+        "he": layout["header"].get("end_line"),
+        "start_data_idx": layout["data"]["start_line"],
+        "sem_cache": frozenset(colunas_sem_cache or ()),
+        "chave": chave_atual(),
+        "medidas": novas_medidas(),
+        "mapeamento": mapeamento,
+    }
+
+    planilhas = nomes_planilhas(entrada)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(planilhas))
+
+    comparacao = []
+    count = 0
+    andamento = Progresso(None, progresso, cancelar)
+    andamento.verificar()
+    wb_saida = openpyxl.Workbook(write_only=True)
+    caminho_parcial = caminho_saida + SUFIXO_PARCIAL
+    antes = contadores_globais()
+    if mapeamento:
+        abrir_mapeamento(mapeamento)  # Cria o banco antes que os workers o abram
+
+    try:
+        with estatisticas.fase("processamento"):
+            if workers > 1:
+                print(f"💾 Processando {len(planilhas)} planilhas em paralelo ({workers} processos)...")
+                with ProcessPoolExecutor(max_workers=workers, initializer=resetar_erros) as executor:
+                    futuros = [executor.submit(_processar_planilha, entrada, nome, cfg) for nome in planilhas]
+                    try:
+                        # A gravação segue a ordem original das planilhas
+                        for nome, futuro in zip(planilhas, futuros):
+                            caminho_temp, comp_planilha, count_planilha, medidas, novos_mapa = futuro.result()
+                            estatisticas.somar(medidas)
+                            if novos_mapa:
+                                abrir_mapeamento(mapeamento).incorporar(novos_mapa)
+                            ws = wb_saida.create_sheet(title=nome)
+                            with closing(_ler_temp(caminho_temp)) as linhas:
+                                for linha in linhas:
+                                    ws.append(linha)
+                            os.remove(caminho_temp)  # Libera o disco antes da próxima planilha
+                            count += count_planilha
+                            comparacao.extend(comp_planilha[:LIMITE_COMPARACAO - len(comparacao)])
+                            andamento.atualizar(None, count)
+                    finally:
+                        # Com erro ou cancelamento, sobram temporários de planilhas não gravadas
+                        _descartar_temporarios(futuros)
+            else:
+                print("💾 Processando...")
+                for nome in planilhas:
+                    ws = wb_saida.create_sheet(title=nome)
+                    for linha, anonimizada in _linhas_planilha(entrada, nome, cfg, comparacao):
+                        ws.append(linha)
+                        count += anonimizada
+                        if anonimizada and count % TAMANHO_LOTE_EXCEL == 0:
+                            andamento.atualizar(None, count)
+                    andamento.atualizar(None, count)
+
+        # Grava em '<saida>.part' e só renomeia no fim
+        with estatisticas.fase("gravacao"):
+            wb_saida.save(caminho_parcial)
+        os.replace(caminho_parcial, caminho_saida)
+    except BaseException:
+        _descartar_saida(wb_saida)
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+        raise
+    finally:
+        if mapeamento:
+            with estatisticas.fase("mapeamento"):
+                fechar_mapeamento(mapeamento)
+        estatisticas.somar(cfg["medidas"])
+        estatisticas.somar(diferenca_contadores(antes))
+        limpar_cache()
+
+    estatisticas.finalizar(count)
+    print(f"✅ Arquivo salvo em: {caminho_saida} ({count} linhas)")
+    return caminho_saida, comparacao, estatisticas
@@ -0,0 +1,229 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/leitura.py
+# Leitura da entrada compartilhada pelo anonimizador, conversor e validador:
+# amostra, trechos de fluxos comprimidos e andamento com cancelamento
+# ============================================================================
+
+import time
+
+from core.compression import detect_compression, wrap_reader
+from core.file_utils import sample_lines, supports_byte_offsets
+from core.tokenizer import MAX_RECORD_LINES, check_fixed_spans, infer_fixed_spans, is_complete
+
+# Bytes lidos por vez no modo serial (também a granularidade do progresso
+# e da verificação de cancelamento)
+TAMANHO_LEITURA_SERIAL = 1024 * 1024
+# Linhas lidas para a detecção de tipos e em quantas posições do arquivo
+AMOSTRA_LINHAS = 200
+AMOSTRA_JANELAS = 10
+
+
+class ProcessamentoCancelado(Exception):
+    """Levantada quando o processamento é interrompido pelo usuário."""
+
+
+class Progresso:
+    """
+    Acompanha o andamento e repassa eventos ao callback 'progresso'.
+    Cada evento é um dicionário com bytes_lidos, bytes_total, linhas,
+    linhas_por_segundo, decorrido_s e eta_s (None se desconhecido).
+    Também verifica o pedido de cancelamento a cada atualização.
+    bytes_iniciais: bytes já processados antes (retomada), fora da conta do ETA.
+    """
+
+    def __init__(self, bytes_total, callback=None, cancelar=None, bytes_iniciais=0):
+        self.bytes_total = bytes_total
+        self.callback = callback
+        self.cancelar = cancelar
+        self.bytes_iniciais = bytes_iniciais
+        self.inicio = time.perf_counter()
+
+    def verificar(self):
+        if self.cancelar is not None and self.cancelar.is_set():
+            raise ProcessamentoCancelado("Processamento cancelado")
+
+    def atualizar(self, bytes_lidos, linhas):
+        self.verificar()
+        if self.callback is None:
+            return
+        decorrido = time.perf_counter() - self.inicio
+        eta = None
+        if self.bytes_total and bytes_lidos and bytes_lidos > self.bytes_iniciais:
+            eta = decorrido * (self.bytes_total - bytes_lidos) / (bytes_lidos - self.bytes_iniciais)
+        self.callback({
+            "bytes_lidos": bytes_lidos,
+            "bytes_total": self.bytes_total,
+            "linhas": linhas,
+            "linhas_por_segundo": linhas / decorrido if decorrido > 0 else 0.0,
+            "decorrido_s": decorrido,
+            "eta_s": eta,
+        })
+
+
+def amostrar(entrada, enc, start_data_idx, strip=True):
+    """
+    Coleta a amostra de linhas de dados usada na detecção de tipos.
+    strip=False mantém os espaços das pontas (largura fixa).
+    Limitação: só encodings de um byte por caractere (e UTF-8) têm a
+    amostra espalhada pelo arquivo; nos demais, como nas entradas
+    comprimidas (amostrar_cabeca), ela vem das primeiras linhas de dados.
+    """
+    if supports_byte_offsets(enc):
+        # Amostra espalhada por todo o arquivo (arquivos ordenados não enganam)
+        with open(entrada, 'rb') as f:
+            for _ in range(start_data_idx):
+                f.readline()
+            inicio_dados = f.tell()
+        return sample_lines(entrada, enc, inicio_dados, AMOSTRA_LINHAS, AMOSTRA_JANELAS, strip)
+
+    # Encodings de vários bytes por caractere: lê o início dos dados (sem
+    # posições em bytes não há como saltar para o meio do arquivo)
+    amostra_dados = []
+    with open(entrada, 'r', encoding=enc, errors="replace") as f:
+        # Pula header
+        for _ in range(start_data_idx):
+            next(f, None)
+        # Lê amostra
+        for _ in range(AMOSTRA_LINHAS):
+            try:
+                line = next(f)
+                line = line.strip() if strip else line.rstrip("\r\n")
+                if line.strip(): amostra_dados.append(line)
+            except StopIteration:
+                break
+    return amostra_dados
+
+
+def ler_cabeca(leitor, linhas):
+    """Lê o início de um fluxo até ter 'linhas' quebras de linha (ou até o fim)."""
+    partes = []
+    quebras = 0
+    while quebras < linhas:
+        dados = leitor.read(TAMANHO_LEITURA_SERIAL)
+        if not dados:
+            break
+        partes.append(dados)
+        quebras += dados.count(b"\n")
+    return b"".join(partes)
+
+
+def amostrar_cabeca(cabeca, enc, start_data_idx, strip=True):
+    """
+    Amostra de linhas de dados tirada do início de um fluxo já lido.
+    Limitação: um fluxo comprimido não permite saltos, e os tipos precisam
+    estar definidos antes da única passada de descompressão. A amostra
+    fica só com as AMOSTRA_LINHAS primeiras linhas de dados, enquanto a do
+    arquivo descomprimido é espalhada por ele todo (amostrar): num arquivo
+    ordenado, ou cujo início difere do resto, os mesmos dados podem ter
+    tipos diferentes com e sem compressão. Nesses casos, fixe os tipos com
+    um perfil (perfis.py).
+    """
+    linhas = cabeca.decode(enc, errors="replace").split("\n")[start_data_idx:start_data_idx + AMOSTRA_LINHAS]
+    return [linha.strip() if strip else linha.rstrip("\r") for linha in linhas if linha.strip()]
+
+
+def amostra_e_cabecalho(entrada, enc, start_data_idx, he, strip=True):
+    """
+    Amostra de linhas de dados (para a detecção de tipos) e a última linha
+    do cabeçalho (None se não houver), também para entradas comprimidas
+    (que só têm amostra do início: ver amostrar_cabeca).
+    """
+    compressao = detect_compression(entrada)
+    if compressao:
+        with open(entrada, "rb") as bruto, wrap_reader(bruto, compressao) as leitor:
+            cabeca = ler_cabeca(leitor, max(start_data_idx, (he or 0) + 1) + AMOSTRA_LINHAS)
+        amostra = amostrar_cabeca(cabeca, enc, start_data_idx, strip)
+        linhas_iniciais = cabeca.decode(enc, errors="replace").split("\n")
+    else:
+        amostra = amostrar(entrada, enc, start_data_idx, strip)
+        with open(entrada, "r", encoding=enc, errors="replace") as f:
+            linhas_iniciais = [linha for _, linha in zip(range((he or 0) + 1), f)]
+
+    linha_cabecalho = None
+    if he is not None and he < len(linhas_iniciais):
+        linha_cabecalho = linhas_iniciais[he]
+        linha_cabecalho = linha_cabecalho.strip() if strip else linha_cabecalho.rstrip("\r\n")
+    return amostra, linha_cabecalho
+
+
+def amostra_do_layout(entrada, enc, layout):
+    """
+    amostra_e_cabecalho conforme o layout: (amostra, linha_cabecalho,
+    larguras). Na largura fixa as linhas mantêm os espaços das pontas e as
+    colunas ('auto' = inferidas da amostra, como no processar) voltam
+    conferidas em 'larguras'; em arquivos delimitados larguras é None.
+    """
+    larguras = layout.get("fixed_width")
+    amostra, linha_cabecalho = amostra_e_cabecalho(entrada, enc, layout["data"]["start_line"],
+                                                   layout["header"].get("end_line"), strip=not larguras)
+    if larguras:
+        larguras = tuple(check_fixed_spans(infer_fixed_spans(amostra) if larguras == "auto" else larguras))
+    return amostra, linha_cabecalho, larguras or None
+
+
+def trechos_fluxo(leitor, cabeca, posicao, tamanho=TAMANHO_LEITURA_SERIAL):
+    """
+    Trechos de um fluxo descomprimido, começando pelos bytes 'cabeca' já
+    lidos na amostragem (nada é descomprimido duas vezes). Cada trecho
+    termina em quebra de linha (o último pode não terminar) e vem com
+    posicao(): os bytes comprimidos lidos até ali, para o progresso.
+    """
+    resto = cabeca
+    while True:
+        dados = leitor.read(tamanho)
+        if not dados:
+            break
+        resto += dados
+        corte = resto.rfind(b"\n") + 1
+        if corte:
+            yield resto[:corte], posicao()
+            resto = resto[corte:]
+    if resto:
+        yield resto, posicao()
+
+
+def fim_registros(bruto, cfg):
+    """
+    Posição logo após o último registro completo de 'bruto', que começa no
+    início de um registro. Só as linhas com aspas são analisadas; um
+    registro com quebra de linha entre aspas não é cortado ao meio.
+    """
+    aspas = cfg["aspas"]
+    if not aspas:
+        return len(bruto)
+    aspas_b = aspas.encode(cfg["enc"])
+    sep_b = cfg["sep"].encode(cfg["enc"])
+    tamanho = len(bruto)
+    pos = 0
+    while True:
+        achou = bruto.find(aspas_b, pos)
+        if achou == -1:
+            return tamanho
+        inicio = bruto.rfind(b"\n", 0, achou) + 1
+        fim = bruto.find(b"\n", achou)
+        fim = tamanho if fim == -1 else fim + 1
+        registro = bruto[inicio:fim].strip()
+        linhas = 1
+        while linhas < MAX_RECORD_LINES and not is_complete(registro, sep_b, aspas_b):
+            if fim >= tamanho:
+                return inicio  # O registro continua no próximo trecho
+            proximo = bruto.find(b"\n", fim)
+            proximo = tamanho if proximo == -1 else proximo + 1
+            registro += b"\n" + bruto[fim:proximo].rstrip(b"\r\n")
+            fim = proximo
+            linhas += 1
+        pos = fim
+
+
+def blocos_fluxo(trechos, cfg):
+    """Reagrupa os trechos do fluxo para nenhum bloco terminar no meio de um registro."""
+    sobra = b""
+    for bruto, pos in trechos:
+        if sobra:
+            bruto = sobra + bruto
+        corte = fim_registros(bruto, cfg)
+        if corte:
+            yield bruto[:corte], pos
+        sobra = bruto[corte:]
+    if sobra:
+        yield sobra, pos
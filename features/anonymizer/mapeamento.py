@@ -0,0 +1,179 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/mapeamento.py
+# Mapeamento persistente (SQLite) de valores originais -> pseudônimos
+# ============================================================================
+
+import hashlib
+import os
+import sqlite3
+from functools import partial
+
+from features.anonymizer.anonymizer_core import anonimizar_lote, anonimizar_lote_bytes, chave_atual
+
+# Entradas novas acumuladas antes de gravar no banco (processo principal)
+MAPEAMENTO_LOTE_GRAVACAO = 100_000
+# Chaves por consulta (limite de parâmetros do SQLite)
+_CHAVES_POR_CONSULTA = 900
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS mapa (
+    chave BLOB PRIMARY KEY,
+    tipo  TEXT NOT NULL,
+    novo  TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+# Mapeamentos abertos neste processo: caminho -> MapeamentoPersistente
+_ABERTOS = {}
+
+
+class MapeamentoPersistente:
+    """
+    Guarda em disco o pseudônimo já gerado para cada (valor, tipo).
+    A chave é um hash com o segredo do projeto (blake2b): o banco não
+    contém os valores originais. Com o mapeamento, execuções repetidas
+    viram consultas e o resultado não muda mesmo que o algoritmo mude.
+    somente_leitura=True é usado nos workers: as entradas novas ficam em
+    'pendentes' e são devolvidas ao processo principal, o único que grava.
+    """
+
+    def __init__(self, caminho, somente_leitura=False):
+        self.caminho = caminho
+        self.somente_leitura = somente_leitura
+        self.pendentes = {}  # chave -> (tipo, novo)
+
+        if somente_leitura:
+            uri = "file:" + os.path.abspath(caminho).replace("\\", "/") + "?mode=ro"
+            self._conexao = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+            # WAL permite que os workers leiam enquanto o principal grava
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.execute(_ESQUEMA)
+            self._conexao.commit()
+
+    def __len__(self):
+        return self._conexao.execute("SELECT COUNT(*) FROM mapa").fetchone()[0]
+
+    @staticmethod
+    def _chave(valor, tipo, segredo):
+        h = hashlib.blake2b(tipo.encode("utf-8") + b"\0" + valor.encode("utf-8", "ignore"),
+                            key=segredo, digest_size=16)
+        return h.digest()
+
+    def _buscar(self, chaves):
+        """Consulta várias chaves de uma vez: chave -> pseudônimo."""
+        encontrados = {}
+        for i in range(0, len(chaves), _CHAVES_POR_CONSULTA):
+            parte = chaves[i:i + _CHAVES_POR_CONSULTA]
+            marcadores = ",".join("?" * len(parte))
+            cursor = self._conexao.execute(f"SELECT chave, novo FROM mapa WHERE chave IN ({marcadores})", parte)
+            encontrados.update(cursor.fetchall())
+        return encontrados
+
+    def anonimizar_lote(self, valores, tipo, anonimizar_lote, encoding=None, encoding_saida=None,
+                        medidas=None, **kwargs):
+        """
+        Anonimiza uma coluna consultando o mapeamento antes. Só os valores
+        ausentes passam por 'anonimizar_lote' (e viram entradas novas).
+        Com encoding/encoding_saida os valores são bytes (modo bytes).
+        """
+        valores = list(valores)
+        em_bytes = encoding is not None
+        unicos = [v for v in dict.fromkeys(valores) if v and v.strip()]
+        if not unicos:
+            return valores
+
+        segredo = chave_atual()
+        textos = [v.decode(encoding, errors="replace") for v in unicos] if em_bytes else unicos
+        chaves = [self._chave(t, tipo, segredo) for t in textos]
+        conhecidos = self._buscar(chaves)
+        for chave in chaves:
+            if chave not in conhecidos and chave in self.pendentes:
+                conhecidos[chave] = self.pendentes[chave][1]
+
+        faltam = [i for i, chave in enumerate(chaves) if chave not in conhecidos]
+        if medidas is not None:
+            medidas["mapa_hits"][tipo] += len(chaves) - len(faltam)
+            medidas["mapa_misses"][tipo] += len(faltam)
+
+        if faltam:
+            if em_bytes:
+                novos = anonimizar_lote([unicos[i] for i in faltam], tipo, encoding=encoding,
+                                        encoding_saida=encoding_saida, **kwargs)
+                novos = [n.decode(encoding_saida, errors="replace") for n in novos]
+            else:
+                novos = anonimizar_lote([unicos[i] for i in faltam], tipo, **kwargs)
+            for i, novo in zip(faltam, novos):
+                conhecidos[chaves[i]] = novo
+                self.pendentes[chaves[i]] = (tipo, novo)
+            if not self.somente_leitura and len(self.pendentes) >= MAPEAMENTO_LOTE_GRAVACAO:
+                self.salvar()
+
+        if em_bytes:
+            mapa = {v: conhecidos[c].encode(encoding_saida, errors="replace") for v, c in zip(unicos, chaves)}
+        else:
+            mapa = {v: conhecidos[c] for v, c in zip(unicos, chaves)}
+        return [mapa.get(v, v) for v in valores]
+
+    def retirar_pendentes(self):
+        """Entradas novas deste processo (para o worker devolver ao principal)."""
+        pendentes, self.pendentes = self.pendentes, {}
+        return pendentes
+
+    def incorporar(self, pendentes):
+        """Recebe as entradas novas calculadas por um worker."""
+        self.pendentes.update(pendentes)
+        if len(self.pendentes) >= MAPEAMENTO_LOTE_GRAVACAO:
+            self.salvar()
+
+    def salvar(self):
+        """Grava as entradas novas em uma única transação."""
+        if not self.pendentes or self.somente_leitura:
+            return
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO mapa (chave, tipo, novo) VALUES (?, ?, ?)",
+                ((chave, tipo, novo) for chave, (tipo, novo) in self.pendentes.items()),
+            )
+        self.pendentes.clear()
+
+    def fechar(self):
+        self.salvar()
+        self._conexao.close()
+
+
+def abrir_mapeamento(caminho, somente_leitura=False):
+    """Mapeamento do processo atual para 'caminho' (aberto uma vez por processo)."""
+    chave = (os.path.abspath(caminho), somente_leitura)
+    mapa = _ABERTOS.get(chave)
+    if mapa is None:
+        mapa = _ABERTOS[chave] = MapeamentoPersistente(caminho, somente_leitura)
+    return mapa
+
+
+def fechar_mapeamento(caminho):
+    """Grava as pendências e fecha o mapeamento aberto para 'caminho'."""
+    for somente_leitura in (False, True):
+        mapa = _ABERTOS.pop((os.path.abspath(caminho), somente_leitura), None)
+        if mapa is not None:
+            mapa.fechar()
+
+
+def funcao_lote(cfg, modelo=None):
+    """
+    Função que anonimiza uma coluna inteira: anonimizar_lote (ou a versão
+    em bytes), passando antes pelo mapeamento persistente se houver um.
+    modelo: ColunaCompilada do perfil, usada no lugar de anonimizar_lote.
+    """
+    if cfg["modo_bytes"]:
+        funcao = modelo.lote_bytes if modelo else anonimizar_lote_bytes
+        extras = {"encoding": cfg["enc"], "encoding_saida": cfg["enc_saida"]}
+    else:
+        funcao, extras = modelo.lote if modelo else anonimizar_lote, {}
+
+    if not cfg.get("mapeamento"):
+        return partial(funcao, **extras)
+    mapa = abrir_mapeamento(cfg["mapeamento"], somente_leitura=cfg.get("mapa_somente_leitura", False))
+    return partial(mapa.anonimizar_lote, anonimizar_lote=funcao, medidas=cfg["medidas"], **extras)
@@ -0,0 +1,262 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/partes.py
+# Saída dividida em partes (por registros ou bytes) com manifesto
+# ============================================================================
+
+import hashlib
+import io
+import json
+import os
+
+from core.compression import COMPRESSION_SUFFIXES, open_output, strip_compression_suffix
+from core.tokenizer import MAX_RECORD_LINES, is_complete
+
+VERSAO_MANIFESTO = 1
+# Dígitos do número de cada parte no nome do arquivo (ANON_x-00000.csv)
+DIGITOS_PARTE = 5
+
+
+def caminho_manifesto(caminho_saida):
+    """Manifesto das partes de 'caminho_saida' (saida/ANON_x.csv -> saida/ANON_x.manifest.json)."""
+    return os.path.splitext(strip_compression_suffix(caminho_saida))[0] + ".manifest.json"
+
+
+def caminho_parte(caminho_saida, numero, compressao=None):
+    """Arquivo da parte 'numero' (saida/ANON_x.csv.gz -> saida/ANON_x-00003.csv.gz)."""
+    base, extensao = os.path.splitext(strip_compression_suffix(caminho_saida))
+    sufixo = COMPRESSION_SUFFIXES[compressao] if compressao else ""
+    return f"{base}-{numero:0{DIGITOS_PARTE}d}{extensao}{sufixo}"
+
+
+def remover_partes_antigas(manifesto):
+    """Apaga as partes listadas em um manifesto anterior (e o próprio manifesto)."""
+    try:
+        with open(manifesto, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return
+    pasta = os.path.dirname(manifesto)
+    for parte in dados.get("partes", []):
+        caminho = os.path.join(pasta, parte["arquivo"])
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    os.remove(manifesto)
+
+
+class _ArquivoComHash(io.RawIOBase):
+    """Arquivo binário que calcula o SHA-256 e o tamanho do que é gravado no disco."""
+
+    def __init__(self, caminho):
+        super().__init__()
+        self._file = open(caminho, "wb")
+        self.hash = hashlib.sha256()
+        self.tamanho = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._file.write(dados)
+        self.hash.update(dados)
+        self.tamanho += len(dados)
+        return len(dados)
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._file.close()
+        finally:
+            super().close()
+
+
+class GravadorPartes:
+    """
+    Substitui o arquivo de saída do pipeline: recebe os mesmos write()
+    (str ou bytes, sempre terminando em fim de registro) e divide a saída
+    em partes de até 'max_registros' registros e/ou 'max_bytes' bytes
+    (descomprimidos), sem cortar registros. As primeiras 'linhas_cabecalho'
+    linhas são o cabeçalho; com repetir_cabecalho ele abre todas as partes.
+    Ao fechar sem erro grava o manifesto com registros, bytes e SHA-256 de
+    cada parte; com erro, apaga as partes já gravadas.
+    """
+
+    def __init__(self, caminho_saida, encoding="utf-8", max_registros=None, max_bytes=None,
+                 linhas_cabecalho=0, repetir_cabecalho=False, compressao=None, sep=None, aspas=None,
+                 entrada=None):
+        if not max_registros and not max_bytes:
+            raise ValueError("informe o máximo de registros ou de bytes por parte")
+        if (max_registros is not None and max_registros <= 0) or (max_bytes is not None and max_bytes <= 0):
+            raise ValueError("o tamanho das partes precisa ser positivo")
+        self.caminho_saida = caminho_saida
+        self.caminho_manifesto = caminho_manifesto(caminho_saida)
+        self.encoding = encoding
+        self.max_registros = max_registros or float("inf")
+        self.max_bytes = max_bytes or float("inf")
+        self.repetir_cabecalho = repetir_cabecalho
+        self.compressao = compressao
+        self.entrada = entrada
+        # Separador e aspas da saída (para não cortar registros com quebra de linha entre aspas)
+        self._sep = sep.encode(encoding) if isinstance(sep, str) else sep
+        self._aspas = aspas.encode(encoding) if isinstance(aspas, str) else aspas
+
+        self.partes = []
+        self._faltam_cabecalho = linhas_cabecalho
+        self._cabecalho = b""
+        self._arquivo = None   # Parte aberta (comprimida ou não)
+        self._bruto = None     # _ArquivoComHash da parte aberta
+        self._registros = 0    # Registros de dados na parte aberta
+        self._bytes = 0        # Bytes descomprimidos na parte aberta
+        self.closed = False
+
+    # --- escrita -------------------------------------------------------------
+
+    def write(self, dados):
+        if isinstance(dados, str):
+            dados = dados.encode(self.encoding, errors="replace")
+        if self._faltam_cabecalho and dados:
+            fim = 0
+            while self._faltam_cabecalho and fim < len(dados):
+                fim = (dados.find(b"\n", fim) + 1) or len(dados)
+                self._faltam_cabecalho -= 1
+            self._cabecalho += dados[:fim]
+            self._gravar(dados[:fim], 0)
+            dados = dados[fim:]
+        while dados:
+            pos, registros = self._prefixo(dados)
+            if pos == 0:
+                self._fechar_parte()  # Parte cheia: o próximo registro vai para a seguinte
+                continue
+            self._gravar(dados[:pos], registros)
+            dados = dados[pos:]
+
+    def _gravar(self, dados, registros):
+        if self._arquivo is None:
+            self._abrir_parte()
+        self._arquivo.write(dados)
+        self._bytes += len(dados)
+        self._registros += registros
+
+    def _prefixo(self, dados):
+        """
+        (posição, registros): maior prefixo de 'dados' com registros
+        inteiros que cabe na parte aberta. Uma parte sem registros sempre
+        recebe ao menos um (mesmo maior que max_bytes).
+        """
+        vazia = self._arquivo is None or self._registros == 0
+        limite_bytes = self.max_bytes - (self._bytes if self._arquivo is not None else len(self._cabecalho_parte()))
+        limite_registros = self.max_registros - (self._registros if self._arquivo is not None else 0)
+        if len(dados) <= limite_bytes and not (self._aspas and self._aspas in dados):
+            total = dados.count(b"\n") + (not dados.endswith(b"\n"))
+            if total <= limite_registros:
+                return len(dados), total  # Caso comum: o trecho inteiro cabe
+
+        pos = registros = 0
+        for fim in self._fins_registros(dados):
+            if registros >= limite_registros or (fim > limite_bytes and not (vazia and registros == 0)):
+                break
+            pos, registros = fim, registros + 1
+        return pos, registros
+
+    def _fins_registros(self, dados):
+        """Posições logo depois de cada registro de 'dados'."""
+        inicio = pos = 0
+        linhas = 0
+        while pos < len(dados):
+            pos = (dados.find(b"\n", pos) + 1) or len(dados)
+            linhas += 1
+            registro = dados[inicio:pos]
+            if (not self._aspas or self._aspas not in registro or linhas >= MAX_RECORD_LINES
+                    or is_complete(registro.rstrip(b"\r\n"), self._sep, self._aspas)):
+                yield pos
+                inicio, linhas = pos, 0
+
+    # --- partes --------------------------------------------------------------
+
+    def _cabecalho_parte(self):
+        return self._cabecalho if self.repetir_cabecalho and self.partes else b""
+
+    def _abrir_parte(self):
+        cabecalho = self._cabecalho_parte()
+        caminho = caminho_parte(self.caminho_saida, len(self.partes), self.compressao)
+        self._bruto = _ArquivoComHash(caminho)
+        self._arquivo = open_output(caminho, self.compressao, fileobj=self._bruto)
+        self.partes.append({"arquivo": os.path.basename(caminho), "registros": 0, "bytes": 0,
+                            "bytes_descomprimidos": 0, "sha256": None})
+        self._registros = self._bytes = 0
+        if cabecalho:
+            self._arquivo.write(cabecalho)
+            self._bytes = len(cabecalho)
+
+    def _fechar_parte(self):
+        if self._arquivo is None:
+            return
+        self._arquivo.close()
+        self.partes[-1].update({
+            "registros": self._registros,
+            "bytes": self._bruto.tamanho,
+            "bytes_descomprimidos": self._bytes,
+            "sha256": self._bruto.hash.hexdigest(),
+        })
+        self._arquivo = self._bruto = None
+
+    def flush(self):
+        if self._arquivo is not None:
+            self._arquivo.flush()
+
+    def close(self):
+        """Fecha a última parte e grava o manifesto."""
+        if self.closed:
+            return
+        if not self.partes:
+            self._abrir_parte()  # Nada gravado: uma parte vazia, para o manifesto não ficar sem arquivos
+        self._fechar_parte()
+        self.closed = True
+
+        manifesto = {
+            "versao": VERSAO_MANIFESTO,
+            "entrada": self.entrada,
+            "encoding": self.encoding,
+            "compressao": self.compressao,
+            "linhas_cabecalho": self._cabecalho.count(b"\n"),
+            "cabecalho_repetido": self.repetir_cabecalho,
+            "registros": sum(p["registros"] for p in self.partes),
+            "bytes": sum(p["bytes"] for p in self.partes),
+            "partes": self.partes,
+        }
+        temporario = self.caminho_manifesto + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.caminho_manifesto)
+
+    def descartar(self):
+        """Execução interrompida: fecha e apaga as partes gravadas (sem manifesto)."""
+        if self._arquivo is not None:
+            try:
+                self._arquivo.close()
+            except OSError:
+                pass
+            self._arquivo = self._bruto = None
+        pasta = os.path.dirname(self.caminho_saida)
+        for parte in self.partes:
+            caminho = os.path.join(pasta, parte["arquivo"])
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        if tipo is None:
+            self.close()
+        else:
+            self.descartar()
+        return False
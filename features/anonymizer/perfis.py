@@ -0,0 +1,186 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/perfis.py
+# Perfis de layout salvos: layout, encoding e plano de cada coluna
+# ============================================================================
+
+import json
+import os
+from functools import lru_cache
+
+from core.file_utils import detect_encoding, sample_is_ascii
+from core.tokenizer import check_fixed_spans, infer_fixed_spans, split_fields, split_fixed
+from features.anonymizer.column_detector import detectar_tipos, detectar_tipos_celulas
+from features.anonymizer.leitura import amostra_e_cabecalho
+
+# anonymizer_core (e NumPy) só é importado quando preciso: a interface
+# lista os perfis sem carregá-lo
+
+# Pasta dos perfis (como 'saida/', relativa à pasta de trabalho)
+PASTA_PERFIS = "perfis"
+VERSAO_PERFIL = 1
+# Tipo das colunas copiadas sem anonimizar
+TIPO_MANTER = "manter"
+
+
+def caminho_perfil(nome):
+    """Arquivo do perfil: 'nome' é um caminho .json ou o nome de um perfil em perfis/."""
+    if nome.endswith(".json") or os.sep in nome or "/" in nome:
+        return nome
+    return os.path.join(os.getcwd(), PASTA_PERFIS, f"{nome}.json")
+
+
+def listar_perfis():
+    """Nomes dos perfis salvos em perfis/ (ordem alfabética)."""
+    pasta = os.path.join(os.getcwd(), PASTA_PERFIS)
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(pasta) if f.endswith(".json"))
+
+
+def _modelo_coluna(tipo, valores):
+    """
+    Formato fixo de uma coluna na amostra: máscara de dígitos (tipos
+    numéricos) ou formato de data. Só vale se todos os valores concordarem.
+    """
+    from features.anonymizer.anonymizer_core import TIPOS_NUMERICOS, formato_data_de, mascara_de
+
+    valores = [v.strip() for v in valores if v.strip()]
+    if not valores:
+        return {}
+    if tipo in TIPOS_NUMERICOS:
+        mascaras = {mascara_de(v) for v in valores}
+        if len(mascaras) == 1 and None not in mascaras:
+            return {"mascara": mascaras.pop()}
+    elif tipo == "data":
+        formatos = {formato_data_de(v) for v in valores}
+        if len(formatos) == 1 and None not in formatos:
+            return {"formato": formatos.pop()}
+    return {}
+
+
+def criar_perfil(entrada, layout, manter=(), sem_cache=(), encoding_completo=False):
+    """
+    Monta um perfil a partir de um arquivo de exemplo: o layout, o
+    encoding, os tipos detectados e o formato fixo de cada coluna (se a
+    amostra tiver um só). 'manter' são colunas copiadas sem anonimizar.
+    encoding_completo: como no processar (início só ASCII -> arquivo inteiro).
+    """
+    larguras = layout.get("fixed_width")
+    sep = layout.get("separator")
+    aspas = layout.get("quote", '"')
+    he = layout["header"].get("end_line")
+    enc = detect_encoding(entrada)
+    if encoding_completo and sample_is_ascii(entrada):
+        enc = detect_encoding(entrada, full=True)
+    amostra, linha_cabecalho = amostra_e_cabecalho(entrada, enc, layout["data"]["start_line"], he,
+                                                   strip=not larguras)
+    if larguras:
+        # Largura fixa: as colunas ('auto' = inferidas agora) ficam gravadas no perfil
+        larguras = check_fixed_spans(infer_fixed_spans(amostra) if larguras == "auto" else larguras)
+        layout = dict(layout, fixed_width=[list(coluna) for coluna in larguras])
+        campos = [split_fixed(linha, larguras) for linha in amostra]
+        tipos = detectar_tipos_celulas(campos)[0]
+        nomes = split_fixed(linha_cabecalho, larguras) if linha_cabecalho else []
+    else:
+        tipos = detectar_tipos(amostra, sep, aspas=aspas)
+        nomes = split_fields(linha_cabecalho, sep, aspas) if linha_cabecalho else []
+        campos = [split_fields(linha, sep, aspas) for linha in amostra]
+    colunas = []
+    for i in range(max([len(tipos)] + [int(c) + 1 for c in manter])):
+        tipo = tipos.get(i, "texto")
+        coluna = {"indice": i, "nome": nomes[i].strip() if i < len(nomes) else f"coluna_{i}", "tipo": tipo}
+        coluna.update(_modelo_coluna(tipo, [c[i] for c in campos if len(c) > i]))
+        if i in manter:
+            coluna["manter"] = True
+        colunas.append(coluna)
+
+    return {
+        "versao": VERSAO_PERFIL,
+        "layout": {key: value for key, value in layout.items() if key in ("header", "data", "separator", "quote", "fixed_width")},
+        "encoding": enc,
+        "colunas": colunas,
+        "sem_cache": sorted(int(c) for c in sem_cache),
+    }
+
+
+def salvar_perfil(perfil, nome):
+    """Grava o perfil em perfis/<nome>.json (ou no caminho informado) e retorna o caminho."""
+    caminho = caminho_perfil(nome)
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(perfil, f, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def carregar_perfil(nome):
+    """Lê e confere um perfil salvo (ValueError se estiver incompleto ou com formato desconhecido)."""
+    from features.anonymizer.anonymizer_core import FORMATOS_DATA
+
+    with open(caminho_perfil(nome), "r", encoding="utf-8") as f:
+        perfil = json.load(f)
+    if perfil.get("versao") != VERSAO_PERFIL:
+        raise ValueError(f"versão de perfil não suportada: {perfil.get('versao')}")
+    layout = perfil.get("layout") or {}
+    if not ("separator" in layout or layout.get("fixed_width")) or "start_line" not in (layout.get("data") or {}):
+        raise ValueError("perfil sem separador (ou colunas de largura fixa) ou início dos dados")
+    if layout.get("fixed_width"):
+        check_fixed_spans(layout["fixed_width"])
+    for coluna in perfil.get("colunas", []):
+        if coluna.get("formato") and coluna["formato"] not in FORMATOS_DATA:
+            raise ValueError(f"formato de data desconhecido: {coluna['formato']}")
+    return perfil
+
+
+def layout_do_perfil(perfil):
+    """Layout no formato do pipeline (cópia: pode ser alterado sem mexer no perfil)."""
+    layout = json.loads(json.dumps(perfil["layout"]))
+    layout.setdefault("header", {})
+    return layout
+
+
+def tipos_do_perfil(perfil):
+    """Tipo de cada coluna ({índice: tipo}); colunas mantidas recebem TIPO_MANTER."""
+    return {c["indice"]: TIPO_MANTER if c.get("manter") else c["tipo"] for c in perfil.get("colunas", [])}
+
+
+def plano_do_perfil(perfil):
+    """
+    Plano das colunas em forma simples (tupla), para ir no cfg até os
+    workers: (índice, tipo, máscara, formato) das colunas de formato fixo.
+    """
+    return tuple(
+        (c["indice"], c["tipo"], c.get("mascara"), c.get("formato"))
+        for c in perfil.get("colunas", [])
+        if not c.get("manter") and (c.get("mascara") or c.get("formato"))
+    )
+
+
+class PlanoColunas:
+    """
+    Plano compilado: ColunaCompilada por coluna de formato fixo, as colunas
+    mantidas e, se as últimas colunas forem todas mantidas, 'corte': quantas
+    colunas do início precisam ser separadas (o resto da linha é copiado).
+    """
+
+    def __init__(self, plano, tipos):
+        from features.anonymizer.anonymizer_core import ColunaCompilada
+
+        self.modelos = {i: ColunaCompilada(tipo, mascara, formato) for i, tipo, mascara, formato in plano}
+        self.manter = frozenset(i for i, tipo in tipos if tipo == TIPO_MANTER)
+        self.colunas = max((i for i, _ in tipos), default=-1) + 1
+        self.corte = None
+        if self.manter:
+            anonimizadas = [i for i, tipo in tipos if tipo != TIPO_MANTER]
+            corte = max(anonimizadas, default=-1) + 1
+            if corte < self.colunas:
+                self.corte = corte
+
+
+@lru_cache(maxsize=16)
+def _compilar(plano, tipos):
+    return PlanoColunas(plano, tipos)
+
+
+def compilar_plano(plano, tipos):
+    """Plano compilado para o cfg do pipeline (uma vez por processo)."""
+    return _compilar(plano or (), tuple(sorted(tipos.items())))
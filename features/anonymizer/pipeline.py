@@ -2,91 +2,1054 @@
 # ARQUIVO: features/anonymizer/pipeline.py
 # ============================================================================
 
+import io
+import mmap
 import os
-from core.file_utils import detect_encoding
-from features.anonymizer.column_detector import detectar_tipos
-from features.anonymizer.anonymizer_core import anonimizar
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from core.compression import (
+    COMPRESSION_SUFFIXES, compression_from_name, detect_compression, open_input, open_output,
+    strip_compression_suffix, wrap_reader,
+)
+from core.file_utils import (
+    ENCODING_SAMPLE_SIZE, detect_encoding, detect_encoding_bytes, is_excel_file, sample_is_ascii,
+    supports_byte_offsets,
+)
+from core.line_index import get_line_index
+from core.tokenizer import (
+    MAX_RECORD_LINES, check_fixed_spans, infer_fixed_spans, is_complete, join_record, split_fixed, split_record,
+)
+from features.anonymizer.checkpoint import (
+    SUFIXO_CHECKPOINT, GravadorCheckpoint, carregar_retomada, impressao_digital,
+)
+from features.anonymizer.column_detector import detectar_tipos_celulas, detectar_tipos_com_confianca
+from features.anonymizer.estrategias import (
+    ESTRATEGIA_MANTER, ESTRATEGIA_SEM_CACHE, ESTRATEGIA_TABELA, TABELA_MAX_ITENS, escolher_estrategia,
+    estimar_cardinalidades,
+)
+from features.anonymizer.estatisticas import (
+    EstatisticasProcessamento, contadores_globais, diferenca_contadores, medir_coluna,
+    novas_medidas, perfilador, somar_medidas,
+)
+from features.anonymizer.leitura import (
+    AMOSTRA_LINHAS, TAMANHO_LEITURA_SERIAL, ProcessamentoCancelado, Progresso, amostrar, amostrar_cabeca,
+    blocos_fluxo, ler_cabeca, trechos_fluxo,
+)
+from features.anonymizer.mapeamento import abrir_mapeamento, fechar_mapeamento, funcao_lote
+from features.anonymizer.partes import GravadorPartes, caminho_manifesto, remover_partes_antigas
+from features.anonymizer.perfis import compilar_plano, layout_do_perfil, plano_do_perfil, tipos_do_perfil
+from features.anonymizer.anonymizer_core import chave_atual, limpar_cache, resetar_erros, usar_chave
 
-def processar(entrada, filename_original, layout):
+# Tamanho alvo de cada bloco enviado aos processos no modo paralelo
+TAMANHO_BLOCO_PADRAO = 8 * 1024 * 1024
+# Linhas de dados anonimizadas por vez (coluna a coluna)
+TAMANHO_LOTE = 10_000
+# Quantidade de linhas guardadas para a comparação visual
+LIMITE_COMPARACAO = 20
+# Fim de linha do modo bytes (o mesmo que a escrita em modo texto produz)
+_NL_BYTES = os.linesep.encode("ascii")
+# Extensão do arquivo de saída enquanto ele ainda está sendo gravado
+SUFIXO_PARCIAL = ".part"
+
+
+def _anonimizar_lote_linhas(linhas_raw, cfg):
+    """
+    Anonimiza um lote de linhas de dados coluna a coluna.
+    Cada coluna é enviada inteira para anonimizar_lote (ou para
+    anonimizar_lote_bytes no modo bytes, sem decodificar a linha).
+    Com um perfil, colunas de formato fixo usam o modelo compilado e as
+    colunas mantidas não são anonimizadas; se as últimas colunas forem
+    todas mantidas, o fim da linha é copiado sem ser separado.
+    """
+    plano = compilar_plano(cfg.get("plano"), cfg["tipos"])
+    if cfg.get("larguras"):
+        return _anonimizar_largura_fixa(linhas_raw, cfg, plano)
+    if plano.corte is None or (cfg["modo_bytes"] and cfg["enc_saida"] != cfg["enc"]):
+        return _anonimizar_campos(linhas_raw, cfg, plano)
+
+    # Linhas sem aspas e com o número de colunas do perfil: separa só o início
+    sep, aspas, corte = cfg["sep_entrada"], cfg["aspas_entrada"], plano.corte
+    separadores = plano.colunas - 1
+    diretas = [i for i, linha in enumerate(linhas_raw)
+               if linha.count(sep) == separadores and not (aspas and aspas in linha)]
+    if len(diretas) < len(linhas_raw):
+        resultado = list(linhas_raw)
+        conjunto = set(diretas)
+        outras = [i for i in range(len(linhas_raw)) if i not in conjunto]
+        for i, nova in zip(outras, _anonimizar_campos([linhas_raw[i] for i in outras], cfg, plano)):
+            resultado[i] = nova
+        linhas = [linhas_raw[i] for i in diretas]
+    else:
+        resultado, linhas = None, linhas_raw
+    if not linhas:
+        return resultado
+
+    if corte == 0:
+        novas = list(linhas)  # Nenhuma coluna anonimizada: a linha é copiada como está
+    else:
+        colunas = list(zip(*(linha.split(sep, corte) for linha in linhas)))
+        colunas[:corte] = [_anonimizar_coluna(i, colunas[i], cfg, plano) for i in range(corte)]
+        novas = [cfg["sep_saida"].join(campos) for campos in zip(*colunas)]
+    if resultado is None:
+        return novas
+    for i, nova in zip(diretas, novas):
+        resultado[i] = nova
+    return resultado
+
+
+def _anonimizar_coluna(i, coluna, cfg, plano):
+    """Anonimiza a coluna i de um lote (lista de valores), medindo o tempo."""
+    if i in plano.manter:
+        return coluna
+    tipo = cfg["tipos"].get(i, "texto")
+    t = time.perf_counter()
+    tabela = cfg["tabelas"].get(i) if cfg.get("tabelas") else None
+    if tabela is not None:
+        novos = _consultar_tabela(i, coluna, tipo, tabela, cfg, plano)
+    else:
+        novos = funcao_lote(cfg, plano.modelos.get(i))(coluna, tipo, usar_cache=i not in cfg["sem_cache"])
+    medir_coluna(cfg["medidas"], i, tipo, len(coluna), time.perf_counter() - t)
+    return novos
+
+
+def _consultar_tabela(i, coluna, tipo, tabela, cfg, plano):
+    """
+    Coluna de poucos valores: cada valor sai da tabela montada no início.
+    Os que faltarem são anonimizados juntos e entram na tabela (até
+    TABELA_MAX_ITENS).
+    """
+    novos = list(map(tabela.get, coluna))
+    faltam = [v for v, novo in zip(coluna, novos) if novo is None]
+    cfg["medidas"]["tabela_hits"][i] += len(coluna) - len(faltam)
+    if not faltam:
+        return novos
+    faltam = list(dict.fromkeys(faltam))
+    cfg["medidas"]["tabela_misses"][i] += len(faltam)
+    calculados = dict(zip(faltam, funcao_lote(cfg, plano.modelos.get(i))(faltam, tipo, usar_cache=False)))
+    if len(tabela) + len(calculados) <= TABELA_MAX_ITENS:
+        tabela.update(calculados)
+    return [calculados[v] if novo is None else novo for v, novo in zip(coluna, novos)]
+
+
+def _campos_amostra(amostra, cfg):
+    """Campos das linhas da amostra, separados como no processamento."""
+    if cfg.get("larguras"):
+        return [[campo.strip() for campo in split_fixed(linha, cfg["larguras"])] for linha in amostra]
+    return [split_record(linha, cfg["sep"], cfg["aspas"])[0] for linha in amostra]
+
+
+def _definir_estrategias(amostra, cfg):
+    """
+    Escolhe a estratégia de cada coluna pela cardinalidade estimada na
+    amostra: colunas de poucos valores ganham a tabela completa (montada
+    aqui, uma vez, com a mesma função que anonimizaria a coluna), colunas
+    de valores quase todos distintos deixam de passar pelo cache.
+    Atualiza cfg["tabelas"] e cfg["sem_cache"] e retorna
+    {índice: {"estrategia", "cardinalidade_estimada", "valores_amostra"}}.
+    """
+    plano = compilar_plano(cfg.get("plano"), cfg["tipos"])
+    linhas_campos = _campos_amostra(amostra, cfg)
+    estimativas = estimar_cardinalidades(linhas_campos)
+    tabelas, sem_cache, estrategias = {}, set(), {}
+    for i in sorted(set(estimativas) | set(cfg["tipos"])):
+        estimativa, valores = estimativas.get(i, (0, 0))
+        if i in plano.manter:
+            estrategia = ESTRATEGIA_MANTER
+        elif i in cfg["sem_cache"]:
+            estrategia = ESTRATEGIA_SEM_CACHE  # Escolha do usuário (ou do perfil) prevalece
+        else:
+            estrategia = escolher_estrategia(estimativa, valores)
+        if estrategia == ESTRATEGIA_TABELA:
+            distintos = list(dict.fromkeys(c[i] for c in linhas_campos if len(c) > i and c[i].strip()))
+            if cfg["modo_bytes"]:
+                distintos = [v.encode(cfg["enc"], errors="replace") for v in distintos]
+            tipo = cfg["tipos"].get(i, "texto")
+            novos = funcao_lote(cfg, plano.modelos.get(i))(distintos, tipo, usar_cache=False)
+            tabelas[i] = dict(zip(distintos, novos))
+        elif estrategia == ESTRATEGIA_SEM_CACHE:
+            sem_cache.add(i)
+        estrategias[i] = {"estrategia": estrategia, "cardinalidade_estimada": estimativa, "valores_amostra": valores}
+    cfg["tabelas"] = tabelas
+    cfg["sem_cache"] = cfg["sem_cache"] | sem_cache
+    return estrategias
+
+
+def _anonimizar_campos(linhas_raw, cfg, plano):
+    """Anonimiza linhas separando todos os campos (respeitando as aspas)."""
+    sep_saida, aspas, aspas_saida = cfg["sep_saida"], cfg["aspas_entrada"], cfg["aspas_saida"]
+
+    # Campos entre aspas são separados corretamente e voltam entre aspas
+    registros = [split_record(linha, cfg["sep_entrada"], aspas) for linha in linhas_raw]
+    linhas_campos = [campos for campos, _ in registros]
+    largura = max(map(len, linhas_campos))
+
+    def juntar(campos, marcas):
+        if marcas is None:
+            return sep_saida.join(campos)
+        return join_record(campos, sep_saida, marcas, aspas_saida)
+
+    if all(len(campos) == largura for campos in linhas_campos):
+        # Caso comum: todas as linhas com o mesmo número de colunas
+        colunas = [_anonimizar_coluna(i, coluna, cfg, plano) for i, coluna in enumerate(zip(*linhas_campos))]
+        return [juntar(campos, marcas) for campos, (_, marcas) in zip(zip(*colunas), registros)]
+
+    # Linhas com quantidade variável de colunas
+    for i in range(largura):
+        posicoes = [r for r, campos in enumerate(linhas_campos) if len(campos) > i]
+        coluna = [linhas_campos[r][i] for r in posicoes]
+        novos = _anonimizar_coluna(i, coluna, cfg, plano)
+        for r, val_anon in zip(posicoes, novos):
+            linhas_campos[r][i] = val_anon
+    return [juntar(campos, marcas) for campos, (_, marcas) in zip(linhas_campos, registros)]
+
+
+def _encaixar(campo, valor, novo):
+    """Valor anonimizado no lugar do campo de largura fixa: mesmo recuo e mesma largura."""
+    if novo == valor:
+        return campo
+    recuo = len(campo) - len(campo.lstrip())
+    return (campo[:recuo] + novo).ljust(len(campo))[:len(campo)]
+
+
+def _anonimizar_largura_fixa(linhas_raw, cfg, plano):
+    """
+    Anonimiza linhas de largura fixa. Cada coluna é a fatia da sua posição,
+    anonimizada sem os espaços de preenchimento; o valor novo volta com o
+    mesmo recuo, completado com espaços ou cortado para caber na largura.
+    O que fica fora das colunas (intervalos e fim da linha) é copiado.
+    """
+    larguras = cfg["larguras"]
+    colunas = list(zip(*(split_fixed(linha, larguras) for linha in linhas_raw)))
+    for i, coluna in enumerate(colunas):
+        if i in plano.manter:
+            continue
+        valores = [campo.strip() for campo in coluna]
+        novos = _anonimizar_coluna(i, valores, cfg, plano)
+        colunas[i] = list(map(_encaixar, coluna, valores, novos))
+
+    vazio = linhas_raw[0][:0]
+    novas = []
+    for linha, campos in zip(linhas_raw, zip(*colunas)):
+        partes = []
+        fim = 0
+        for (inicio, tamanho), campo in zip(larguras, campos):
+            partes.append(linha[fim:inicio])
+            partes.append(campo)
+            fim = inicio + tamanho
+        partes.append(linha[fim:])
+        novas.append(vazio.join(partes))
+    return novas
+
+
+def _linhas_cabecalho(hs, he):
+    """Linhas de cabeçalho no topo da saída (ver layout_saida)."""
+    return 0 if hs is None or he is None else he - hs + 1
+
+
+def _um_byte_por_caractere(enc):
+    """Encodings de um byte por caractere (Latin-1, cp1252...): posições em bytes e em caracteres coincidem."""
+    return len("ãç€".encode(enc, errors="replace")) == 3
+
+
+def _descarregar_lote(lote, cfg, saida, comparacao):
+    """Anonimiza as linhas de dados acumuladas e as envia para a saída."""
+    if not lote:
+        return 0
+
+    novas_linhas = _anonimizar_lote_linhas(lote, cfg)
+    nl = _NL_BYTES if cfg["modo_bytes"] else "\n"
+    saida.append(nl.join(novas_linhas) + nl)
+
+    # Guarda as primeiras linhas para mostrar ao usuário
+    faltam = LIMITE_COMPARACAO - len(comparacao)
+    if faltam > 0:
+        pares = zip(lote[:faltam], novas_linhas[:faltam])
+        if cfg["modo_bytes"]:
+            pares = [(o.decode(cfg["enc"], errors="replace"), n.decode(cfg["enc_saida"], errors="replace"))
+                     for o, n in pares]
+        comparacao.extend(pares)
+
+    count = len(lote)
+    lote.clear()
+    return count
+
+
+def _linha_cabecalho(linha_raw, cfg):
+    """Linha de cabeçalho copiada sem alteração (convertida se preciso)."""
+    if not cfg["modo_bytes"]:
+        return linha_raw + "\n"
+    if cfg["enc_saida"] != cfg["enc"]:
+        linha_raw = linha_raw.decode(cfg["enc"], errors="replace").encode(cfg["enc_saida"], errors="replace")
+    return linha_raw + _NL_BYTES
+
+
+def _dividir_linhas(bruto):
+    """Quebra um trecho de bytes em linhas (sem os '\n')."""
+    linhas = bruto.split(b"\n")
+    if bruto.endswith(b"\n"):
+        linhas.pop()
+    return linhas
+
+
+def _linhas_de(bruto, cfg):
+    """Linhas de um trecho de bytes no formato do modo atual."""
+    if cfg["modo_bytes"]:
+        return _dividir_linhas(bruto)
+    return io.TextIOWrapper(io.BytesIO(bruto), encoding=cfg["enc"], errors="replace")
+
+
+def _processar_linhas(linhas, idx_inicial, cfg, saida, comparacao):
+    """
+    Aplica as regras do layout a uma sequência de linhas (str, ou bytes
+    no modo bytes). Escreve o resultado em 'saida' e retorna quantas
+    linhas de dados foram anonimizadas.
+    """
+    hs, he = cfg["hs"], cfg["he"]
+    start_data_idx = cfg["start_data_idx"]
+    sep, aspas = cfg["sep_entrada"], cfg["aspas_entrada"]
+    nl, eol = cfg["nl_entrada"], cfg["eol_entrada"]
+    larguras = cfg.get("larguras")
+    count = 0
+    lote = []  # Linhas de dados aguardando anonimização em lote
+
+    for idx, linha in enumerate(linhas, idx_inicial):
+        pendente = cfg["pendente"]
+        if pendente is not None:
+            # Continuação de um registro com quebra de linha entre aspas
+            pendente.append(linha.rstrip(eol))
+            registro = nl.join(pendente)
+            if is_complete(registro, sep, aspas) or len(pendente) >= MAX_RECORD_LINES:
+                cfg["pendente"] = None
+                lote.append(registro)
+            continue
+
+        linha_raw = linha.strip()
+        if larguras and linha_raw:
+            linha_raw = linha.rstrip(eol)  # Largura fixa: os espaços das pontas fazem parte das colunas
+
+        # Cabeçalho: Copia e salva para comparação se quiser
+        if hs is not None and he is not None and hs <= idx <= he:
+            count += _descarregar_lote(lote, cfg, saida, comparacao)
+            saida.append(_linha_cabecalho(linha_raw, cfg))
+            continue
+
+        if idx < start_data_idx or not linha_raw:
+            continue
+
+        if aspas and aspas in linha_raw and not is_complete(linha_raw, sep, aspas):
+            cfg["pendente"] = [linha_raw]
+            continue
+
+        # Dados: acumula para anonimizar coluna a coluna
+        lote.append(linha_raw)
+        if len(lote) >= TAMANHO_LOTE:
+            count += _descarregar_lote(lote, cfg, saida, comparacao)
+
+    count += _descarregar_lote(lote, cfg, saida, comparacao)
+    return count
+
+
+def _finalizar_pendente(cfg, saida, comparacao):
+    """Fim do arquivo com aspas ainda abertas: grava o registro como está."""
+    pendente = cfg["pendente"]
+    if pendente is None:
+        return 0
+    cfg["pendente"] = None
+    return _descarregar_lote([cfg["nl_entrada"].join(pendente)], cfg, saida, comparacao)
+
+
+def _processar_bloco(entrada, inicio, fim, cfg):
+    """
+    Processa um intervalo de bytes do arquivo (executado nos workers).
+    O intervalo sempre começa e termina em quebra de linha.
+    """
+    with open(entrada, 'rb') as f:
+        f.seek(inicio)
+        bruto = f.read(fim - inicio)
+    return _processar_trecho(bruto, cfg)
+
+
+def _processar_trecho(bruto, cfg):
+    """
+    Processa um trecho de registros completos (executado nos workers).
+    Recebe os bytes diretamente quando a entrada é um fluxo descomprimido.
+    """
+    # Processos iniciados via 'spawn' não herdam o segredo do processo pai
+    usar_chave(cfg["chave"])
+    # Medidas só deste bloco (o processo pai soma as de todos)
+    cfg["medidas"] = novas_medidas()
+    # Só o processo principal grava no mapeamento; aqui as entradas novas voltam com o resultado
+    cfg["mapa_somente_leitura"] = True
+    antes = contadores_globais()
+
+    saida = []
+    comparacao = []
+    count = _processar_linhas(_linhas_de(bruto, cfg), cfg["idx_regiao"], cfg, saida, comparacao)
+    count += _finalizar_pendente(cfg, saida, comparacao)
+
+    somar_medidas(cfg["medidas"], diferenca_contadores(antes))
+    novos_mapa = abrir_mapeamento(cfg["mapeamento"], True).retirar_pendentes() if cfg["mapeamento"] else {}
+    vazio = b"" if cfg["modo_bytes"] else ""
+    return vazio.join(saida), comparacao, count, cfg["medidas"], novos_mapa
+
+
+def _processar_serial(entrada, fout, cfg, comparacao, progresso):
+    """
+    Processamento linha a linha em um único processo, para encodings em
+    que o arquivo não pode ser cortado em bytes '\n' (UTF-16/32).
+    """
+    count = 0
+    with open_input(entrada, 'r', encoding=cfg["enc"], errors="replace") as fin:
+        saida = []
+        # Processa em lotes para não acumular o arquivo inteiro em memória
+        while True:
+            lote = fin.readlines(TAMANHO_LEITURA_SERIAL)
+            if not lote:
+                break
+            count += _processar_linhas(lote, cfg["proximo_idx"], cfg, saida, comparacao)
+            cfg["proximo_idx"] += len(lote)
+            fout.write("".join(saida))
+            saida.clear()
+            progresso.atualizar(fin.buffer.tell(), count)
+        count += _finalizar_pendente(cfg, saida, comparacao)
+        fout.write("".join(saida))
+    return count
+
+
+def _trechos_arquivo(entrada, inicio=0, corte=None):
+    """
+    Trechos de ~TAMANHO_LEITURA_SERIAL bytes lidos via mmap a partir do
+    byte 'inicio', sempre terminando em quebra de linha: (bytes, posição final).
+    corte: início de linha onde um trecho precisa terminar (checkpoint).
+    """
+    with open(entrada, 'rb') as fin:
+        if os.fstat(fin.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tamanho = len(mm)
+            pos = inicio
+            while pos < tamanho:
+                fim = mm.find(b"\n", min(pos + TAMANHO_LEITURA_SERIAL, tamanho) - 1)
+                fim = tamanho if fim == -1 else fim + 1
+                if corte is not None and pos < corte < fim:
+                    fim = corte
+                yield mm[pos:fim], fim
+                pos = fim
+
+
+def _processar_trechos(trechos, fout, cfg, comparacao, progresso, ponto=None):
+    """
+    Processamento em um único processo, trecho a trecho (de _trechos_arquivo
+    ou trechos_fluxo). No modo bytes as linhas ficam em bytes (só os campos
+    que precisam são decodificados); senão cada trecho é decodificado
+    inteiro. Com 'ponto', grava checkpoints entre os trechos.
+    """
+    count = 0
+    vazio = b"" if cfg["modo_bytes"] else ""
+    saida = []
+    pos = None
+    for bruto, pos in trechos:
+        linhas = list(_linhas_de(bruto, cfg))
+        count += _processar_linhas(linhas, cfg["proximo_idx"], cfg, saida, comparacao)
+        cfg["proximo_idx"] += len(linhas)
+        # Uma escrita grande por trecho
+        fout.write(vazio.join(saida))
+        saida.clear()
+        # Checkpoint só entre registros (nunca no meio de aspas abertas)
+        if ponto is not None and cfg["pendente"] is None:
+            ponto.registrar(pos, cfg["proximo_idx"], count, fout)
+        progresso.atualizar(pos, count)
+    count += _finalizar_pendente(cfg, saida, comparacao)
+    fout.write(vazio.join(saida))
+    if ponto is not None and pos is not None:
+        ponto.registrar(pos, cfg["proximo_idx"], count, fout, forcar=True)
+    return count
+
+
+def _registros_multilinha(entrada, indice, linha_inicial, cfg):
+    """
+    Intervalos de linhas [a, b) ocupados por registros cujo campo entre
+    aspas contém quebra de linha. Só as linhas que têm aspas são analisadas.
+    """
+    aspas = cfg["aspas"]
+    if not aspas or indice.size == 0:
+        return []
+
+    aspas_b = aspas.encode(cfg["enc"])
+    sep_b = cfg["sep"].encode(cfg["enc"])
+    offsets = indice.offsets
+    total = indice.line_count
+    intervalos = []
+
+    with open(entrada, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = offsets[min(linha_inicial, total)]
+        while True:
+            achou = mm.find(aspas_b, pos)
+            if achou == -1:
+                break
+            linha = indice.line_at(achou)
+            registro = mm[offsets[linha]:offsets[linha + 1]].strip()
+            fim = linha + 1
+            while (fim < total and fim - linha < MAX_RECORD_LINES
+                   and not is_complete(registro, sep_b, aspas_b)):
+                registro += b"\n" + mm[offsets[fim]:offsets[fim + 1]].rstrip(b"\r\n")
+                fim += 1
+            if fim - linha > 1:
+                intervalos.append((linha, fim))
+            pos = offsets[fim]
+
+    return intervalos
+
+
+def _blocos_por_registro(entrada, indice, linha_inicial, tamanho_bloco, cfg):
+    """
+    Blocos de bytes para os workers. Nenhum limite de bloco cai no meio de
+    um registro com quebra de linha entre aspas.
+    """
+    blocos = indice.chunks(linha_inicial, tamanho_bloco)
+    intervalos = _registros_multilinha(entrada, indice, linha_inicial, cfg)
+    if not intervalos:
+        return [(inicio, fim) for _, inicio, fim in blocos]
+
+    limites = []
+    j = 0
+    for primeira, _, _ in blocos[1:]:
+        while j < len(intervalos) and intervalos[j][1] <= primeira:
+            j += 1
+        if j < len(intervalos) and intervalos[j][0] < primeira:
+            primeira = intervalos[j][1]  # Empurra para o fim do registro
+        if not limites or primeira > limites[-1]:
+            limites.append(primeira)
+
+    linhas = [linha_inicial] + [l for l in limites if l < indice.line_count] + [indice.line_count]
+    return [indice.span(a, b) for a, b in zip(linhas, linhas[1:]) if b > a]
+
+
+def _inicio_registro_final(entrada, inicio, cfg):
+    """
+    Offset do início do último registro se a entrada não termina em '\n'
+    (senão None). Registros com quebra de linha entre aspas são procurados
+    a partir de 'inicio', que está sempre no início de um registro.
+    """
+    indice = get_line_index(entrada)
+    if indice.size == 0:
+        return None
+    with open(entrada, "rb") as f:
+        f.seek(indice.size - 1)
+        if f.read(1) == b"\n":
+            return None
+    linha = indice.line_count - 1
+    for a, b in _registros_multilinha(entrada, indice, indice.line_at(inicio), cfg):
+        if a <= linha < b:
+            linha = a
+    return indice.offsets[linha]
+
+
+def _processar_paralelo(entrada, fout, cfg, comparacao, workers, tamanho_bloco, progresso, inicio=0, ponto=None):
+    """
+    Processa o arquivo em blocos de bytes distribuídos entre processos.
+    A região inicial (cabeçalho e linhas antes dos dados) é tratada aqui
+    mesmo; os blocos seguintes são gravados na ordem original.
+    Começa no byte 'inicio' (retomada) e, com 'ponto', grava checkpoints
+    a cada bloco gravado (um bloco termina no limite do checkpoint).
+    """
+    # 1. Região inicial: linhas até o fim do cabeçalho / início dos dados
+    n_regiao = cfg["start_data_idx"]
+    if cfg["he"] is not None:
+        n_regiao = max(n_regiao, cfg["he"] + 1)
+
+    # O índice de linhas dá os offsets da região e os limites dos blocos
+    indice = get_line_index(entrada)
+    linha_inicial = indice.line_at(inicio)
+
+    saida = []
+    count = 0
+    if linha_inicial < n_regiao:
+        linhas = _linhas_de(indice.read_raw(linha_inicial, n_regiao), cfg)
+        count += _processar_linhas(linhas, linha_inicial, cfg, saida, comparacao)
+        count += _finalizar_pendente(cfg, saida, comparacao)
+        fout.write((b"" if cfg["modo_bytes"] else "").join(saida))
+
+    # 2. Restante do arquivo em blocos paralelos
+    cfg["idx_regiao"] = max(n_regiao, linha_inicial)
+    blocos = _blocos_por_registro(entrada, indice, cfg["idx_regiao"], tamanho_bloco, cfg)
+    limite = ponto.limite if ponto is not None else None
+    if limite is not None:
+        blocos = [parte for a, b in blocos
+                  for parte in (((a, limite), (limite, b)) if a < limite < b else ((a, b),))]
+    tarefas = ((fim, _processar_bloco, (entrada, inicio, fim, cfg)) for inicio, fim in blocos)
+
+    apos_bloco = None
+    if ponto is not None:
+        def apos_bloco(fim, total):
+            ponto.registrar(fim, indice.line_at(fim), total, fout)
+
+    count = _gravar_blocos(tarefas, fout, cfg, comparacao, workers, progresso, count, apos_bloco)
+    if ponto is not None:
+        ponto.registrar(indice.size, indice.line_count, count, fout, forcar=True)
+    return count
+
+
+def _gravar_blocos(tarefas, fout, cfg, comparacao, workers, progresso, count=0, apos_bloco=None):
+    """
+    Executa as tarefas (posição, função, argumentos) em processos e grava
+    os resultados na ordem original. Retorna 'count' somado às linhas
+    anonimizadas nos blocos.
+    """
+    # As medidas dos blocos são somadas aqui; cfg leva aos workers uma vazia
+    medidas_pai, cfg["medidas"] = cfg["medidas"], novas_medidas()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=resetar_erros) as executor:
+        # Janela limitada de tarefas pendentes para não acumular resultados
+        pendentes = deque()
+        fila = iter(tarefas)
+
+        try:
+            for posicao, funcao, args in fila:
+                pendentes.append((posicao, executor.submit(funcao, *args)))
+                if len(pendentes) >= workers * 2:
+                    break
+
+            while pendentes:
+                posicao, futuro = pendentes.popleft()
+                texto, comp_bloco, count_bloco, medidas_bloco, novos_mapa = futuro.result()
+                fout.write(texto)
+                count += count_bloco
+                somar_medidas(medidas_pai, medidas_bloco)
+                if novos_mapa:
+                    abrir_mapeamento(cfg["mapeamento"]).incorporar(novos_mapa)
+
+                faltam = LIMITE_COMPARACAO - len(comparacao)
+                if faltam > 0:
+                    comparacao.extend(comp_bloco[:faltam])
+
+                if apos_bloco is not None:
+                    apos_bloco(posicao, count)
+                progresso.atualizar(posicao, count)
+                proximo = next(fila, None)
+                if proximo is not None:
+                    posicao, funcao, args = proximo
+                    pendentes.append((posicao, executor.submit(funcao, *args)))
+        except BaseException:
+            # Cancelamento ou erro: não espera os blocos que nem começaram
+            for _, futuro in pendentes:
+                futuro.cancel()
+            raise
+        finally:
+            cfg["medidas"] = medidas_pai
+
+    return count
+
+
+def _processar_paralelo_fluxo(leitor, cabeca, posicao, fout, cfg, comparacao, workers, tamanho_bloco, progresso):
+    """
+    Versão de _processar_paralelo para entrada comprimida: o processo
+    principal descomprime e envia aos workers os bytes de cada bloco.
+    """
+    n_regiao = cfg["start_data_idx"]
+    if cfg["he"] is not None:
+        n_regiao = max(n_regiao, cfg["he"] + 1)
+
+    # 1. Região inicial, separada do início do fluxo
+    while cabeca.count(b"\n") < n_regiao:
+        dados = leitor.read(TAMANHO_LEITURA_SERIAL)
+        if not dados:
+            break
+        cabeca += dados
+    corte = 0
+    for _ in range(n_regiao):
+        corte = cabeca.find(b"\n", corte) + 1
+        if not corte:
+            corte = len(cabeca)
+            break
+
+    saida = []
+    count = _processar_linhas(_linhas_de(cabeca[:corte], cfg), 0, cfg, saida, comparacao)
+    count += _finalizar_pendente(cfg, saida, comparacao)
+    fout.write((b"" if cfg["modo_bytes"] else "").join(saida))
+
+    # 2. Restante do fluxo em blocos paralelos
+    cfg["idx_regiao"] = n_regiao
+    trechos = trechos_fluxo(leitor, cabeca[corte:], posicao, tamanho_bloco)
+    tarefas = ((pos, _processar_trecho, (bruto, cfg)) for bruto, pos in blocos_fluxo(trechos, cfg))
+    return _gravar_blocos(tarefas, fout, cfg, comparacao, workers, progresso, count)
+
+
+def caminho_saida_para(filename_original):
+    """Caminho do arquivo anonimizado na pasta 'saida/' do projeto."""
+    pasta_saida = os.path.join(os.getcwd(), "saida")
+    if not os.path.exists(pasta_saida):
+        os.makedirs(pasta_saida)
+    return os.path.join(pasta_saida, f"ANON_{filename_original}")
+
+
+def layout_saida(layout):
+    """
+    Layout do arquivo que o processar grava para 'layout': o cabeçalho vai
+    para o topo e os dados vêm logo depois (linhas antes do cabeçalho,
+    entre ele e os dados e vazias não são copiadas).
+    """
+    hs = layout["header"].get("start_line")
+    he = layout["header"].get("end_line")
+    saida = {key: value for key, value in layout.items() if key not in ("header", "data")}
+    if hs is None or he is None:
+        saida.update({"header": {}, "data": {"start_line": 0}})
+    else:
+        saida.update({"header": {"start_line": 0, "end_line": he - hs}, "data": {"start_line": he - hs + 1}})
+    return saida
+
+
+def processar(entrada, filename_original, layout, workers=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO,
+              colunas_sem_cache=None, modo_bytes=False, manter_encoding=False, caminho_saida=None,
+              progresso=None, cancelar=None, mapeamento=None, checkpoint=False, incremental=False,
+              compressao_saida=None, perfil=None, registros_por_parte=None, bytes_por_parte=None,
+              repetir_cabecalho=False, encoding_completo=False):
     """
     Processa o arquivo e retorna dados para comparação visual.
     Salva na pasta 'saida/' do projeto.
+
+    workers: número de processos (1 = serial, None = todos os núcleos).
+    tamanho_bloco: tamanho aproximado, em bytes, de cada bloco paralelo.
+    colunas_sem_cache: índices de colunas que não passam pelo cache
+    (ex.: IDs únicos, onde memorizar só gasta memória).
+    modo_bytes: lê via mmap e separa os campos em bytes; colunas numéricas
+    são reescritas sem decodificar (ASCII, UTF-8, Latin-1...).
+    manter_encoding: no modo bytes, grava no encoding de origem em vez de UTF-8.
+    caminho_saida: arquivo de saída (padrão: saida/ANON_<filename_original>).
+    progresso: callback chamado a cada bloco com um dicionário de andamento
+    (bytes_lidos, bytes_total, linhas, linhas_por_segundo, decorrido_s, eta_s).
+    cancelar: objeto com is_set() (ex.: threading.Event); quando marcado,
+    levanta ProcessamentoCancelado e não deixa arquivo de saída parcial.
+    mapeamento: arquivo SQLite com os pseudônimos de execuções anteriores;
+    valores já vistos são reaproveitados e os novos são gravados no fim.
+    checkpoint: grava '<saida>.ckpt' periodicamente (offsets de entrada e
+    saída, layout e tipos). Se a execução for interrompida, o '.part' é
+    mantido e a próxima chamada com checkpoint=True continua de onde parou.
+    incremental: com o checkpoint de uma execução completa, anonimiza só as
+    linhas acrescentadas à entrada desde então e as anexa à saída existente
+    (implica checkpoint). Arquivos UTF-16/32, comprimidos e planilhas não
+    têm checkpoint.
+    Entradas .gz/.bz2/.xz/.zst (detectadas pelos magic bytes) são lidas
+    descomprimindo em fluxo, sem arquivo temporário.
+    compressao_saida: "gzip", "bz2", "xz" ou "zstd" para gravar a saída já
+    comprimida (em várias threads). None segue a extensão de caminho_saida;
+    sem caminho_saida, o padrão é ANON_<filename_original>, então uma
+    entrada .gz gera uma saída .gz.
+    perfil: perfil salvo (perfis.carregar_perfil). Com ele não há detecção
+    de encoding nem de tipos; as colunas de formato fixo usam o modelo
+    compilado e as marcadas como 'manter' são copiadas sem anonimizar.
+    layout=None usa o layout do perfil.
+    registros_por_parte / bytes_por_parte: grava a saída em partes
+    (ANON_x-00000.csv, ANON_x-00001.csv...) de até tantos registros e/ou
+    bytes (descomprimidos), durante o processamento e sem cortar registros,
+    mais o manifesto ANON_x.manifest.json com registros, bytes e SHA-256 de
+    cada parte; o caminho retornado é o do manifesto. repetir_cabecalho
+    copia o cabeçalho no início de todas as partes. Partes não têm
+    checkpoint.
+    encoding_completo: se a amostra do início for toda ASCII, detecta o
+    encoding lendo o arquivo inteiro (pega Latin-1 que só aparece depois;
+    custa uma leitura a mais da entrada).
+    Planilhas .xlsx/.xlsm são encaminhadas para excel.processar_xlsx.
+
+    Retorna (caminho_saida, comparacao, estatisticas), onde estatisticas é
+    um EstatisticasProcessamento (tempos por fase, coluna e tipo, cache,
+    linhas, bytes e erros). ANON_PROFILE=1 (ou =arquivo.prof) no ambiente
+    liga o profiling com cProfile.
     """
+    if layout is None:
+        layout = layout_do_perfil(perfil)
+    # Os avisos de erro valem por execução (a interface chama o processar várias vezes)
+    resetar_erros()
+    with perfilador():
+        if is_excel_file(entrada):
+            if perfil is not None:
+                print("⚠️ Perfis valem para arquivos de texto; a planilha usa só o layout.")
+            if checkpoint or incremental:
+                print("⚠️ Checkpoints não se aplicam a planilhas; processando o arquivo inteiro.")
+            if compressao_saida:
+                print("⚠️ Planilhas são gravadas como .xlsx, sem compressão adicional.")
+            if registros_por_parte or bytes_por_parte:
+                print("⚠️ Planilhas são gravadas em um arquivo só, sem partes.")
+            from features.anonymizer.excel import processar_xlsx  # openpyxl só quando preciso
+            return processar_xlsx(entrada, filename_original, layout, workers, colunas_sem_cache, caminho_saida,
+                                  progresso, cancelar, mapeamento)
+        return _processar_delimitado(entrada, filename_original, layout, workers, tamanho_bloco, colunas_sem_cache,
+                                     modo_bytes, manter_encoding, caminho_saida, progresso, cancelar, mapeamento,
+                                     checkpoint or incremental, incremental, compressao_saida, perfil,
+                                     registros_por_parte, bytes_por_parte, repetir_cabecalho, encoding_completo)
+
+
+def _processar_delimitado(entrada, filename_original, layout, workers, tamanho_bloco, colunas_sem_cache,
+                          modo_bytes, manter_encoding, caminho_saida, progresso, cancelar, mapeamento,
+                          checkpoint, incremental, compressao_saida, perfil=None, registros_por_parte=None,
+                          bytes_por_parte=None, repetir_cabecalho=False, encoding_completo=False):
+    """Corpo do processar para arquivos de texto delimitado."""
     print("🚀 Iniciando pipeline...")
-    
+    estatisticas = EstatisticasProcessamento(entrada)
+    if compressao_saida is not None and compressao_saida not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compressão desconhecida: {compressao_saida} (use {', '.join(COMPRESSION_SUFFIXES)})")
+
     # 1. Definir local de saída (Pasta 'saida' no projeto)
-    pasta_saida = os.path.join(os.getcwd(), "saida")
-    if not os.path.exists(pasta_saida):
-        os.makedirs(pasta_saida)
-    
-    caminho_saida = os.path.join(pasta_saida, f"ANON_{filename_original}")
-    
+    if caminho_saida is None:
+        caminho_saida = caminho_saida_para(filename_original)
+        if compressao_saida:
+            caminho_saida = strip_compression_suffix(caminho_saida) + COMPRESSION_SUFFIXES[compressao_saida]
+    compressao_saida = compressao_saida or compression_from_name(caminho_saida)
+    compressao_entrada = detect_compression(entrada)
+    if checkpoint and (compressao_entrada or compressao_saida):
+        print("⚠️ Checkpoints não se aplicam a arquivos comprimidos; processando o arquivo inteiro.")
+        checkpoint = False
+    em_partes = bool(registros_por_parte or bytes_por_parte)
+    if checkpoint and em_partes:
+        print("⚠️ Checkpoints não se aplicam à saída em partes; processando o arquivo inteiro.")
+        checkpoint = False
+    caminho_parcial = caminho_saida + SUFIXO_PARCIAL
+    retomada = carregar_retomada(caminho_saida, caminho_parcial, entrada, incremental) if checkpoint else None
+
     # Configurações
-    sep = layout["separator"]
+    larguras = layout.get("fixed_width")
+    if larguras:
+        sep, aspas = "", None  # Largura fixa: colunas por posição, sem separador nem aspas
+    else:
+        sep = layout["separator"]
+        aspas = layout.get("quote", '"')  # None desliga o tratamento de aspas
     start_data_idx = layout["data"]["start_line"]
     hs = layout["header"].get("start_line")
     he = layout["header"].get("end_line")
-    enc = detect_encoding(entrada)
-    
-    # 2. Amostragem para detecção de tipos
-    print("🔍 Detectando tipos...")
-    amostra_dados = []
-    with open(entrada, 'r', encoding=enc, errors="replace") as f:
-        # Pula header
-        for _ in range(start_data_idx): 
-            next(f, None)
-        # Lê amostra
-        for _ in range(150):
-            try:
-                line = next(f).strip()
-                if line: amostra_dados.append(line)
-            except StopIteration:
-                break
-    
-    tipos = detectar_tipos(amostra_dados, sep)
-    
+
+    # Entrada comprimida: o início do fluxo é lido uma vez e serve ao
+    # encoding, à amostra e depois ao próprio processamento
+    bruto_entrada = leitor = None
+    if compressao_entrada:
+        bruto_entrada = open(entrada, "rb")
+        leitor = wrap_reader(bruto_entrada, compressao_entrada)
+        with estatisticas.fase("amostragem"):
+            cabeca = ler_cabeca(leitor, start_data_idx + AMOSTRA_LINHAS)
+
+    with estatisticas.fase("encoding"):
+        # Na retomada vale o encoding da execução anterior (o início do arquivo é o mesmo)
+        if retomada:
+            enc = retomada["enc"]
+        elif perfil is not None and perfil.get("encoding"):
+            enc = perfil["encoding"]
+        else:
+            if leitor is not None:
+                enc = detect_encoding_bytes(cabeca[:ENCODING_SAMPLE_SIZE])
+                amostra_ascii = cabeca[:ENCODING_SAMPLE_SIZE].isascii()
+            else:
+                enc = detect_encoding(entrada)
+                amostra_ascii = encoding_completo and sample_is_ascii(entrada)
+            if encoding_completo and amostra_ascii:
+                print("🔎 Início do arquivo só em ASCII: detectando o encoding no arquivo inteiro...")
+                enc = detect_encoding(entrada, full=True)
+                print(f"   Encoding: {enc}")
+    if checkpoint and not supports_byte_offsets(enc):
+        print(f"⚠️ Checkpoints não disponíveis para {enc}; processando sem retomada.")
+        checkpoint, retomada = False, None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # 2. Amostra das linhas de dados: colunas de largura fixa, tipos e estratégia por coluna
+    with estatisticas.fase("amostragem"):
+        if leitor is not None:
+            if perfil is None:
+                print(f"⚠️ Entrada comprimida: tipos detectados só nas primeiras {AMOSTRA_LINHAS} linhas de dados.")
+            amostra_dados = amostrar_cabeca(cabeca, enc, start_data_idx, strip=not larguras)
+        else:
+            amostra_dados = amostrar(entrada, enc, start_data_idx, strip=not larguras)
+    if larguras == "auto":
+        # Inferidas antes do checkpoint: a impressão digital usa as colunas resolvidas
+        larguras = infer_fixed_spans(amostra_dados)
+        print(f"📏 {len(larguras)} colunas de largura fixa inferidas: "
+              + " ".join(f"{inicio}:{tamanho}" for inicio, tamanho in larguras))
+    if larguras:
+        larguras = check_fixed_spans(larguras)
+        layout = dict(layout, fixed_width=[list(coluna) for coluna in larguras])
+
+    # O modo bytes depende de poder cortar o arquivo em bytes '\n'
+    modo_bytes = modo_bytes and supports_byte_offsets(enc)
+    if larguras and modo_bytes and not _um_byte_por_caractere(enc):
+        modo_bytes = False  # As posições são de caracteres; em bytes só valem se coincidirem
+    if enc.lower().replace("_", "-") == "utf-8-sig":
+        enc_saida = "utf-8"  # O BOM da primeira linha é copiado junto com ela
+    elif larguras:
+        enc_saida = enc  # Largura fixa: outro encoding mudaria o tamanho das linhas em bytes
+    else:
+        enc_saida = enc if manter_encoding else "utf-8"
+
+    # A saída retomada precisa ter sido gerada com o mesmo layout e os mesmos tipos
+    if retomada and impressao_digital(layout, retomada["tipos"], enc, enc_saida, modo_bytes) != retomada["impressao"]:
+        print("⚠️ Layout ou opções diferentes do checkpoint; processando do início.")
+        retomada = None
+
+    # Detecção de tipos
+    if retomada:
+        tipos = retomada["tipos"]  # Redetectar poderia mudar os tipos no meio do arquivo
+    elif perfil is not None:
+        tipos = tipos_do_perfil(perfil)
+        print(f"📋 Tipos do perfil: {len(tipos)} colunas, {len(plano_do_perfil(perfil))} com formato fixo")
+    else:
+        print("🔍 Detectando tipos...")
+        with estatisticas.fase("deteccao"):
+            if larguras:
+                tipos, confianca = detectar_tipos_celulas([split_fixed(linha, larguras) for linha in amostra_dados])
+            else:
+                tipos, confianca = detectar_tipos_com_confianca(amostra_dados, sep, aspas=aspas)
+        if confianca:
+            media = sum(confianca.values()) / len(confianca)
+            print(f"   {len(tipos)} colunas, confiança média {media:.0%}")
+
+    cfg = {
+        "sep": sep,
+        "tipos": tipos,
+        "hs": hs,
+        "he": he,
+        "start_data_idx": start_data_idx,
+        "enc": enc,
+        "enc_saida": enc_saida,
+        "modo_bytes": modo_bytes,
+        "aspas": aspas,
+        "pendente": None,
+        "sem_cache": frozenset(colunas_sem_cache or ()) | frozenset(perfil.get("sem_cache", ()) if perfil else ()),
+        "chave": chave_atual(),
+        "proximo_idx": 0,
+        "medidas": novas_medidas(),
+        "mapeamento": mapeamento,
+        "plano": plano_do_perfil(perfil) if perfil else None,
+        "larguras": tuple(larguras) if larguras else None,
+        "tabelas": {},  # Preenchido por _definir_estrategias
+    }
+    # Separador/aspas na forma usada na leitura (str ou bytes) e na gravação
+    if modo_bytes:
+        cfg.update({
+            "sep_entrada": sep.encode(enc),
+            "sep_saida": sep.encode(enc_saida),
+            "aspas_entrada": aspas.encode(enc) if aspas else None,
+            "aspas_saida": aspas.encode(enc_saida) if aspas else None,
+            "nl_entrada": b"\n",
+            "eol_entrada": b"\r\n",
+        })
+    else:
+        cfg.update({
+            "sep_entrada": sep,
+            "sep_saida": sep,
+            "aspas_entrada": aspas,
+            "aspas_saida": aspas,
+            "nl_entrada": "\n",
+            "eol_entrada": "\r\n",
+        })
+
     # 3. Processamento e Captura de Comparação (Streaming)
-    print("💾 Processando...")
-    
     comparacao = [] # Lista para guardar (original, novo)
-    count = 0
-    
-    with open(entrada, 'r', encoding=enc, errors="replace") as fin, \
-         open(caminho_saida, "w", encoding="utf-8") as fout:
-        
-        # Copia cabeçalho se existir
-        fin.seek(0)
-        linhas_lidas = enumerate(fin)
-        
-        # Reset para ler e gravar
-        for idx, linha in linhas_lidas:
-            linha_raw = linha.strip()
-            
-            # Cabeçalho: Copia e salva para comparação se quiser
-            if hs is not None and he is not None and hs <= idx <= he:
-                fout.write(linha_raw + "\n")
-                continue
-            
-            if idx < start_data_idx or not linha_raw:
-                continue
-
-            # Dados: Anonimiza
-            campos = linha_raw.split(sep)
-            novos_campos = []
-            
-            for i, val in enumerate(campos):
-                tipo = tipos.get(i, "texto")
-                val_anon = anonimizar(val, tipo)
-                novos_campos.append(str(val_anon))
-            
-            nova_linha = sep.join(novos_campos)
-            fout.write(nova_linha + "\n")
-            
-            # Guarda as primeiras 20 linhas para mostrar ao usuário
-            if len(comparacao) < 20:
-                comparacao.append((linha_raw, nova_linha))
-            
-            count += 1
-
-    print(f"✅ Arquivo salvo em: {caminho_saida}")
-    return caminho_saida, comparacao
\ No newline at end of file
+    inicio = retomada["bytes_entrada"] if retomada else 0
+    andamento = Progresso(os.path.getsize(entrada), progresso, cancelar, inicio)
+    andamento.verificar()
+
+    # Grava em '<saida>.part' e só renomeia no fim: nada de ANON_* incompleto
+    if retomada:
+        print(f"↪️ Retomando do byte {inicio:,} ({retomada['linhas']:,} linhas já anonimizadas)")
+        if retomada["arquivo"] != caminho_parcial:
+            os.replace(retomada["arquivo"], caminho_parcial)  # Incremental: continua a saída completa
+        # Descarta o que foi gravado depois do último checkpoint
+        os.truncate(caminho_parcial, retomada["bytes_saida"])
+        cfg["proximo_idx"] = retomada["proximo_idx"]
+        modo_abertura = "a"
+    else:
+        modo_abertura = "w"
+        if not checkpoint and os.path.exists(caminho_saida + SUFIXO_CHECKPOINT):
+            # Esta execução sobrescreve a saída: o checkpoint antigo não vale mais
+            os.remove(caminho_saida + SUFIXO_CHECKPOINT)
+    # Encoding do arquivo gravado no modo texto (no modo bytes as linhas já vêm em enc_saida)
+    enc_texto = enc_saida if larguras else "utf-8"
+    estatisticas.encoding, estatisticas.encoding_saida = enc, enc_saida if modo_bytes else enc_texto
+    if em_partes:
+        # Cada parte é fechada (e conferida) assim que enche; o manifesto vem no fim
+        remover_partes_antigas(caminho_manifesto(caminho_saida))
+        fout = GravadorPartes(caminho_saida, enc_saida if modo_bytes else enc_texto, registros_por_parte,
+                              bytes_por_parte, _linhas_cabecalho(hs, he), repetir_cabecalho, compressao_saida,
+                              cfg["sep_saida"], cfg["aspas_saida"], entrada=os.path.basename(entrada))
+    elif compressao_saida:
+        # Comprimida durante a gravação: a saída nunca existe descomprimida no disco
+        fout = open_output(caminho_parcial, compressao_saida)
+        if not modo_bytes:
+            fout = io.TextIOWrapper(fout, encoding=enc_texto, errors="replace")
+    elif modo_bytes:
+        fout = open(caminho_parcial, modo_abertura + "b")
+    else:
+        fout = open(caminho_parcial, modo_abertura, encoding=enc_texto, errors="replace" if larguras else None)
+
+    ponto = None
+    if checkpoint:
+        ponto = GravadorCheckpoint(caminho_saida, entrada, impressao_digital(layout, tipos, enc, enc_saida, modo_bytes),
+                                   enc, tipos, retomada["linhas"] if retomada else 0,
+                                   limite=_inicio_registro_final(entrada, inicio, cfg))
+        ponto.registrar(inicio, cfg["proximo_idx"], 0, fout, forcar=True)
+
+    antes = contadores_globais()
+    if mapeamento:
+        abrir_mapeamento(mapeamento)  # Cria o banco antes que os workers o abram
+    try:
+        # Dentro do try: erro ao montar as tabelas também fecha a saída e apaga o .part
+        with fout:
+            with estatisticas.fase("estrategia"):
+                estatisticas.estrategias = _definir_estrategias(amostra_dados, cfg)
+            tabelas = [str(i) for i, e in estatisticas.estrategias.items() if e["estrategia"] == ESTRATEGIA_TABELA]
+            if tabelas:
+                print(f"🗂️ Tabela completa para as colunas {', '.join(tabelas)} (poucos valores distintos)")
+            with estatisticas.fase("processamento"):
+                if leitor is not None and not supports_byte_offsets(enc):
+                    print("💾 Processando (fluxo comprimido)...")
+                    leitor.close()  # UTF-16/32: lido de novo já como texto
+                    count = _processar_serial(entrada, fout, cfg, comparacao, andamento)
+                elif leitor is not None and workers > 1:
+                    print(f"💾 Processando fluxo comprimido em paralelo ({workers} processos)...")
+                    count = _processar_paralelo_fluxo(leitor, cabeca, bruto_entrada.tell, fout, cfg, comparacao,
+                                                      workers, tamanho_bloco, andamento)
+                elif leitor is not None:
+                    print("💾 Processando (fluxo comprimido)...")
+                    trechos = trechos_fluxo(leitor, cabeca, bruto_entrada.tell)
+                    count = _processar_trechos(trechos, fout, cfg, comparacao, andamento)
+                elif workers > 1 and supports_byte_offsets(enc):
+                    print(f"💾 Processando em paralelo ({workers} processos)...")
+                    count = _processar_paralelo(entrada, fout, cfg, comparacao, workers, tamanho_bloco, andamento,
+                                                inicio, ponto)
+                elif supports_byte_offsets(enc):
+                    print("💾 Processando (modo bytes)..." if modo_bytes else "💾 Processando...")
+                    trechos = _trechos_arquivo(entrada, inicio, ponto.limite if ponto is not None else None)
+                    count = _processar_trechos(trechos, fout, cfg, comparacao, andamento, ponto)
+                else:
+                    print("💾 Processando...")
+                    count = _processar_serial(entrada, fout, cfg, comparacao, andamento)
+        if em_partes:
+            caminho_saida = fout.caminho_manifesto
+        else:
+            os.replace(caminho_parcial, caminho_saida)
+        if ponto is not None:
+            ponto.concluir()
+    except BaseException:
+        if ponto is not None:
+            print(f"⏸️ Saída parcial mantida em {caminho_parcial}; processe de novo com checkpoint para retomar.")
+        elif os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+        raise
+    finally:
+        if leitor is not None:
+            leitor.close()
+            bruto_entrada.close()
+        if mapeamento:
+            # Entradas novas são gravadas mesmo se a execução for interrompida
+            with estatisticas.fase("mapeamento"):
+                fechar_mapeamento(mapeamento)
+        estatisticas.somar(cfg["medidas"])
+        estatisticas.somar(diferenca_contadores(antes))
+        # Libera a memória dos valores memorizados nesta execução
+        limpar_cache()
+
+    estatisticas.finalizar(count)
+    if em_partes:
+        print(f"✅ {len(fout.partes)} partes salvas ({count} linhas); manifesto em: {caminho_saida}")
+    else:
+        print(f"✅ Arquivo salvo em: {caminho_saida} ({count} linhas)")
+    return caminho_saida, comparacao, estatisticas
@@ -3,12 +3,15 @@
 # ============================================================================
 
 import os
+import threading
+import time
 import flet as ft
-import tkinter as tk
-from tkinter import filedialog
-from core.file_utils import detect_encoding
-from core.ui_components import get_border, open_folder, StatusText
-from features.anonymizer.pipeline import processar
+from core.file_utils import detect_encoding, is_excel_file
+from core.line_index import LineSource
+from core.ui_components import get_border, open_folder, StatusText, VirtualRows
+
+# Intervalo mínimo entre atualizações de progresso na tela (segundos)
+INTERVALO_PROGRESSO_S = 0.25
 
 class AnonymizerTab(ft.Container):
     def __init__(self, page: ft.Page):
@@ -21,9 +24,13 @@ class AnonymizerTab(ft.Container):
             "header_start": None,
             "header_end": None,
             "data_start": None,
-            "lines_preview": [],
+            "encoding": None,
             "separator": "|"
         }
+        self._fonte = None        # LineSource do arquivo em prévia (None para planilhas)
+        self._planilha = None     # FontePlanilha da planilha em prévia
+        self._comparacao = None   # LeitorComparacao (ou a lista de pares, para planilhas)
+        self._perfil = None       # Perfil salvo em uso (layout, encoding e tipos sem detecção)
         self._build_ui()
     #
     
@@ -31,25 +38,25 @@ class AnonymizerTab(ft.Container):
         self.txt_status = StatusText()
         self.txt_status.set_info("Selecione um arquivo para começar...")
         
-        # Lista de preview (inicial)
-        self.lv_preview = ft.ListView(expand=True, spacing=4, padding=12)
+        # Prévia (inicial): só as linhas visíveis são lidas do arquivo, em qualquer posição
+        self.vr_preview = VirtualRows(
+            fetch=self._fetch_preview,
+            on_row_click=self._on_line_click,
+            row_style=self._line_color,
+        )
         
-        # Tabela de comparação (inicialmente oculta)
-        self.dt_comparison = ft.DataTable(
-            columns=[
-                ft.DataColumn(ft.Text("Original", weight="bold", color="red")),
-                ft.DataColumn(ft.Text("Anonimizado", weight="bold", color="green")),
-            ],
-            rows=[],
+        # Comparação (inicialmente oculta): original e anonimizado lidos lado a lado
+        self.vr_comparison = VirtualRows(
+            fetch=self._fetch_comparison,
+            columns=2,
+            colors=["red", "green"],
+            headers=["Original", "Anonimizado"],
             visible=False,
-            heading_row_color=ft.Colors.BLUE_50,
-            border=get_border("#BDBDBD"),
-            expand=True,
         )
 
         # Container que alterna entre Preview e Comparação
         self.content_area = ft.Container(
-            content=ft.Column([self.lv_preview, self.dt_comparison], scroll="auto", expand=True),
+            content=ft.Column([self.vr_preview, self.vr_comparison], expand=True),
             expand=True,
             border=get_border("#BDBDBD"),
             border_radius=5,
@@ -75,6 +82,12 @@ class AnonymizerTab(ft.Container):
             value="|",
             width=120
         )
+        self.chk_fixed = ft.Checkbox(
+            label="Largura fixa",
+            tooltip="Colunas por posição, sem separador (inferidas do arquivo, separadas por 2+ espaços, "
+                    "ou do perfil)",
+            value=False
+        )
         
         # Botões
         btn_pick = ft.ElevatedButton(
@@ -95,16 +108,46 @@ class AnonymizerTab(ft.Container):
             on_click=self._run_process
         )
         
-        top_bar = ft.Row([self.txt_file_path, btn_pick, self.dd_sep, self.btn_process, btn_reset])
+        self.btn_cancel = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(ft.Icons.STOP), ft.Text("Cancelar")]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.RED_400, color="white"),
+            on_click=self._cancel_process,
+            visible=False
+        )
+        self.pb_progress = ft.ProgressBar(visible=False)
+        self._cancelar = None
+        
+        # Perfis salvos (perfis/*.json)
+        self.dd_profile = ft.Dropdown(
+            label="Perfil",
+            options=self._profile_options(),
+            value="",
+            width=200,
+            on_change=self._on_profile_change
+        )
+        self.txt_profile_name = ft.TextField(label="Salvar layout como", width=180, text_size=12)
+        btn_save_profile = ft.IconButton(
+            icon=ft.Icons.SAVE,
+            tooltip="Salvar layout, encoding e tipos como perfil",
+            on_click=self._save_profile
+        )
+        
+        top_bar = ft.Row([self.txt_file_path, btn_pick, self.dd_sep, self.chk_fixed, self.btn_process, self.btn_cancel, btn_reset])
+        profile_bar = ft.Row([self.dd_profile, self.txt_profile_name, btn_save_profile])
         
         self.content = ft.Column([
             top_bar,
+            profile_bar,
             self.txt_status,
+            self.pb_progress,
             self.content_area
         ], expand=True)
 
     def _pick_file_native(self, e):
         try:
+            # tkinter só é carregado quando o seletor de arquivos é aberto
+            import tkinter as tk
+            from tkinter import filedialog
             root = tk.Tk()
             root.withdraw() 
             root.attributes('-topmost', True)
@@ -120,34 +163,57 @@ class AnonymizerTab(ft.Container):
             
     def _load_file(self, path):
         self._reset_view(None) # Limpa views anteriores
-        self.state["file_path"] = path
-        self.lv_preview.controls.clear()
+        self._fechar_fontes()
+        self.state.update(file_path=path, header_start=None, header_end=None, data_start=None, encoding=None)
         
         try:
-            enc = detect_encoding(path)
-            with open(path, "r", encoding=enc, errors="replace") as f:
-                lines = [f.readline().strip() for _ in range(50)]
-            
-            self.state["lines_preview"] = [x for x in lines if x]
-            
-            for i, txt in enumerate(self.state["lines_preview"]):
-                self.lv_preview.controls.append(ft.Container(
-                    content=ft.Text(txt, size=12, font_family="Consolas", color="black"),
-                    padding=5,
-                    bgcolor="white",
-                    border=get_border("#E0E0E0"),
-                    data=i,
-                    on_click=self._on_line_click
-                ))
+            if is_excel_file(path):
+                from features.anonymizer.excel import FontePlanilha
+                self._planilha = FontePlanilha(path)
+            else:
+                self.state["encoding"] = detect_encoding(path)
+                self._fonte = LineSource(path, self.state["encoding"])
+            # Mostra o início já; o total chega quando o índice de linhas ficar pronto
+            self.vr_preview.set_total(0, exact=False)
+            self.vr_preview.go_to(0)
             
             self.txt_status.set_success("✅ Arquivo carregado. Selecione HEADER (Verde) e DADOS (Azul).")
+            if self._perfil is not None:
+                self._on_profile_change(None)  # Marca as linhas do perfil escolhido
             self.main_page.update()
         except Exception as e:
             self.txt_status.set_error(f"Erro: {e}")
             self.main_page.update()
+            return
+
+        if self._fonte is not None and self._fonte.seekable:
+            threading.Thread(target=self._indexar_preview, args=(self._fonte,), daemon=True).start()
+
+    def _indexar_preview(self, fonte):
+        """Executado fora da thread da interface: indexa o arquivo para rolar até qualquer linha."""
+        try:
+            fonte.open_index()
+        except OSError:
+            return
+        if fonte is self._fonte:
+            self.vr_preview.set_total(fonte.line_count)
+            self.main_page.update()
+
+    def _fetch_preview(self, inicio, quantidade):
+        """Janela da prévia: [(linha, número exibido, [texto])]."""
+        # Planilhas: fluxo aberto uma vez, com as janelas recentes em memória
+        fonte = self._fonte if self._fonte is not None else self._planilha
+        if fonte is None:
+            return []
+        lines = fonte.read_lines(inicio, inicio + quantidade)
+        completo = fonte.complete
+        total = fonte.line_count
+        if not self.vr_preview.exact:
+            self.vr_preview.set_total(max(total, self.vr_preview.total), exact=completo)
+        return [(inicio + i, inicio + i + 1, [txt]) for i, txt in enumerate(lines)]
 
-    def _on_line_click(self, e):
-        idx = e.control.data
+    def _on_line_click(self, idx):
+        # idx é o número absoluto da linha no arquivo (0-based), como no layout
         if self.state["header_start"] is None:
             self.state["header_start"] = idx
         elif self.state["header_end"] is None:
@@ -161,19 +227,92 @@ class AnonymizerTab(ft.Container):
             self.state["header_start"] = idx
             self.state["header_end"] = None
             self.state["data_start"] = None
-        self._update_colors()
+        # Só as linhas visíveis cuja cor mudou são redesenhadas
+        self.vr_preview.refresh_styles()
 
-    def _update_colors(self):
+    def _line_color(self, idx):
         hs, he, ds = self.state["header_start"], self.state["header_end"], self.state["data_start"]
-        for c in self.lv_preview.controls:
-            idx = c.data
-            if hs is not None and idx == hs: c.bgcolor = "#A5D6A7" # Verde claro
-            elif he is not None and idx == he: c.bgcolor = "#A5D6A7"
-            elif hs is not None and he is not None and hs < idx < he: c.bgcolor = "#E8F5E9"
-            elif ds is not None and idx >= ds: c.bgcolor = "#BBDEFB" # Azul claro
-            else: c.bgcolor = "white"
+        if hs is not None and idx == hs: return "#A5D6A7" # Verde claro
+        if he is not None and idx == he: return "#A5D6A7"
+        if hs is not None and he is not None and hs < idx < he: return "#E8F5E9"
+        if ds is not None and idx >= ds: return "#BBDEFB" # Azul claro
+        return "white"
+
+    def _profile_options(self):
+        from features.anonymizer.perfis import listar_perfis
+        return [ft.dropdown.Option("", "(nenhum)")] + [ft.dropdown.Option(nome) for nome in listar_perfis()]
+
+    def _on_profile_change(self, e):
+        """Aplica o layout do perfil escolhido; os tipos dele são usados ao processar."""
+        from features.anonymizer.perfis import carregar_perfil, layout_do_perfil
+
+        if not self.dd_profile.value:
+            self._perfil = None
+            self.txt_status.set_info("Sem perfil: encoding e tipos serão detectados.")
+            self.main_page.update()
+            return
+        try:
+            self._perfil = carregar_perfil(self.dd_profile.value)
+        except (OSError, ValueError, KeyError) as err:
+            self._perfil = None
+            self.txt_status.set_error(f"Perfil inválido: {err}")
+            self.main_page.update()
+            return
+
+        layout = layout_do_perfil(self._perfil)
+        self.state["header_start"] = layout["header"].get("start_line")
+        self.state["header_end"] = layout["header"].get("end_line")
+        self.state["data_start"] = layout["data"]["start_line"]
+        sep = "TAB" if layout["separator"] == "\t" else layout["separator"]
+        if sep not in [o.key for o in self.dd_sep.options]:
+            self.dd_sep.options.append(ft.dropdown.Option(sep))
+        self.dd_sep.value = sep
+        self.chk_fixed.value = bool(layout.get("fixed_width"))
+        self.vr_preview.refresh_styles()
+        self.txt_status.set_success(f"📋 Perfil '{self.dd_profile.value}': {len(self._perfil['colunas'])} colunas, "
+                                    f"sem detecção de encoding e tipos.")
+        self.main_page.update()
+
+    def _save_profile(self, e):
+        """Salva o layout marcado (com encoding e tipos detectados agora) como perfil."""
+        from features.anonymizer.perfis import criar_perfil, salvar_perfil
+
+        nome = (self.txt_profile_name.value or "").strip()
+        if not nome or not self.state["file_path"] or self.state["data_start"] is None:
+            self.main_page.snack_bar = ft.SnackBar(ft.Text("❌ Selecione arquivo, linha de dados e o nome do perfil!"))
+            self.main_page.snack_bar.open = True
+            self.main_page.update()
+            return
+        if is_excel_file(self.state["file_path"]):
+            self.txt_status.set_error("Perfis valem para arquivos de texto (CSV/TXT).")
+            self.main_page.update()
+            return
+        try:
+            self._perfil = criar_perfil(self.state["file_path"], self._layout())
+            caminho = salvar_perfil(self._perfil, nome)
+        except Exception as err:
+            self.txt_status.set_error(f"Erro ao salvar o perfil: {err}")
+            self.main_page.update()
+            return
+        self.dd_profile.options = self._profile_options()
+        self.dd_profile.value = nome
+        self.txt_status.set_success(f"📋 Perfil salvo em: {caminho}")
         self.main_page.update()
 
+    def _layout(self):
+        """Layout no formato do pipeline a partir das linhas marcadas."""
+        sep = "\t" if self.dd_sep.value == "TAB" else self.dd_sep.value
+        he = self.state["header_end"] if self.state["header_end"] else self.state["header_start"]
+        layout = {
+            "header": {"start_line": self.state["header_start"], "end_line": he},
+            "data": {"start_line": self.state["data_start"]},
+            "separator": sep
+        }
+        if self.chk_fixed.value:
+            # As colunas do perfil, se houver; senão são inferidas do arquivo
+            layout["fixed_width"] = ((self._perfil or {}).get("layout") or {}).get("fixed_width") or "auto"
+        return layout
+
     def _run_process(self, e):
         if not self.state["file_path"] or self.state["data_start"] is None:
             self.main_page.snack_bar = ft.SnackBar(ft.Text("❌ Selecione arquivo e linha de dados!"))
@@ -183,26 +322,42 @@ class AnonymizerTab(ft.Container):
 
         self.btn_process.disabled = True
         self.btn_process.content = ft.Row([ft.ProgressRing(width=16, height=16), ft.Text(" Processando...")])
+        self.btn_cancel.visible = True
+        self.btn_cancel.disabled = False
+        self.pb_progress.value = None  # Indeterminado até o primeiro evento
+        self.pb_progress.visible = True
+        self.txt_status.set_info("⏳ Processando...")
         self.main_page.update()
 
+        layout = self._layout()
+
+        # O pipeline roda em uma thread; a interface continua respondendo
+        self._cancelar = threading.Event()
+        self._ultimo_progresso = 0.0
+        threading.Thread(
+            target=self._executar_pipeline,
+            args=(self.state["file_path"], layout, self._perfil),
+            daemon=True,
+        ).start()
+
+    def _executar_pipeline(self, path, layout, perfil=None):
+        """Executado fora da thread da interface."""
+        # Importado aqui: abrir a aba não carrega o pipeline (nem NumPy)
+        from features.anonymizer.pipeline import ProcessamentoCancelado, processar
+
+        filename = os.path.basename(path)
         try:
-            sep = "\t" if self.dd_sep.value == "TAB" else self.dd_sep.value
-            he = self.state["header_end"] if self.state["header_end"] else self.state["header_start"]
-            
-            layout = {
-                "header": {"start_line": self.state["header_start"], "end_line": he},
-                "data": {"start_line": self.state["data_start"]},
-                "separator": sep
-            }
-            
-            filename = os.path.basename(self.state["file_path"])
-            
             # --- CHAMA O PIPELINE ATUALIZADO ---
-            caminho_saida, dados_comparacao = processar(self.state["file_path"], filename, layout)
-            
+            caminho_saida, dados_comparacao, estatisticas = processar(
+                path, filename, layout,
+                progresso=self._on_progress, cancelar=self._cancelar, perfil=perfil,
+            )
+
             # --- MOSTRAR COMPARAÇÃO NA TELA ---
-            self._show_comparison(caminho_saida, dados_comparacao)
-            
+            self._show_comparison(caminho_saida, dados_comparacao, estatisticas, layout)
+
+        except ProcessamentoCancelado:
+            self.txt_status.set_info("⛔ Processamento cancelado. Nenhum arquivo foi gerado.")
         except Exception as err:
             import traceback
             traceback.print_exc()
@@ -210,23 +365,61 @@ class AnonymizerTab(ft.Container):
         finally:
             self.btn_process.disabled = False
             self.btn_process.content = ft.Row([ft.Icon(ft.Icons.SECURITY), ft.Text("ANONIMIZAR")])
+            self.btn_cancel.visible = False
+            self.pb_progress.visible = False
             self.main_page.update()
 
-    def _show_comparison(self, caminho_saida, dados):
-        """Exibe a tabela de comparação."""
-        self.lv_preview.visible = False
-        self.dt_comparison.visible = True
-        self.dt_comparison.rows.clear()
-        
-        for original, novo in dados:
-            self.dt_comparison.rows.append(
-                ft.DataRow(cells=[
-                    ft.DataCell(ft.Text(original, size=11, font_family="Consolas", color="red")),
-                    ft.DataCell(ft.Text(novo, size=11, font_family="Consolas", color="green")),
-                ])
-            )
+    def _on_progress(self, evento):
+        """Recebe os eventos do pipeline; a tela é atualizada poucas vezes por segundo."""
+        agora = time.monotonic()
+        if agora - self._ultimo_progresso < INTERVALO_PROGRESSO_S:
+            return
+        self._ultimo_progresso = agora
+
+        total, lidos = evento["bytes_total"], evento["bytes_lidos"]
+        texto = f"⏳ {evento['linhas']:,} linhas • {evento['linhas_por_segundo']:,.0f} linhas/s"
+        if total and lidos is not None:
+            self.pb_progress.value = min(lidos / total, 1.0)
+            texto += f" • {lidos / total:.0%}"
+        if evento["eta_s"] is not None:
+            texto += f" • faltam ~{evento['eta_s']:.0f}s"
+        self.txt_status.set_info(texto.replace(",", "."))
+        self.main_page.update()
+
+    def _cancel_process(self, e):
+        if self._cancelar is not None:
+            self._cancelar.set()
+            self.btn_cancel.disabled = True
+            self.txt_status.set_info("⏳ Cancelando...")
+            self.main_page.update()
+
+    def _show_comparison(self, caminho_saida, dados, estatisticas=None, layout=None):
+        """
+        Exibe a comparação. Para arquivos de texto, original e anonimizado
+        são lidos lado a lado em qualquer posição; planilhas mostram as
+        linhas de exemplo devolvidas pelo pipeline.
+        """
+        self._fechar_comparacao()
+        if self._fonte is not None and layout is not None:
+            from features.anonymizer.visualizacao import LeitorComparacao
+            # A saída pode estar no encoding da entrada (largura fixa, manter_encoding)
+            encoding, encoding_saida = self.state["encoding"], "utf-8"
+            if estatisticas is not None and estatisticas.encoding_saida:
+                encoding, encoding_saida = estatisticas.encoding, estatisticas.encoding_saida
+            self._comparacao = LeitorComparacao(self.state["file_path"], caminho_saida, layout,
+                                                encoding, encoding_saida)
+            self.vr_comparison.set_total(self._comparacao.total_estimado, exact=False)
+        else:
+            self._comparacao = list(dados)
+            self.vr_comparison.set_total(len(self._comparacao))
+        self.vr_preview.visible = False
+        self.vr_comparison.visible = True
+        self.vr_comparison.go_to(0)
             
-        self.txt_status.set_success(f"✅ Concluído! Salvo em: .../saida/{os.path.basename(caminho_saida)}")
+        resumo = ""
+        if estatisticas is not None:
+            resumo = f" ({estatisticas.linhas:,} linhas em {estatisticas.total_s:.1f}s)".replace(",", ".")
+        self.txt_status.set_success(f"✅ Concluído! Salvo em: .../saida/{os.path.basename(caminho_saida)}{resumo}")
         
         # Botão para abrir a pasta
         dlg = ft.AlertDialog(
@@ -241,9 +434,42 @@ class AnonymizerTab(ft.Container):
         dlg.open = True
         self.main_page.update()
 
+        # Ainda na thread do pipeline: indexa os dois arquivos para saltar a qualquer registro
+        comparacao = self._comparacao
+        if not isinstance(comparacao, list):
+            comparacao.abrir_indices()
+            if comparacao is self._comparacao:
+                self.vr_comparison.set_total(comparacao.total_estimado)
+                self.main_page.update()
+
+    def _fetch_comparison(self, inicio, quantidade):
+        """Janela da comparação: [(registro, linha no original, [original, anonimizado])]."""
+        comparacao = self._comparacao
+        if comparacao is None:
+            return []
+        if isinstance(comparacao, list):
+            return [(inicio + i, None, list(par))
+                    for i, par in enumerate(comparacao[inicio:inicio + quantidade])]
+        return [(inicio + i, lo + 1, [to, ta])
+                for i, (lo, to, la, ta) in enumerate(comparacao.pares(inicio, quantidade))]
+
+    def _fechar_comparacao(self):
+        if self._comparacao is not None and not isinstance(self._comparacao, list):
+            self._comparacao.fechar()
+        self._comparacao = None
+
+    def _fechar_fontes(self):
+        self._fechar_comparacao()
+        if self._fonte is not None:
+            self._fonte.close()
+        self._fonte = None
+        if self._planilha is not None:
+            self._planilha.close()
+        self._planilha = None
+
     def _reset_view(self, e):
-        self.lv_preview.visible = True
-        self.dt_comparison.visible = False
+        self.vr_preview.visible = True
+        self.vr_comparison.visible = False
         self.main_page.update()
 
     def _close_dlg(self):
@@ -0,0 +1,133 @@
+# ============================================================================
+# ARQUIVO: features/anonymizer/visualizacao.py
+# Leitura sob demanda do original e do anonimizado para a comparação na tela
+# ============================================================================
+
+import re
+import threading
+from itertools import islice
+
+from core.line_index import LineSource
+from core.tokenizer import iter_layout_records
+from features.anonymizer.pipeline import layout_saida
+
+# Registros entre duas marcas da tabela de posições
+PASSO_MARCAS = 1024
+# Linha vazia ou só com espaços (o pipeline não copia essas linhas)
+_RE_LINHA_VAZIA = re.compile(rb"(?:^|\n)[ \t\r\f\v]*(?:\n|$)")
+
+
+class _Arquivo:
+    """Um dos lados da comparação: linhas sob demanda e as regras do seu layout."""
+
+    def __init__(self, caminho, encoding, layout):
+        self.fonte = LineSource(caminho, encoding)
+        self.sep = layout.get("separator") or ""
+        # Largura fixa: uma linha é sempre um registro (sem aspas)
+        self.aspas = None if layout.get("fixed_width") else layout.get("quote", '"')
+        self.cabecalho = (layout["header"].get("start_line"), layout["header"].get("end_line"))
+        self.inicio_dados = layout["data"]["start_line"]
+        # Primeira linha a partir da qual todas as linhas não vazias são dados
+        self.fim_regiao = max(self.inicio_dados, (self.cabecalho[1] or -1) + 1)
+
+    def registros(self, linha, quantidade):
+        """
+        Até quantidade + 1 registros a partir de 'linha' (início de um
+        registro): [(linha_inicial, texto)]. O último só serve para saber
+        onde começa o próximo.
+        """
+        janela = max(2 * quantidade, 64)
+        while True:
+            linhas = self.fonte.read_lines(linha, linha + janela)
+            registros = list(islice(iter_layout_records(linhas, self.sep, self.aspas, self.cabecalho,
+                                                        self.inicio_dados, linha), quantidade + 1))
+            if len(registros) > quantidade or len(linhas) < janela:
+                return registros
+            janela *= 4  # Linhas vazias ou registros com várias linhas: lê mais
+
+    def salto_direto(self, linha, quantidade):
+        """
+        Se as próximas 'quantidade' linhas forem todas registros de uma
+        linha (sem aspas nem linhas vazias), a posição do registro seguinte
+        é só linha + quantidade: confere os bytes sem decodificar nada.
+        """
+        indice = self.fonte.index
+        if indice is None or linha < self.fim_regiao or linha + quantidade >= indice.line_count:
+            return None
+        bruto = indice.read_raw(linha, linha + quantidade)
+        if self.aspas and self.aspas.encode(self.fonte.encoding) in bruto:
+            return None
+        if _RE_LINHA_VAZIA.search(bruto.rstrip(b"\n")):
+            return None
+        return linha + quantidade
+
+
+class LeitorComparacao:
+    """
+    Registros do original e do anonimizado lado a lado, em qualquer
+    posição, lidos direto dos dois arquivos (nada fica inteiro em memória).
+    O registro k de um corresponde ao registro k do outro; uma tabela de
+    marcas guarda, a cada PASSO_MARCAS registros, onde cada um começa nos
+    dois arquivos, e é estendida sob demanda.
+    """
+
+    def __init__(self, original, anonimizado, layout, encoding_original, encoding_anonimizado="utf-8"):
+        self.original = _Arquivo(original, encoding_original, layout)
+        self.anonimizado = _Arquivo(anonimizado, encoding_anonimizado, layout_saida(layout))
+        self._marcas = [(0, 0)]
+        self._total = None  # Conhecido quando as marcas chegam ao fim do arquivo
+        self._lock = threading.Lock()
+
+    def abrir_indices(self):
+        """Indexa os dois arquivos (leitura completa; chamar fora da thread da interface)."""
+        self.original.fonte.open_index()
+        self.anonimizado.fonte.open_index()
+
+    @property
+    def total_estimado(self):
+        """Registros do anonimizado (exato se nenhum registro ocupa várias linhas)."""
+        if self._total is not None:
+            return self._total
+        fonte = self.anonimizado.fonte
+        return max(fonte.line_count - self.anonimizado.fim_regiao, 0)
+
+    def _avancar_marcas(self, ate):
+        while len(self._marcas) <= ate and self._total is None:
+            linha_orig, linha_anon = self._marcas[-1]
+            proxima_orig = self.original.salto_direto(linha_orig, PASSO_MARCAS)
+            proxima_anon = self.anonimizado.salto_direto(linha_anon, PASSO_MARCAS)
+            if proxima_orig is None:
+                registros = self.original.registros(linha_orig, PASSO_MARCAS)
+                proxima_orig = registros[PASSO_MARCAS][0] if len(registros) > PASSO_MARCAS else None
+                faltam_orig = len(registros)
+            if proxima_anon is None:
+                registros = self.anonimizado.registros(linha_anon, PASSO_MARCAS)
+                proxima_anon = registros[PASSO_MARCAS][0] if len(registros) > PASSO_MARCAS else None
+                faltam_anon = len(registros)
+            if proxima_orig is None or proxima_anon is None:
+                # Fim de um dos arquivos: os registros que sobram têm par só até o menor
+                restantes = min(faltam_orig if proxima_orig is None else PASSO_MARCAS,
+                                faltam_anon if proxima_anon is None else PASSO_MARCAS)
+                self._total = (len(self._marcas) - 1) * PASSO_MARCAS + restantes
+                return
+            self._marcas.append((proxima_orig, proxima_anon))
+
+    def pares(self, inicio, quantidade):
+        """
+        Registros [inicio, inicio + quantidade): lista de
+        (linha_original, texto_original, linha_anonimizado, texto_anonimizado).
+        """
+        marca = inicio // PASSO_MARCAS
+        with self._lock:
+            self._avancar_marcas(marca)
+            if marca >= len(self._marcas):
+                return []
+            linha_orig, linha_anon = self._marcas[marca]
+        pular = inicio - marca * PASSO_MARCAS
+        originais = self.original.registros(linha_orig, pular + quantidade)[pular:pular + quantidade]
+        anonimizados = self.anonimizado.registros(linha_anon, pular + quantidade)[pular:pular + quantidade]
+        return [(lo, to, la, ta) for (lo, to), (la, ta) in zip(originais, anonimizados)]
+
+    def fechar(self):
+        self.original.fonte.close()
+        self.anonimizado.fonte.close()
@@ -0,0 +1,88 @@
+# ============================================================================
+# ARQUIVO: features/converter/__main__.py
+# Linha de comando do conversor (sem interface gráfica)
+# Uso: python -m features.converter ENTRADA [opções]
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+
+from features.anonymizer.__main__ import montar_layout
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m features.converter",
+        description="Converte um arquivo delimitado (CSV/TXT, também .gz/.bz2/.xz/.zst) para Parquet ou "
+                    "Arrow IPC em streaming.",
+    )
+    parser.add_argument("entrada", help="arquivo a converter")
+    parser.add_argument("-f", "--formato", choices=("parquet", "arrow"), default="parquet",
+                        help="formato de saída (padrão: parquet)")
+    parser.add_argument("-l", "--layout", help="arquivo JSON com o layout (mesmo formato do anonimizador)")
+    parser.add_argument("--header-start", type=int, help="linha inicial do cabeçalho (0-based)")
+    parser.add_argument("--header-end", type=int, help="linha final do cabeçalho, de onde vêm os nomes")
+    parser.add_argument("--data-start", type=int, help="primeira linha de dados (0-based)")
+    parser.add_argument("-s", "--sep", help="separador: caractere ou TAB/PIPE (padrão: |)")
+    parser.add_argument("--quote", help="caractere de aspas (padrão: \"; use '' para desativar)")
+    parser.add_argument("--largura-fixa", nargs="+", metavar="INICIO:TAMANHO",
+                        help="arquivo de largura fixa: colunas por posição (0-based), ou 'auto' para inferir "
+                             "(colunas separadas por 2+ espaços em todas as linhas; com um só espaço entre "
+                             "colunas, informe as posições)")
+    parser.add_argument("-o", "--saida", help="arquivo de saída (padrão: saida/<arquivo>.parquet)")
+    parser.add_argument("--linhas-por-grupo", type=int, help="registros por row group / record batch")
+    parser.add_argument("--anonimizar", action="store_true", help="anonimiza as colunas na mesma passada")
+    parser.add_argument("--mapeamento", metavar="ARQUIVO.sqlite",
+                        help="com --anonimizar, reaproveita os pseudônimos de execuções anteriores")
+    parser.add_argument("--sem-cache", type=int, nargs="*", default=(), metavar="COLUNA",
+                        help="índices de colunas que não passam pelo cache")
+    parser.add_argument("--estatisticas", nargs="?", const="-", metavar="ARQUIVO.json",
+                        help="mostra as estatísticas da execução (ou grava em JSON)")
+    return parser
+
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.entrada):
+        parser.error(f"arquivo não encontrado: {args.entrada}")
+    try:
+        layout = montar_layout(args)
+    except (OSError, ValueError) as err:
+        parser.error(f"layout inválido: {err}")
+
+    # pyarrow e o pipeline só são importados depois de validar os argumentos
+    from features.converter.conversor import TAMANHO_GRUPO_PADRAO, converter
+
+    caminho_saida = args.saida
+    if caminho_saida:
+        os.makedirs(os.path.dirname(os.path.abspath(caminho_saida)), exist_ok=True)
+
+    try:
+        _, estatisticas = converter(
+            args.entrada,
+            layout,
+            formato=args.formato,
+            caminho_saida=caminho_saida,
+            linhas_por_grupo=args.linhas_por_grupo or TAMANHO_GRUPO_PADRAO,
+            anonimizar=args.anonimizar,
+            colunas_sem_cache=args.sem_cache,
+            mapeamento=args.mapeamento,
+        )
+    except Exception as err:
+        print(f"❌ Erro: {err}", file=sys.stderr)
+        return 1
+
+    if args.estatisticas == "-":
+        print(estatisticas.resumo())
+    elif args.estatisticas:
+        with open(args.estatisticas, "w", encoding="utf-8") as f:
+            json.dump(estatisticas.como_dict(), f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
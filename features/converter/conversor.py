@@ -0,0 +1,303 @@
+# ============================================================================
+# ARQUIVO: features/converter/conversor.py
+# Conversão em streaming de arquivos delimitados para Parquet / Arrow IPC
+# ============================================================================
+
+import io
+import os
+import re
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Sem pyarrow o conversor não fica disponível
+    pa = pc = pq = None
+
+from core.compression import detect_compression, strip_compression_suffix, wrap_reader
+from core.file_utils import detect_encoding
+from core.tokenizer import iter_layout_records, split_fields
+from features.anonymizer.column_detector import detectar_tipos
+from features.anonymizer.estatisticas import (
+    EstatisticasProcessamento, contadores_globais, diferenca_contadores, medir_coluna,
+)
+from features.anonymizer.mapeamento import fechar_mapeamento, funcao_lote
+from features.anonymizer.anonymizer_core import limpar_cache
+from features.anonymizer.leitura import Progresso, amostra_do_layout
+from features.anonymizer.pipeline import SUFIXO_PARCIAL
+
+# Formato -> extensão do arquivo gerado
+FORMATOS = {"parquet": ".parquet", "arrow": ".arrow"}
+# Registros por row group (Parquet) / record batch (Arrow): é o que fica em memória
+TAMANHO_GRUPO_PADRAO = 100_000
+# Maior inteiro aceito como int64 sem risco (mais dígitos viram texto)
+_MAX_DIGITOS_INT = 18
+
+# Valores aceitos na conversão de cada tipo (o resto vira nulo e conta como erro)
+_RE_NUMERO = r"^-?[0-9]{1,18}$"
+_RE_VALOR = r"^-?[0-9]{1,16}[.,][0-9]{2}$"
+_RE_DATA = re.compile(r"(\d{2})([-/.])\d{2}\2\d{4}$|(\d{4})([-/.])\d{2}\4\d{2}$")
+
+
+def _exigir_pyarrow():
+    if pa is None:
+        raise ImportError("O pacote 'pyarrow' é necessário para o conversor (pip install pyarrow).")
+
+
+def caminho_conversao_para(filename_original, formato, anonimizar=False):
+    """Caminho do arquivo convertido na pasta 'saida/' do projeto."""
+    pasta_saida = os.path.join(os.getcwd(), "saida")
+    os.makedirs(pasta_saida, exist_ok=True)
+    base = os.path.splitext(strip_compression_suffix(filename_original))[0]
+    prefixo = "ANON_" if anonimizar else ""
+    return os.path.join(pasta_saida, f"{prefixo}{base}{FORMATOS[formato]}")
+
+
+def _nomes_colunas(linha_cabecalho, sep, aspas, quantidade, larguras=None):
+    """
+    Nomes das colunas a partir da linha de cabeçalho. Nomes vazios viram
+    coluna_N e repetidos ganham sufixo (_2, _3...), como o Parquet exige.
+    """
+    campos = split_fields(linha_cabecalho, sep, aspas, larguras) if linha_cabecalho else []
+    campos += [""] * (quantidade - len(campos))
+    nomes = []
+    vistos = set()
+    for i, nome in enumerate(campos):
+        nome = nome.strip() or f"coluna_{i + 1}"
+        unico, n = nome, 2
+        while unico in vistos:
+            unico, n = f"{nome}_{n}", n + 1
+        vistos.add(unico)
+        nomes.append(unico)
+    return nomes
+
+
+def _formato_data(valores):
+    """Formato strptime das datas da amostra (None se houver mais de um)."""
+    formatos = set()
+    for v in valores:
+        m = _RE_DATA.match(v)
+        if m is None:
+            return None
+        if m.group(1):
+            formatos.add(f"%d{m.group(2)}%m{m.group(2)}%Y")
+        else:
+            formatos.add(f"%Y{m.group(4)}%m{m.group(4)}%d")
+    return formatos.pop() if len(formatos) == 1 else None
+
+
+def _plano_colunas(amostra, tipos, sep, aspas, quantidade, larguras=None):
+    """
+    Decide o tipo Arrow de cada coluna. Um tipo só é usado se todos os
+    valores da amostra convertem sem perda (ex.: '00123' continua texto,
+    para não perder os zeros à esquerda); senão a coluna fica como string.
+    Retorna uma lista de (tipo_detectado, tipo_arrow, formato_data).
+    """
+    colunas = [[] for _ in range(quantidade)]
+    for linha in amostra:
+        for i, valor in enumerate(split_fields(linha, sep, aspas, larguras)[:quantidade]):
+            valor = valor.strip()
+            if valor:
+                colunas[i].append(valor)
+
+    plano = []
+    for i, valores in enumerate(colunas):
+        tipo = tipos.get(i, "texto")
+        tipo_arrow, formato = pa.string(), None
+        if tipo == "numero" and valores and all(
+                v.isdigit() and len(v) <= _MAX_DIGITOS_INT and (v == "0" or v[0] != "0") for v in valores):
+            tipo_arrow = pa.int64()
+        elif tipo == "valor" and valores and all(re.match(_RE_VALOR, v) for v in valores):
+            tipo_arrow = pa.decimal128(18, 2)
+        elif tipo == "data" and valores:
+            formato = _formato_data(valores)
+            if formato is not None:
+                tipo_arrow = pa.date32()
+        plano.append((tipo, tipo_arrow, formato))
+    return plano
+
+
+def _converter_coluna(valores, tipo_arrow, formato):
+    """
+    Converte uma coluna de textos para o tipo Arrow (vetorizado no
+    pyarrow.compute). Vazios viram nulo; valores fora do padrão também,
+    e são contados. Retorna (array, quantidade_de_erros).
+    """
+    texto = pa.array(valores, type=pa.string())
+    if pa.types.is_string(tipo_arrow):
+        return texto, 0
+
+    limpo = pc.utf8_trim_whitespace(texto)
+    preenchido = pc.fill_null(pc.not_equal(limpo, ""), False)
+    if pa.types.is_date(tipo_arrow):
+        convertido = pc.strptime(limpo, format=formato, unit="s", error_is_null=True).cast(pa.date32())
+        validos = pc.is_valid(convertido)
+    else:
+        padrao = _RE_NUMERO if pa.types.is_integer(tipo_arrow) else _RE_VALOR
+        validos = pc.fill_null(pc.match_substring_regex(limpo, padrao), False)
+        if pa.types.is_decimal(tipo_arrow):
+            limpo = pc.replace_substring(limpo, ",", ".")
+        convertido = pc.if_else(validos, limpo, None).cast(tipo_arrow)
+
+    erros = pc.sum(pc.and_(preenchido, pc.invert(validos))).as_py() or 0
+    return convertido, erros
+
+
+def _montar_grupo(registros, cfg, plano, nomes, estatisticas):
+    """Transforma um grupo de registros em uma tabela Arrow (anonimizando se pedido)."""
+    sep, aspas, larguras = cfg["sep"], cfg["aspas"], cfg["larguras"]
+    medidas = estatisticas.medidas
+    quantidade = len(nomes)
+
+    linhas_campos = [split_fields(registro, sep, aspas, larguras) for registro in registros]
+    if larguras:
+        # Largura fixa: os espaços de preenchimento não fazem parte do valor
+        linhas_campos = [[campo.strip() for campo in campos] for campos in linhas_campos]
+    extras = sum(1 for campos in linhas_campos if len(campos) > quantidade)
+    if extras:
+        medidas["erros"]["colunas_extras"] += extras
+    # Registros curtos são completados com vazio (vira nulo); campos a mais são descartados
+    colunas = [list(c) for c in zip(*(campos[:quantidade] + [""] * (quantidade - len(campos))
+                                      for campos in linhas_campos))]
+
+    if cfg["anonimizar"]:
+        anonimizar_coluna = cfg["anonimizar_coluna"]
+        with estatisticas.fase("anonimizacao"):
+            for i, (tipo, _, _) in enumerate(plano):
+                t = time.perf_counter()
+                colunas[i] = anonimizar_coluna(colunas[i], tipo, usar_cache=i not in cfg["sem_cache"])
+                medir_coluna(medidas, i, tipo, len(colunas[i]), time.perf_counter() - t)
+
+    arrays = []
+    with estatisticas.fase("conversao"):
+        for coluna, (tipo, tipo_arrow, formato) in zip(colunas, plano):
+            array, erros = _converter_coluna(coluna, tipo_arrow, formato)
+            if erros:
+                medidas["erros"]["conversao_" + tipo] += erros
+            arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=nomes)
+
+
+def _abrir_escritor(caminho, formato, esquema):
+    if formato == "parquet":
+        return pq.ParquetWriter(caminho, esquema)
+    return pa.ipc.new_file(caminho, esquema)
+
+
+def converter(entrada, layout, formato="parquet", caminho_saida=None, linhas_por_grupo=TAMANHO_GRUPO_PADRAO,
+              anonimizar=False, colunas_sem_cache=None, mapeamento=None, progresso=None, cancelar=None):
+    """
+    Converte um arquivo delimitado (também .gz/.bz2/.xz/.zst) para Parquet
+    ou Arrow IPC, lendo em streaming: a memória usada depende só de
+    linhas_por_grupo, não do tamanho do arquivo.
+
+    layout: o mesmo dicionário do anonimizador (header, data, separator,
+    quote, ou fixed_width no lugar dos dois para arquivos de largura fixa;
+    os espaços de preenchimento não entram nos valores). Os nomes das
+    colunas vêm da última linha do cabeçalho; os tipos, de detectar_tipos
+    sobre uma amostra (numero -> int64, valor -> decimal(18,2), data ->
+    date32, o resto -> string).
+    formato: "parquet" ou "arrow" (arquivo IPC, lido com pyarrow.ipc.open_file).
+    linhas_por_grupo: registros por row group (Parquet) ou record batch (Arrow).
+    anonimizar: anonimiza as colunas na mesma passada, com os mesmos
+    pseudônimos que o processar geraria (colunas_sem_cache e mapeamento
+    têm o mesmo significado que lá).
+    progresso / cancelar: como no processar (eventos de andamento e
+    threading.Event que interrompe sem deixar arquivo parcial).
+
+    Valores que não convertem para o tipo da coluna viram nulos e são
+    contados em estatisticas.medidas["erros"] ("conversao_<tipo>"; campos
+    além do esquema em "colunas_extras"). Retorna
+    (caminho_saida, estatisticas).
+    """
+    _exigir_pyarrow()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+
+    print("🚀 Iniciando conversão...")
+    estatisticas = EstatisticasProcessamento(entrada)
+    if caminho_saida is None:
+        caminho_saida = caminho_conversao_para(os.path.basename(entrada), formato, anonimizar)
+    caminho_parcial = caminho_saida + SUFIXO_PARCIAL
+
+    larguras = layout.get("fixed_width")
+    if larguras:
+        sep, aspas = "", None  # Largura fixa: colunas por posição, sem separador nem aspas
+    else:
+        sep = layout["separator"]
+        aspas = layout.get("quote", '"')
+    start_data_idx = layout["data"]["start_line"]
+    hs = layout["header"].get("start_line")
+    he = layout["header"].get("end_line")
+    with estatisticas.fase("encoding"):
+        enc = detect_encoding(entrada)
+
+    print("🔍 Detectando tipos...")
+    with estatisticas.fase("amostragem"):
+        amostra, linha_cabecalho, larguras = amostra_do_layout(entrada, enc, layout)
+    with estatisticas.fase("deteccao"):
+        tipos = detectar_tipos(amostra, sep, aspas=aspas, larguras=larguras)
+
+    quantidade = max(len(tipos), len(split_fields(linha_cabecalho, sep, aspas, larguras)) if linha_cabecalho else 0, 1)
+    nomes = _nomes_colunas(linha_cabecalho, sep, aspas, quantidade, larguras)
+    plano = _plano_colunas(amostra, tipos, sep, aspas, quantidade, larguras)
+    esquema = pa.schema([(nome, tipo_arrow) for nome, (_, tipo_arrow, _) in zip(nomes, plano)])
+    print(f"   {quantidade} colunas: " + ", ".join(f"{n} ({t})" for n, t in zip(esquema.names, esquema.types)))
+
+    cfg = {
+        "sep": sep,
+        "aspas": aspas,
+        "larguras": larguras,
+        "anonimizar": anonimizar,
+        "sem_cache": frozenset(colunas_sem_cache or ()),
+        # Mesmo caminho do processar em modo texto (inclusive o mapeamento)
+        "anonimizar_coluna": funcao_lote({"modo_bytes": False, "mapeamento": mapeamento,
+                                          "medidas": estatisticas.medidas}) if anonimizar else None,
+    }
+
+    andamento = Progresso(os.path.getsize(entrada), progresso, cancelar)
+    andamento.verificar()
+    antes = contadores_globais()
+    count = 0
+    bruto = open(entrada, "rb")
+    try:
+        compressao = detect_compression(entrada)
+        leitor = wrap_reader(bruto, compressao) if compressao else bruto
+        texto = io.TextIOWrapper(leitor, encoding=enc, errors="replace")
+        escritor = _abrir_escritor(caminho_parcial, formato, esquema)
+        print(f"💾 Convertendo para {formato} ({linhas_por_grupo:,} linhas por grupo)...")
+        with texto, escritor, estatisticas.fase("processamento"):
+            grupo = []
+            registros = iter_layout_records(texto, sep, aspas, (hs, he), start_data_idx, strip=not larguras)
+            for _, registro in registros:
+                grupo.append(registro)
+                if len(grupo) >= linhas_por_grupo:
+                    escritor.write_table(_montar_grupo(grupo, cfg, plano, nomes, estatisticas))
+                    count += len(grupo)
+                    grupo.clear()
+                    andamento.atualizar(bruto.tell(), count)
+            if grupo:
+                escritor.write_table(_montar_grupo(grupo, cfg, plano, nomes, estatisticas))
+                count += len(grupo)
+                andamento.atualizar(bruto.tell(), count)
+        os.replace(caminho_parcial, caminho_saida)
+    except BaseException:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+        raise
+    finally:
+        bruto.close()
+        if anonimizar:
+            if mapeamento:
+                with estatisticas.fase("mapeamento"):
+                    fechar_mapeamento(mapeamento)
+            estatisticas.somar(diferenca_contadores(antes))
+            limpar_cache()
+
+    estatisticas.finalizar(count)
+    nulos = sum(n for chave, n in estatisticas.medidas["erros"].items() if chave.startswith("conversao_"))
+    if nulos:
+        print(f"⚠️ {nulos} valores fora do tipo da coluna foram gravados como nulos.")
+    print(f"✅ Arquivo salvo em: {caminho_saida} ({count} linhas)")
+    return caminho_saida, estatisticas
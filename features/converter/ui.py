@@ -0,0 +1,124 @@
+# ============================================================================
+# ARQUIVO: features/converter/ui.py
+# ============================================================================
+
+import functools
+import os
+import flet as ft
+from core.compression import open_input
+from core.file_utils import detect_encoding
+from core.ui_components import get_border, open_folder, pick_file, TaskTab
+
+# Linhas mostradas na prévia do arquivo
+LINHAS_PREVIA = 30
+
+class ConverterTab(TaskTab):
+    def __init__(self, page: ft.Page):
+        super().__init__(page, "Converter", ft.Icons.TRANSFORM, "Convertendo...",
+                         "⛔ Conversão cancelada. Nenhum arquivo foi gerado.")
+        self.state = {"file_path": None}
+
+    def _build_ui(self):
+        self.txt_status.set_info("Selecione um arquivo delimitado para converter em Parquet ou Arrow...")
+
+        # Prévia das primeiras linhas (numeradas, para preencher o layout)
+        self.lv_preview = ft.ListView(expand=True, spacing=2, padding=12)
+        self.content_area = ft.Container(
+            content=self.lv_preview,
+            expand=True,
+            border=get_border("#BDBDBD"),
+            border_radius=5,
+            bgcolor="#FAFAFA",
+            padding=10
+        )
+
+        self.txt_file_path = ft.TextField(label="Caminho do arquivo", read_only=True, expand=True, text_size=12)
+
+        btn_pick = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(ft.Icons.FOLDER_OPEN), ft.Text("Buscar")]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY, color="white"),
+            on_click=self._pick_file_native
+        )
+
+        self.dd_formato = ft.Dropdown(
+            label="Formato",
+            options=[ft.dropdown.Option("parquet", "Parquet"), ft.dropdown.Option("arrow", "Arrow IPC")],
+            value="parquet",
+            width=130
+        )
+        self.chk_anonimizar = ft.Checkbox(label="Anonimizar na mesma passada", value=False)
+
+        top_bar = ft.Row([self.txt_file_path, btn_pick, self.dd_sep, self.dd_formato])
+        options_bar = ft.Row([self.txt_header, self.txt_data, self.chk_anonimizar, self.btn_process, self.btn_cancel])
+
+        self.content = ft.Column([
+            top_bar,
+            options_bar,
+            self.txt_status,
+            self.pb_progress,
+            self.content_area
+        ], expand=True)
+
+    def _pick_file_native(self, e):
+        path = pick_file()
+        if path:
+            self.txt_file_path.value = path
+            self.main_page.update()
+            self._load_file(path)
+
+    def _load_file(self, path):
+        self.state["file_path"] = path
+        self.lv_preview.controls.clear()
+        try:
+            enc = detect_encoding(path)
+            with open_input(path, "r", encoding=enc, errors="replace") as f:
+                lines = [f.readline().rstrip("\r\n") for _ in range(LINHAS_PREVIA)]
+            for i, txt in enumerate(lines):
+                self.lv_preview.controls.append(
+                    ft.Text(f"{i:>3}  {txt}", size=12, font_family="Consolas", color="black")
+                )
+            self.txt_status.set_success("✅ Arquivo carregado. Informe a linha do cabeçalho e o início dos dados.")
+        except Exception as e:
+            self.txt_status.set_error(f"Erro: {e}")
+        self.main_page.update()
+
+    def _selected_path(self):
+        return self.state["file_path"]
+
+    def _task(self, path, layout):
+        return functools.partial(self._executar_conversao, path, layout, self.dd_formato.value,
+                                 self.chk_anonimizar.value)
+
+    def _executar_conversao(self, path, layout, formato, anonimizar):
+        """Executado fora da thread da interface."""
+        # Importado aqui: abrir a aba não carrega o pyarrow nem o pipeline
+        from features.converter.conversor import converter
+
+        caminho_saida, estatisticas = converter(
+            path, layout, formato=formato, anonimizar=anonimizar,
+            progresso=self._on_progress, cancelar=self._cancel_event,
+        )
+        resumo = f" ({estatisticas.linhas:,} linhas em {estatisticas.total_s:.1f}s)".replace(",", ".")
+        self.txt_status.set_success(f"✅ Concluído! Salvo em: .../saida/{os.path.basename(caminho_saida)}{resumo}")
+        self._show_done(caminho_saida)
+
+    def _show_done(self, caminho_saida):
+        dlg = ft.AlertDialog(
+            title=ft.Text("Sucesso!"),
+            content=ft.Text("Arquivo convertido com sucesso na pasta 'saida'."),
+            actions=[
+                ft.TextButton("Abrir Pasta", on_click=lambda _: self._open_folder_dlg(caminho_saida)),
+                ft.TextButton("Fechar", on_click=lambda _: self._close_dlg())
+            ]
+        )
+        self.main_page.dialog = dlg
+        dlg.open = True
+        self.main_page.update()
+
+    def _close_dlg(self):
+        self.main_page.dialog.open = False
+        self.main_page.update()
+
+    def _open_folder_dlg(self, path):
+        open_folder(path)
+        self._close_dlg()
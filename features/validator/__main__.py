@@ -0,0 +1,83 @@
+# ============================================================================
+# ARQUIVO: features/validator/__main__.py
+# Linha de comando do validador (sem interface gráfica)
+# Uso: python -m features.validator ENTRADA [opções]
+# ============================================================================
+
+import argparse
+import os
+import sys
+
+from features.anonymizer.__main__ import montar_layout
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m features.validator",
+        description="Valida um arquivo delimitado (CSV/TXT, também .gz/.bz2/.xz/.zst): CPF/CNPJ, datas, "
+                    "e-mails e colunas por linha; com --original, compara com o arquivo antes da anonimização.",
+    )
+    parser.add_argument("entrada", help="arquivo a validar")
+    parser.add_argument("--original", help="arquivo original; as opções de layout passam a descrever o original "
+                                           "e o layout da entrada é o que o anonimizador grava")
+    parser.add_argument("-l", "--layout", help="arquivo JSON com o layout (mesmo formato do anonimizador)")
+    parser.add_argument("--header-start", type=int, help="linha inicial do cabeçalho (0-based)")
+    parser.add_argument("--header-end", type=int, help="linha final do cabeçalho (padrão: igual à inicial)")
+    parser.add_argument("--data-start", type=int, help="primeira linha de dados (0-based)")
+    parser.add_argument("-s", "--sep", help="separador: caractere ou TAB/PIPE (padrão: |)")
+    parser.add_argument("--quote", help="caractere de aspas (padrão: \"; use '' para desativar)")
+    parser.add_argument("--largura-fixa", nargs="+", metavar="INICIO:TAMANHO",
+                        help="arquivo de largura fixa: colunas por posição (0-based), ou 'auto' para inferir "
+                             "(colunas separadas por 2+ espaços em todas as linhas; com um só espaço entre "
+                             "colunas, informe as posições)")
+    parser.add_argument("--anonimizado", action="store_true",
+                        help="a entrada é saída do anonimizador: não confere os dígitos verificadores de CPF/CNPJ "
+                             "(automático com --original)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="processos em paralelo (0 = todos os núcleos)")
+    parser.add_argument("--bloco-mb", type=int, help="tamanho dos blocos paralelos, em MB")
+    parser.add_argument("-r", "--relatorio", metavar="ARQUIVO.json", help="grava o relatório em JSON")
+    return parser
+
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+
+    for caminho in (args.entrada, args.original):
+        if caminho and not os.path.isfile(caminho):
+            parser.error(f"arquivo não encontrado: {caminho}")
+    try:
+        layout = montar_layout(args)
+    except (OSError, ValueError) as err:
+        parser.error(f"layout inválido: {err}")
+
+    # O pipeline (e NumPy) só é importado depois de validar os argumentos
+    from features.anonymizer.pipeline import TAMANHO_BLOCO_PADRAO, layout_saida
+    from features.validator.validador import validar
+
+    layout_original = None
+    if args.original:
+        layout, layout_original = layout_saida(layout), layout
+
+    try:
+        relatorio = validar(
+            args.entrada,
+            layout,
+            original=args.original,
+            layout_original=layout_original,
+            workers=args.workers or None,
+            tamanho_bloco=args.bloco_mb * 1024 * 1024 if args.bloco_mb else TAMANHO_BLOCO_PADRAO,
+            caminho_relatorio=args.relatorio,
+            anonimizado=True if args.anonimizado else None,
+        )
+    except Exception as err:
+        print(f"❌ Erro: {err}", file=sys.stderr)
+        return 1
+
+    print(relatorio.resumo())
+    # Código de saída 2 quando há problemas (útil em scripts e pipelines de dados)
+    return 0 if relatorio.ok else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# ============================================================================
+# ARQUIVO: features/validator/ui.py
+# ============================================================================
+
+import functools
+import os
+import flet as ft
+from core.ui_components import get_border, pick_file, TaskTab
+
+class ValidatorTab(TaskTab):
+    def __init__(self, page: ft.Page):
+        super().__init__(page, "Validar", ft.Icons.CHECK_CIRCLE, "Validando...", "⛔ Validação cancelada.",
+                         unit="registros")
+
+    def _build_ui(self):
+        self.txt_status.set_info("Selecione o arquivo a validar (e, se quiser, o original para comparar)...")
+
+        # Tabela com um resumo por problema encontrado
+        self.dt_result = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Problema", weight="bold")),
+                ft.DataColumn(ft.Text("Coluna", weight="bold")),
+                ft.DataColumn(ft.Text("Ocorrências", weight="bold"), numeric=True),
+                ft.DataColumn(ft.Text("Linhas (exemplos)", weight="bold")),
+            ],
+            rows=[],
+            heading_row_color=ft.Colors.BLUE_50,
+            border=get_border("#BDBDBD"),
+            expand=True,
+        )
+        self.content_area = ft.Container(
+            content=ft.Column([self.dt_result], scroll="auto", expand=True),
+            expand=True,
+            border=get_border("#BDBDBD"),
+            border_radius=5,
+            bgcolor="#FAFAFA",
+            padding=10
+        )
+
+        self.txt_file_path = ft.TextField(label="Arquivo a validar", read_only=True, expand=True, text_size=12)
+        self.txt_original_path = ft.TextField(label="Original (opcional, para comparar)", read_only=True,
+                                              expand=True, text_size=12)
+        btn_pick = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(ft.Icons.FOLDER_OPEN), ft.Text("Buscar")]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY, color="white"),
+            on_click=lambda e: self._pick_file_native(self.txt_file_path)
+        )
+        btn_pick_original = ft.ElevatedButton(
+            content=ft.Row([ft.Icon(ft.Icons.FOLDER_OPEN), ft.Text("Buscar")]),
+            style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_GREY, color="white"),
+            on_click=lambda e: self._pick_file_native(self.txt_original_path)
+        )
+        btn_clear_original = ft.IconButton(
+            icon=ft.Icons.CLEAR,
+            tooltip="Validar sem comparar",
+            on_click=self._clear_original
+        )
+
+        self.chk_anonymized = ft.Checkbox(
+            label="Saída anonimizada",
+            tooltip="Não confere os dígitos verificadores de CPF/CNPJ (automático ao comparar com o original)",
+            value=False
+        )
+
+        self.content = ft.Column([
+            ft.Row([self.txt_file_path, btn_pick]),
+            ft.Row([self.txt_original_path, btn_pick_original, btn_clear_original]),
+            ft.Row([self.dd_sep, self.txt_header, self.txt_data, self.chk_anonymized, self.btn_process, self.btn_cancel]),
+            ft.Text("Com o original, as linhas informadas são as do original (como na aba Anonimizador).",
+                    size=11, color=ft.Colors.GREY_600),
+            self.txt_status,
+            self.pb_progress,
+            self.content_area
+        ], expand=True)
+
+    def _pick_file_native(self, campo):
+        path = pick_file()
+        if path:
+            campo.value = path
+            self.main_page.update()
+
+    def _clear_original(self, e):
+        self.txt_original_path.value = ""
+        self.main_page.update()
+
+    def _selected_path(self):
+        return self.txt_file_path.value
+
+    def _task(self, path, layout):
+        self.dt_result.rows.clear()
+        return functools.partial(self._executar_validacao, path, self.txt_original_path.value or None, layout,
+                                 True if self.chk_anonymized.value else None)
+
+    def _executar_validacao(self, path, original, layout, anonimizado):
+        """Executado fora da thread da interface."""
+        # Importado aqui: abrir a aba não carrega o pipeline (nem NumPy)
+        from features.anonymizer.pipeline import layout_saida
+        from features.validator.validador import validar
+
+        if original:
+            relatorio = validar(path, layout_saida(layout), original=original, layout_original=layout,
+                                workers=None, progresso=self._on_progress, cancelar=self._cancel_event,
+                                anonimizado=anonimizado)
+        else:
+            relatorio = validar(path, layout, workers=None, progresso=self._on_progress,
+                                cancelar=self._cancel_event, anonimizado=anonimizado)
+        self._show_result(relatorio)
+
+    def _show_result(self, relatorio):
+        """Preenche a tabela com um resumo por problema."""
+        for item in relatorio.como_dict()["problemas"]:
+            self.dt_result.rows.append(ft.DataRow(cells=[
+                ft.DataCell(ft.Text(item["descricao"], size=12)),
+                ft.DataCell(ft.Text(item["coluna"] or "-", size=12)),
+                ft.DataCell(ft.Text(f"{item['ocorrencias']:,} de {item['verificados']:,}".replace(",", "."), size=12)),
+                ft.DataCell(ft.Text(", ".join(map(str, item["linhas_exemplo"])), size=11, font_family="Consolas")),
+            ]))
+
+        resumo = f"{relatorio.linhas:,} registros em {relatorio.total_s:.1f}s".replace(",", ".")
+        if relatorio.ok:
+            self.txt_status.set_success(f"✅ Nenhum problema encontrado ({resumo}).")
+        else:
+            self.txt_status.set_error(f"⚠️ {sum(relatorio.problemas.values()):,} problemas ({resumo}). "
+                                      f"Arquivo: {os.path.basename(relatorio.entrada)}".replace(",", "."))
@@ -0,0 +1,478 @@
+# ============================================================================
+# ARQUIVO: features/validator/validador.py
+# Validação em streaming de arquivos delimitados (antes e depois da anonimização)
+# ============================================================================
+
+import io
+import json
+import os
+import re
+import time
+from calendar import monthrange
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy os dígitos verificadores são conferidos um a um
+    np = None
+
+from core.compression import detect_compression, wrap_reader
+from core.file_utils import detect_encoding, supports_byte_offsets
+from core.tokenizer import iter_layout_records, split_fields
+from features.anonymizer.column_detector import detectar_tipos
+from features.anonymizer.leitura import Progresso, amostra_do_layout, blocos_fluxo, trechos_fluxo
+from features.anonymizer.pipeline import TAMANHO_BLOCO_PADRAO
+
+# Linhas de exemplo guardadas para cada problema (o resto só é contado)
+AMOSTRA_OCORRENCIAS = 10
+# Registros por tarefa quando a entrada é lida como texto (comparação, UTF-16/32)
+TAMANHO_LOTE_VALIDACAO = 20_000
+
+# Verificação -> descrição usada no resumo
+DESCRICOES = {
+    "colunas": "quantidade de colunas diferente do esperado",
+    "cpf": "CPF com dígito verificador inválido",
+    "cnpj": "CNPJ com dígito verificador inválido",
+    "data": "data inexistente ou fora do formato",
+    "email": "e-mail com formato inválido",
+    "registros": "registro sem correspondente no outro arquivo",
+    "colunas_original": "quantidade de colunas diferente da linha original",
+    "tamanho": "tamanho diferente do valor original",
+    "pontuacao": "pontuação ou tipo de caractere diferente do valor original",
+}
+
+# Pesos dos dois dígitos verificadores (módulo 11)
+PESOS_CPF = ((10, 9, 8, 7, 6, 5, 4, 3, 2), (11, 10, 9, 8, 7, 6, 5, 4, 3, 2))
+PESOS_CNPJ = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+# Verificações que não valem para a saída do anonimizador: ele sorteia
+# todos os dígitos, então os verificadores quase nunca batem
+_VERIFICACOES_SO_ORIGINAL = ("cpf", "cnpj")
+# Pontuação aceita em CPF/CNPJ formatados
+_TAB_PONTUACAO = str.maketrans("", "", ".-/ ")
+_RE_EMAIL = re.compile(r"[^@\s]+@[^@\s.]+(?:\.[^@\s.]+)+$")
+_RE_DATA = re.compile(r"(\d{2})([-/.])(\d{2})\2(\d{4})$|(\d{4})([-/.])(\d{2})\6(\d{2})$")
+# Forma de um valor: dígitos viram '9', letras viram 'a', o resto fica
+_TAB_FORMA = {i: ("9" if chr(i).isdigit() else "a") for i in range(0x250) if chr(i).isalnum()}
+
+
+class RelatorioValidacao:
+    """
+    Resultado compacto da validação: quantas ocorrências de cada problema
+    (verificação, coluna) e as primeiras linhas onde apareceram, em vez de
+    uma mensagem por erro. Os workers devolvem relatórios parciais, somados
+    na ordem do arquivo.
+    """
+
+    def __init__(self, entrada=None, original=None, anonimizado=False):
+        self.entrada = entrada
+        self.original = original
+        self.anonimizado = anonimizado
+        self.linhas = 0
+        self.nomes = []
+        self.tipos = {}
+        self.colunas_esperadas = 0
+        self.verificados = Counter()  # (verificacao, coluna) -> valores conferidos
+        self.problemas = Counter()    # (verificacao, coluna) -> ocorrências
+        self.exemplos = {}            # (verificacao, coluna) -> linhas (a partir de 1)
+        self.total_s = 0.0
+
+    def registrar(self, verificacao, coluna, linhas_com_problema, verificados):
+        """Conta uma verificação; linhas_com_problema são índices 0-based do arquivo."""
+        chave = (verificacao, coluna)
+        self.verificados[chave] += verificados
+        if not linhas_com_problema:
+            return
+        self.problemas[chave] += len(linhas_com_problema)
+        exemplos = self.exemplos.setdefault(chave, [])
+        faltam = AMOSTRA_OCORRENCIAS - len(exemplos)
+        if faltam > 0:
+            exemplos.extend(idx + 1 for idx in linhas_com_problema[:faltam])
+
+    def somar(self, parcial):
+        """Acrescenta o relatório de um bloco posterior do arquivo."""
+        self.linhas += parcial.linhas
+        self.verificados.update(parcial.verificados)
+        for chave, quantidade in parcial.problemas.items():
+            self.problemas[chave] += quantidade
+            exemplos = self.exemplos.setdefault(chave, [])
+            exemplos.extend(parcial.exemplos[chave][:AMOSTRA_OCORRENCIAS - len(exemplos)])
+
+    @property
+    def ok(self):
+        return not self.problemas
+
+    def _nome_coluna(self, coluna):
+        if coluna is None:
+            return None
+        return self.nomes[coluna] if coluna < len(self.nomes) else f"coluna_{coluna + 1}"
+
+    def como_dict(self):
+        return {
+            "entrada": self.entrada,
+            "original": self.original,
+            "anonimizado": self.anonimizado,
+            "linhas": self.linhas,
+            "colunas_esperadas": self.colunas_esperadas,
+            "tipos": {self._nome_coluna(i): t for i, t in sorted(self.tipos.items())},
+            "total_s": self.total_s,
+            "ok": self.ok,
+            "problemas": [
+                {
+                    "verificacao": verificacao,
+                    "descricao": DESCRICOES[verificacao],
+                    "coluna": self._nome_coluna(coluna),
+                    "ocorrencias": quantidade,
+                    "verificados": self.verificados[(verificacao, coluna)],
+                    "linhas_exemplo": self.exemplos[(verificacao, coluna)],
+                }
+                for (verificacao, coluna), quantidade in self.problemas.most_common()
+            ],
+        }
+
+    def salvar(self, caminho):
+        """Grava o relatório em JSON."""
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, indent=2, ensure_ascii=False)
+
+    def resumo(self):
+        """Texto curto para o terminal."""
+        linhas = [f"   {self.linhas:,} registros verificados em {self.total_s:.2f}s"]
+        if self.anonimizado:
+            linhas.append("   Saída anonimizada: dígitos verificadores de CPF/CNPJ não conferidos")
+        if self.ok:
+            linhas.append("   Nenhum problema encontrado")
+        for item in self.como_dict()["problemas"]:
+            coluna = f" [{item['coluna']}]" if item["coluna"] is not None else ""
+            exemplos = ", ".join(map(str, item["linhas_exemplo"]))
+            linhas.append(f"   {item['descricao']}{coluna}: {item['ocorrencias']:,} de "
+                          f"{item['verificados']:,} (linhas {exemplos}...)")
+        return "\n".join(linhas)
+
+
+# ============================================================================
+# VERIFICAÇÕES (coluna inteira de uma vez)
+# ============================================================================
+
+def _por_valor_unico(valores, funcao):
+    """Aplica 'funcao' uma vez por valor distinto (datas e domínios se repetem muito)."""
+    resultado = {v: funcao(v) for v in dict.fromkeys(valores)}
+    return [resultado[v] for v in valores]
+
+
+def digito_verificador(digitos, pesos):
+    """Dígito verificador (módulo 11) dos primeiros len(pesos) 'digitos' (inteiros)."""
+    resto = sum(d * w for d, w in zip(digitos, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def _digitos_validos(valores, pesos):
+    """
+    Confere os dois dígitos verificadores (módulo 11) de CPFs ou CNPJs.
+    Com NumPy, todos os valores do lote são conferidos em uma conta matricial.
+    """
+    tamanho = len(pesos[1]) + 1
+    limpos = [v.translate(_TAB_PONTUACAO) for v in valores]
+    validos = [False] * len(valores)
+    posicoes = [i for i, v in enumerate(limpos) if len(v) == tamanho and v.isascii() and v.isdigit()]
+    if not posicoes:
+        return validos
+
+    if np is not None:
+        digitos = np.frombuffer("".join(limpos[i] for i in posicoes).encode("ascii"), dtype=np.uint8)
+        digitos = digitos.reshape(-1, tamanho).astype(np.int64) - 48
+        ok = (digitos != digitos[:, :1]).any(axis=1)  # 111.111.111-11 passa na conta, mas é inválido
+        for p in pesos:
+            resto = (digitos[:, :len(p)] @ np.array(p)) % 11
+            ok &= np.where(resto < 2, 0, 11 - resto) == digitos[:, len(p)]
+        for i, valido in zip(posicoes, ok.tolist()):
+            validos[i] = valido
+        return validos
+
+    for i in posicoes:
+        digitos = [int(c) for c in limpos[i]]
+        ok = len(set(digitos)) > 1
+        for p in pesos:
+            ok = ok and digito_verificador(digitos, p) == digitos[len(p)]
+        validos[i] = ok
+    return validos
+
+
+def _data_valida(valor):
+    m = _RE_DATA.match(valor)
+    if m is None:
+        return False
+    if m.group(1):
+        dia, mes, ano = int(m.group(1)), int(m.group(3)), int(m.group(4))
+    else:
+        ano, mes, dia = int(m.group(5)), int(m.group(7)), int(m.group(8))
+    return 1 <= mes <= 12 and ano >= 1 and 1 <= dia <= monthrange(ano, mes)[1]
+
+
+# Tipo da coluna -> função que recebe os valores e devolve se cada um é válido
+_VERIFICACOES_TIPO = {
+    "cpf": lambda valores: _digitos_validos(valores, PESOS_CPF),
+    "cnpj": lambda valores: _digitos_validos(valores, PESOS_CNPJ),
+    "data": lambda valores: _por_valor_unico(valores, _data_valida),
+    "email": lambda valores: _por_valor_unico(valores, lambda v: _RE_EMAIL.match(v) is not None),
+}
+
+
+def _verificar_registros(registros, cfg, originais=None):
+    """
+    Verifica um lote de registros [(indice_linha, texto)] coluna a coluna.
+    Com 'originais' (os registros correspondentes do arquivo original),
+    também confere se cada campo manteve o tamanho e a pontuação.
+    """
+    relatorio = RelatorioValidacao()
+    relatorio.linhas = len(registros)
+    indices = [idx for idx, _ in registros]
+    linhas_campos = [split_fields(texto, cfg["sep"], cfg["aspas"], cfg["larguras"]) for _, texto in registros]
+
+    esperado = cfg["colunas"]
+    relatorio.registrar("colunas", None, [idx for idx, campos in zip(indices, linhas_campos)
+                                         if len(campos) != esperado], len(linhas_campos))
+
+    for coluna, tipo in cfg["tipos"].items():
+        verificar = _VERIFICACOES_TIPO.get(tipo)
+        if verificar is None or (cfg["anonimizado"] and tipo in _VERIFICACOES_SO_ORIGINAL):
+            continue
+        posicoes = [r for r, campos in enumerate(linhas_campos) if len(campos) > coluna and campos[coluna].strip()]
+        validos = verificar([linhas_campos[r][coluna].strip() for r in posicoes])
+        relatorio.registrar(tipo, coluna, [indices[r] for r, ok in zip(posicoes, validos) if not ok], len(posicoes))
+
+    if originais is None:
+        return relatorio
+
+    campos_originais = [split_fields(texto, cfg["sep_original"], cfg["aspas_original"], cfg["larguras_original"])
+                        for _, texto in originais]
+    relatorio.registrar("colunas_original", None,
+                        [idx for idx, a, b in zip(indices, linhas_campos, campos_originais) if len(a) != len(b)],
+                        len(linhas_campos))
+    largura = max(map(len, campos_originais), default=0)
+    for coluna in range(largura):
+        tamanho, pontuacao, total = [], [], 0
+        for idx, campos, campos_orig in zip(indices, linhas_campos, campos_originais):
+            if coluna >= len(campos) or coluna >= len(campos_orig):
+                continue
+            novo, antigo = campos[coluna], campos_orig[coluna]
+            total += 1
+            if len(novo) != len(antigo):
+                tamanho.append(idx)
+            elif novo != antigo and novo.translate(_TAB_FORMA) != antigo.translate(_TAB_FORMA):
+                pontuacao.append(idx)
+        relatorio.registrar("tamanho", coluna, tamanho, total)
+        relatorio.registrar("pontuacao", coluna, pontuacao, total)
+    return relatorio
+
+
+def _validar_bloco(bruto, idx_inicial, cfg):
+    """Valida um bloco de bytes com registros completos (executado nos workers)."""
+    linhas = bruto.decode(cfg["enc"], errors="replace").split("\n")
+    if bruto.endswith(b"\n"):
+        linhas.pop()
+    registros = list(iter_layout_records(linhas, cfg["sep"], cfg["aspas"], cfg["header"],
+                                         cfg["start_data_idx"], idx_inicial, strip=not cfg["larguras"]))
+    return _verificar_registros(registros, cfg)
+
+
+def _executar(tarefas, relatorio, workers, progresso):
+    """
+    Executa as tarefas (posição, função, argumentos) em processos (ou aqui
+    mesmo, com workers=1) e soma os relatórios parciais na ordem original.
+    """
+    if workers <= 1:
+        for posicao, funcao, args in tarefas:
+            relatorio.somar(funcao(*args))
+            progresso.atualizar(posicao, relatorio.linhas)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Janela limitada de tarefas pendentes para não acumular blocos em memória
+        pendentes = deque()
+        try:
+            for posicao, funcao, args in tarefas:
+                pendentes.append((posicao, executor.submit(funcao, *args)))
+                while len(pendentes) >= workers * 2:
+                    posicao, futuro = pendentes.popleft()
+                    relatorio.somar(futuro.result())
+                    progresso.atualizar(posicao, relatorio.linhas)
+            while pendentes:
+                posicao, futuro = pendentes.popleft()
+                relatorio.somar(futuro.result())
+                progresso.atualizar(posicao, relatorio.linhas)
+        except BaseException:
+            for _, futuro in pendentes:
+                futuro.cancel()
+            raise
+
+
+def _tarefas_blocos(leitor, posicao, cfg, tamanho_bloco):
+    """Blocos de bytes do arquivo, cada um com o índice da sua primeira linha."""
+    idx = 0
+    for bruto, pos in blocos_fluxo(trechos_fluxo(leitor, b"", posicao, tamanho_bloco), cfg):
+        yield pos, _validar_bloco, (bruto, idx, cfg)
+        idx += bruto.count(b"\n")
+
+
+def _lotes(registros, tamanho):
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _tarefas_texto(texto, posicao, cfg):
+    """Lotes de registros lidos como texto (UTF-16/32)."""
+    registros = iter_layout_records(texto, cfg["sep"], cfg["aspas"], cfg["header"], cfg["start_data_idx"],
+                                    strip=not cfg["larguras"])
+    for lote in _lotes(registros, TAMANHO_LOTE_VALIDACAO):
+        yield posicao(), _verificar_registros, (lote, cfg)
+
+
+def _tarefas_comparacao(texto, texto_original, posicao, cfg, relatorio):
+    """
+    Lotes de pares (registro anonimizado, registro original), lidos em
+    paralelo dos dois arquivos. Registros sobrando em um dos lados são
+    contados como 'registros'.
+    """
+    registros = iter_layout_records(texto, cfg["sep"], cfg["aspas"], cfg["header"], cfg["start_data_idx"],
+                                    strip=not cfg["larguras"])
+    originais = iter_layout_records(texto_original, cfg["sep_original"], cfg["aspas_original"],
+                                    cfg["header_original"], cfg["start_data_original"],
+                                    strip=not cfg["larguras_original"])
+    sobra = []
+    for lote in _lotes(zip_longest(registros, originais), TAMANHO_LOTE_VALIDACAO):
+        pares = [(a, b) for a, b in lote if a is not None and b is not None]
+        if len(pares) < len(lote):
+            sobra.extend(a[0] if a is not None else b[0] for a, b in lote if a is None or b is None)
+        if pares:
+            yield posicao(), _verificar_registros, ([a for a, _ in pares], cfg, [b for _, b in pares])
+    relatorio.registrar("registros", None, sobra, 1)
+
+
+def _abrir_texto(caminho, enc):
+    """(arquivo bruto, leitor descomprimido, texto) de um arquivo possivelmente comprimido."""
+    bruto = open(caminho, "rb")
+    compressao = detect_compression(caminho)
+    leitor = wrap_reader(bruto, compressao) if compressao else bruto
+    return bruto, leitor, io.TextIOWrapper(leitor, encoding=enc, errors="replace")
+
+
+def _separador(layout):
+    """(separador, aspas) do layout; largura fixa não tem nenhum dos dois."""
+    if layout.get("fixed_width"):
+        return "", None
+    return layout["separator"], layout.get("quote", '"')
+
+
+def validar(entrada, layout, original=None, layout_original=None, workers=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO,
+            caminho_relatorio=None, progresso=None, cancelar=None, anonimizado=None):
+    """
+    Valida um arquivo delimitado (também .gz/.bz2/.xz/.zst) em streaming e
+    retorna um RelatorioValidacao.
+
+    layout: o mesmo dicionário do anonimizador, descrevendo 'entrada'
+    (também de largura fixa, com "fixed_width").
+    Por registro são conferidos a quantidade de colunas (a do cabeçalho ou
+    a da amostra) e, pelo tipo detectado de cada coluna, os dígitos
+    verificadores de CPF/CNPJ, a existência das datas e o formato dos e-mails.
+    original: arquivo antes da anonimização. Os registros dos dois são
+    comparados na ordem: cada campo anonimizado deve manter o tamanho e a
+    pontuação do original. layout_original descreve o original (padrão:
+    o mesmo layout); para comparar com a saída do processar, use
+    layout=layout_saida(layout_original).
+    workers: processos usados nas verificações (1 = tudo neste processo).
+    tamanho_bloco: bytes por bloco enviado aos processos.
+    caminho_relatorio: grava o relatório em JSON.
+    progresso / cancelar: como no processar.
+    anonimizado: 'entrada' é saída do anonimizador, que sorteia todos os
+    dígitos; os verificadores de CPF/CNPJ não são conferidos (o resto sim).
+    None = True quando há 'original'.
+    """
+    print("🚀 Iniciando validação...")
+    inicio = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if anonimizado is None:
+        anonimizado = original is not None
+    relatorio = RelatorioValidacao(entrada, original, anonimizado)
+
+    sep, aspas = _separador(layout)
+    hs = layout["header"].get("start_line")
+    he = layout["header"].get("end_line")
+    start_data_idx = layout["data"]["start_line"]
+    enc = detect_encoding(entrada)
+
+    # Tipos vêm do original quando há um: foram eles que guiaram a anonimização
+    print("🔍 Detectando tipos...")
+    amostra, linha_cabecalho, larguras = amostra_do_layout(entrada, enc, layout)
+    if original is not None:
+        layout_original = layout_original or layout
+        enc_original = detect_encoding(original)
+        sep_original, aspas_original = _separador(layout_original)
+        amostra, _, larguras_original = amostra_do_layout(original, enc_original, layout_original)
+        if larguras and layout.get("fixed_width") == "auto" and larguras_original:
+            larguras = larguras_original  # A saída do processar mantém as colunas do original
+        tipos = detectar_tipos(amostra, sep_original, aspas=aspas_original, larguras=larguras_original)
+    else:
+        tipos = detectar_tipos(amostra, sep, aspas=aspas, larguras=larguras)
+    relatorio.tipos = tipos
+    relatorio.nomes = ([nome.strip() for nome in split_fields(linha_cabecalho, sep, aspas, larguras)]
+                       if linha_cabecalho else [])
+    relatorio.colunas_esperadas = len(relatorio.nomes) or len(tipos)
+
+    cfg = {
+        "sep": sep,
+        "aspas": aspas,
+        "larguras": larguras,
+        "enc": enc,
+        "header": (hs, he),
+        "start_data_idx": start_data_idx,
+        "tipos": tipos,
+        "colunas": relatorio.colunas_esperadas,
+        "anonimizado": anonimizado,
+    }
+    if original is not None:
+        cfg.update({
+            "sep_original": sep_original,
+            "aspas_original": aspas_original,
+            "larguras_original": larguras_original,
+            "header_original": (layout_original["header"].get("start_line"),
+                                layout_original["header"].get("end_line")),
+            "start_data_original": layout_original["data"]["start_line"],
+        })
+
+    andamento = Progresso(os.path.getsize(entrada), progresso, cancelar)
+    andamento.verificar()
+    abertos = []
+    try:
+        bruto, leitor, texto = _abrir_texto(entrada, enc)
+        abertos += [texto, bruto]
+        if original is not None:
+            print(f"💾 Comparando com {os.path.basename(original)}...")
+            bruto_orig, _, texto_orig = _abrir_texto(original, enc_original)
+            abertos += [texto_orig, bruto_orig]
+            tarefas = _tarefas_comparacao(texto, texto_orig, bruto.tell, cfg, relatorio)
+        elif supports_byte_offsets(enc):
+            print(f"💾 Validando ({workers} processos)..." if workers > 1 else "💾 Validando...")
+            tarefas = _tarefas_blocos(leitor, bruto.tell, cfg, tamanho_bloco)
+        else:
+            print("💾 Validando...")
+            tarefas = _tarefas_texto(texto, bruto.tell, cfg)
+        _executar(tarefas, relatorio, workers, andamento)
+    finally:
+        for arquivo in abertos:
+            arquivo.close()
+
+    relatorio.total_s = time.perf_counter() - inicio
+    if caminho_relatorio:
+        relatorio.salvar(caminho_relatorio)
+    print("✅ Nenhum problema encontrado." if relatorio.ok else
+          f"⚠️ {sum(relatorio.problemas.values()):,} problemas em {relatorio.linhas:,} registros.")
+    return relatorio
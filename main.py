@@ -4,8 +4,13 @@
 ╚══════════════════════════════════════════════════════════════════════════╝
 """
 
+import time
+
+# Marca o início do processo para medir o tempo de abertura da janela
+_INICIO = time.perf_counter()
+
+import importlib
 import logging
-import sys
 import warnings
 import flet as ft
 
@@ -15,14 +20,13 @@ warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.ERROR)
 
 
-# IMPORTS DAS FEATURES
-try:
-    from features.anonymizer.ui import AnonymizerTab
-    # from features.converter.ui import ConverterTab
-except ImportError as e:
-    print(f"❌ ERRO CRÍTICO: Não foi possível importar as features.")
-    print(f"   Detalhes: {e}")
-    sys.exit(1)
+# FEATURES (importadas só quando a aba é aberta pela primeira vez)
+# (módulo, classe) de cada aba
+FEATURES = [
+    ("features.anonymizer.ui", "AnonymizerTab"),
+    ("features.converter.ui", "ConverterTab"),
+    ("features.validator.ui", "ValidatorTab"),
+]
 
 
 APP_CONFIG = {
@@ -60,6 +64,29 @@ def main(page: ft.Page):
     # Aqui é onde o conteúdo das ferramentas será exibido
     body_container = ft.Container(expand=True)
 
+    # Abas já construídas: índice -> controle (reaproveitadas ao voltar)
+    abas = {}
+
+    def obter_aba(indice):
+        """Constrói a aba na primeira visita e devolve a mesma instância depois."""
+        if indice in abas:
+            return abas[indice]
+
+        modulo, classe = FEATURES[indice]
+        print(f"🔄 Carregando {classe}...")
+        t = time.perf_counter()
+        try:
+            conteudo = getattr(importlib.import_module(modulo), classe)(page)
+        except Exception as err:
+            import traceback
+            traceback.print_exc()
+            # Não guarda a aba com erro: a próxima visita tenta de novo
+            return ft.Text(f"Erro ao carregar feature: {err}", color="red")
+        print(f"   {classe} pronta em {(time.perf_counter() - t) * 1000:.0f} ms")
+
+        abas[indice] = conteudo
+        return conteudo
+
     #  FUNÇÃO DE TROCA DE ABAS 
     def mudar_aba(e):
         # Identifica qual botão foi clicado (0, 1, 2...)
@@ -78,27 +105,8 @@ def main(page: ft.Page):
                     bgcolor=ft.Colors.TRANSPARENT
                 )
         
-        # Troca o conteúdo
-        body_container.content = None # Limpa
-        
-        if selected_index == 0:
-            # Carrega o Anonimizador
-            print("🔄 Carregando Anonimizador...")
-            try:
-                content = AnonymizerTab(page)
-                body_container.content = content
-            except Exception as err:
-                import traceback
-                traceback.print_exc()
-                body_container.content = ft.Text(f"Erro ao carregar feature: {err}", color="red")
-        
-        elif selected_index == 1:
-            # Exemplo para futura feature
-            body_container.content = ft.Text("🚧 Conversor em desenvolvimento...", size=20)
-        
-        elif selected_index == 2:
-            body_container.content = ft.Text("🚧 Validador em desenvolvimento...", size=20)
-            
+        # Troca o conteúdo (a aba mantém o estado entre as visitas)
+        body_container.content = obter_aba(selected_index)
         page.update()
 
     #  BARRA DE MENU (ABAS MANUAIS) 
@@ -126,7 +134,7 @@ def main(page: ft.Page):
 
     #  INICIALIZAÇÃO 
     # Carrega a primeira aba (Anonimizador) ao iniciar
-    body_container.content = AnonymizerTab(page)
+    body_container.content = obter_aba(0)
 
     #  CABEÇALHO DO APP 
     header = ft.Container(
@@ -150,7 +158,7 @@ def main(page: ft.Page):
     
     page.add(ft.Container(content=main_content, expand=True, padding=10))
     page.update()
-    print("Aplicação iniciada")
+    print(f"Aplicação iniciada em {(time.perf_counter() - _INICIO) * 1000:.0f} ms")
 
 if __name__ == "__main__":
     ft.app(target=main)
\ No newline at end of file
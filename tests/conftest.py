@@ -0,0 +1,11 @@
+# ============================================================================
+# ARQUIVO: tests/conftest.py
+# Testes rodam da raiz do projeto: python -m pytest
+# ============================================================================
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,112 @@
+# ============================================================================
+# ARQUIVO: tests/test_anonymizer_core.py
+# Cache LRU, valores derivados da chave e anonimização em lote
+# ============================================================================
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from features.anonymizer import anonymizer_core
+from features.anonymizer.anonymizer_core import (
+    CacheAnonimizacao, anonimizar, anonimizar_lote, anonimizar_lote_bytes, definir_segredo,
+)
+
+VALORES = [("123.456.789-09", "cpf"), ("Maria Souza", "nome"), ("maria@gmail.com", "email"),
+           ("12/03/1985", "data"), ("1.234,56", "valor")]
+
+
+def test_cache_descarta_o_menos_usado():
+    cache = CacheAnonimizacao(max_itens=2)
+    cache.put(("a", "cpf"), "1")
+    cache.put(("b", "cpf"), "2")
+    assert cache.get(("a", "cpf")) == "1"  # "a" passa a ser o mais recente
+    cache.put(("c", "cpf"), "3")
+
+    assert len(cache) == 2
+    assert cache.get(("b", "cpf")) is None
+    assert cache.get(("c", "cpf")) == "3"
+    estatisticas = cache.estatisticas()["por_tipo"]["cpf"]
+    assert (estatisticas["hits"], estatisticas["misses"], estatisticas["evictions"]) == (2, 1, 1)
+
+
+def test_cache_limitado_por_bytes():
+    cache = CacheAnonimizacao(max_itens=None, max_bytes=1000)
+    for i in range(100):
+        cache.put((f"valor {i}", "texto"), f"novo {i}")
+    assert cache.estatisticas()["bytes_aprox"] <= 1000
+    assert 0 < len(cache) < 100
+    assert cache.evictions["texto"] == 100 - len(cache)
+
+
+def test_anonimizar_usa_o_cache():
+    anonymizer_core.resetar_cache()
+    primeiro = anonimizar("Maria Souza", "nome")
+    assert anonimizar("Maria Souza", "nome") == primeiro
+    assert anonimizar("Maria Souza", "nome", usar_cache=False) == primeiro
+    por_tipo = anonymizer_core.estatisticas_cache()["por_tipo"]["nome"]
+    assert (por_tipo["hits"], por_tipo["misses"]) == (1, 1)
+    anonymizer_core.resetar_cache()
+    assert anonymizer_core.estatisticas_cache()["itens"] == 0
+
+
+@pytest.fixture
+def chave_original():
+    """Restaura a chave do processo depois do teste."""
+    chave = anonymizer_core.chave_atual()
+    yield
+    anonymizer_core.usar_chave(chave)
+
+
+def test_mesmo_valor_e_chave_mesmo_resultado(chave_original):
+    definir_segredo("projeto A")
+    primeiro = [anonimizar(v, t, usar_cache=False) for v, t in VALORES]
+    estado = random.getstate()
+    assert [anonimizar(v, t, usar_cache=False) for v, t in VALORES] == primeiro
+    assert random.getstate() == estado  # Nada passa pelo gerador global
+    assert all(len(novo) == len(v) for novo, (v, _) in zip(primeiro, VALORES))
+
+
+def test_outra_chave_outro_resultado(chave_original):
+    definir_segredo("projeto A")
+    com_a = [anonimizar(v, t) for v, t in VALORES]
+    definir_segredo("projeto B")
+    com_b = [anonimizar(v, t) for v, t in VALORES]  # Trocar a chave descarta o cache
+    assert all(a != b for a, b in zip(com_a, com_b))
+
+
+def test_threads_dao_o_mesmo_resultado():
+    valores = [f"{i:03d}.456.789-{i % 100:02d}" for i in range(500)]
+    serial = [anonimizar(v, "cpf", usar_cache=False) for v in valores]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paralelo = list(executor.map(lambda v: anonimizar(v, "cpf", usar_cache=False), valores))
+    assert paralelo == serial
+
+
+def _coluna(tipo, n=300):
+    """Coluna com repetidos, vazios e alguns valores fora do ASCII."""
+    modelos = {
+        "cpf": lambda i: f"{i:03d}.{i * 7 % 1000:03d}.{i * 13 % 1000:03d}-{i % 100:02d}",
+        "cnpj": lambda i: f"{i:02d}.{i:03d}.{i * 3 % 1000:03d}/0001-{i % 100:02d}",
+        "numero": lambda i: str(i * 7919),
+        "valor": lambda i: f"{i * 31},{i % 100:02d}",
+        "data": lambda i: f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/{1950 + i % 70}",
+        "nome": lambda i: f"José Conceição {i % 40}",
+    }
+    coluna = [modelos[tipo](i) for i in range(n)]
+    coluna[5] = coluna[17] = ""
+    coluna[9] = "  "
+    coluna[11] = coluna[3]
+    coluna[21] = "nº " + coluna[21]
+    return coluna
+
+
+@pytest.mark.parametrize("tipo", ["cpf", "cnpj", "numero", "valor", "data", "nome"])
+def test_lote_igual_ao_escalar(tipo):
+    coluna = _coluna(tipo)
+    esperado = [anonimizar(v, tipo, usar_cache=False) for v in coluna]
+    assert anonimizar_lote(coluna, tipo) == esperado
+    assert anonimizar_lote(coluna[:4], tipo) == esperado[:4]  # Lote pequeno: caminho escalar
+    brutos = [v.encode("latin-1") for v in coluna]
+    assert anonimizar_lote_bytes(brutos, tipo, "latin-1", "utf-8") == [v.encode("utf-8") for v in esperado]
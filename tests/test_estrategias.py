@@ -0,0 +1,60 @@
+# ============================================================================
+# ARQUIVO: tests/test_estrategias.py
+# Estratégia por coluna: escolha pela cardinalidade e mesma saída em todas
+# ============================================================================
+
+import pytest
+
+from features.anonymizer import pipeline
+from features.anonymizer.estrategias import (
+    AMOSTRA_MINIMA, ESTRATEGIA_CACHE, ESTRATEGIA_SEM_CACHE, ESTRATEGIA_TABELA, escolher_estrategia,
+    estimar_cardinalidades,
+)
+from features.anonymizer.pipeline import processar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+ESTRATEGIAS = [ESTRATEGIA_TABELA, ESTRATEGIA_CACHE, ESTRATEGIA_SEM_CACHE]
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    """Colunas de cardinalidade baixa, média e alta (com a tabela forçada, o CPF passa do limite dela)."""
+    caminho = tmp_path / "entrada.csv"
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("cidade;nome;cpf\n")
+        for i in range(8000):
+            f.write(f"Cidade {i % 20};Pedro Lima {i // 2 % 1000};{i * 104729 % 10 ** 11:011d}\n")
+    return str(caminho)
+
+
+def test_escolha_pela_cardinalidade():
+    assert escolher_estrategia(10, AMOSTRA_MINIMA - 1) == ESTRATEGIA_CACHE
+    assert escolher_estrategia(10, 500) == ESTRATEGIA_TABELA
+    assert escolher_estrategia(490, 500) == ESTRATEGIA_SEM_CACHE
+    assert escolher_estrategia(200, 500) == ESTRATEGIA_CACHE
+
+    estimativas = estimar_cardinalidades([["a", str(i), ""] for i in range(100)])
+    assert estimativas[0] == (1, 100)
+    assert 90 <= estimativas[1][0] <= 100 and estimativas[1][1] == 100
+    assert 2 not in estimativas
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("modo_bytes", [False, True])
+def test_mesma_saida_em_todas_as_estrategias(entrada, tmp_path, monkeypatch, modo_bytes, workers):
+    saidas = []
+    for estrategia in ESTRATEGIAS:
+        monkeypatch.setattr(pipeline, "escolher_estrategia", lambda estimativa, valores: estrategia)
+        saida = str(tmp_path / f"{estrategia}.csv")
+        _, _, estatisticas = processar(entrada, "entrada.csv", LAYOUT, workers=workers, tamanho_bloco=16 * 1024,
+                                       modo_bytes=modo_bytes, caminho_saida=saida)
+        assert {e["estrategia"] for e in estatisticas.estrategias.values()} == {estrategia}
+        with open(saida, "rb") as f:
+            saidas.append(f.read())
+    assert saidas[0] == saidas[1] == saidas[2]
+
+
+def test_estrategia_automatica(entrada, tmp_path):
+    _, _, estatisticas = processar(entrada, "entrada.csv", LAYOUT, caminho_saida=str(tmp_path / "saida.csv"))
+    escolhidas = {i: e["estrategia"] for i, e in estatisticas.estrategias.items()}
+    assert escolhidas == {0: ESTRATEGIA_TABELA, 1: ESTRATEGIA_CACHE, 2: ESTRATEGIA_SEM_CACHE}
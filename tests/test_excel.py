@@ -0,0 +1,123 @@
+# ============================================================================
+# ARQUIVO: tests/test_excel.py
+# Planilhas: prévia sob demanda com o fluxo aberto uma vez e limpeza dos
+# temporários do processamento paralelo
+# ============================================================================
+
+import tempfile
+import threading
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from core.line_index import WINDOW_LINES
+from features.anonymizer import excel
+from features.anonymizer.excel import FontePlanilha, ler_linhas_xlsx, linha_para_texto
+from features.anonymizer.leitura import ProcessamentoCancelado
+
+LINHAS = 3 * WINDOW_LINES + 17
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    caminho = str(tmp_path / "clientes.xlsx")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("clientes")
+    ws.append(["nome", "cpf", "valor"])
+    for i in range(LINHAS - 1):
+        ws.append([f"Cliente {i}", f"{i:011d}", i * 1.5])
+    wb.save(caminho)
+    return caminho
+
+
+def test_fonte_planilha_igual_a_leitura_direta(planilha, monkeypatch):
+    esperadas = [linha_para_texto(celulas) for celulas in ler_linhas_xlsx(planilha)]
+    aberturas = []
+    abrir = excel._abrir
+    monkeypatch.setattr(excel, "_abrir", lambda entrada: aberturas.append(entrada) or abrir(entrada))
+
+    fonte = FontePlanilha(planilha)
+    try:
+        # Rolagem para baixo em janelas da tela, depois de volta ao início
+        for inicio in range(0, LINHAS, 40):
+            assert fonte.read_lines(inicio, inicio + 40) == esperadas[inicio:inicio + 40]
+        assert fonte.complete and fonte.line_count == LINHAS
+        assert fonte.read_lines(0, 10) == esperadas[:10]
+        assert fonte.read_lines(LINHAS - 5, LINHAS + 50) == esperadas[-5:]
+        assert fonte.read_lines(LINHAS + 10, LINHAS + 20) == []
+    finally:
+        fonte.close()
+    # Uma só abertura da pasta de trabalho para a rolagem inteira
+    assert len(aberturas) == 1
+
+
+def test_fonte_planilha_salto_para_frente(planilha):
+    inicio = 2 * WINDOW_LINES + 3
+    esperadas = [linha_para_texto(celulas) for celulas in ler_linhas_xlsx(planilha, inicio=inicio, max_linhas=2)]
+    fonte = FontePlanilha(planilha)
+    try:
+        assert fonte.read_lines(inicio, inicio + 2) == esperadas
+        assert esperadas[0].startswith(f"Cliente {inicio - 1} |")
+        assert not fonte.complete and fonte.line_count == 3 * WINDOW_LINES
+    finally:
+        fonte.close()
+
+
+def _pasta_varias_planilhas(caminho, planilhas=3, linhas=200):
+    wb = openpyxl.Workbook(write_only=True)
+    for p in range(planilhas):
+        ws = wb.create_sheet(f"aba{p}")
+        ws.append(["nome", "cpf"])
+        for i in range(linhas):
+            ws.append([f"Cliente {p} {i}", f"{i:011d}"])
+    wb.save(caminho)
+    return caminho
+
+
+@pytest.fixture
+def temporarios(tmp_path, monkeypatch):
+    """Diretório temporário isolado (herdado pelos workers via fork)."""
+    pasta = tmp_path / "tmp"
+    pasta.mkdir()
+    monkeypatch.setenv("TMPDIR", str(pasta))
+    monkeypatch.setattr(tempfile, "tempdir", str(pasta))
+    return pasta
+
+
+LAYOUT = {"header": {"start_line": 1, "end_line": 1}, "data": {"start_line": 2}}
+
+
+def test_worker_apaga_temporario_se_a_planilha_falhar(tmp_path, temporarios, monkeypatch):
+    entrada = _pasta_varias_planilhas(str(tmp_path / "pasta.xlsx"), planilhas=1)
+
+    def linhas_com_erro(*args):
+        yield ["a", "b"], 1
+        raise RuntimeError("planilha corrompida")
+
+    monkeypatch.setattr(excel, "_linhas_planilha", linhas_com_erro)
+    cfg = {"chave": excel.chave_atual(), "mapeamento": None}
+    with pytest.raises(RuntimeError):
+        excel._processar_planilha(entrada, "aba0", cfg)
+    assert list(temporarios.iterdir()) == []
+
+
+@pytest.mark.parametrize("cancelar_na_primeira", [False, True])
+def test_paralelo_nao_deixa_temporarios(tmp_path, temporarios, cancelar_na_primeira):
+    entrada = _pasta_varias_planilhas(str(tmp_path / "pasta.xlsx"))
+    saida = str(tmp_path / "saida.xlsx")
+    cancelar = threading.Event()
+
+    def progresso(info):
+        # Cancela depois da primeira planilha: as demais já têm temporário
+        if cancelar_na_primeira:
+            cancelar.set()
+
+    if cancelar_na_primeira:
+        with pytest.raises(ProcessamentoCancelado):
+            excel.processar_xlsx(entrada, "pasta.xlsx", LAYOUT, workers=2, caminho_saida=saida,
+                                 progresso=progresso, cancelar=cancelar)
+    else:
+        excel.processar_xlsx(entrada, "pasta.xlsx", LAYOUT, workers=2, caminho_saida=saida)
+        assert openpyxl.load_workbook(saida, read_only=True).sheetnames == ["aba0", "aba1", "aba2"]
+    assert list(temporarios.iterdir()) == []
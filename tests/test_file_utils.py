@@ -0,0 +1,64 @@
+# ============================================================================
+# ARQUIVO: tests/test_file_utils.py
+# Prévia (parse_file_header) com e sem índice de linhas e índices em memória
+# ============================================================================
+
+import gzip
+from collections import OrderedDict
+
+import pytest
+
+from core import line_index
+from core.file_utils import clear_encoding_cache, parse_file_header
+from core.line_index import cached_line_index, get_line_index
+
+TEXTO = "nome|cpf\nJoão|123\nAna|456\n"
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}}
+
+
+@pytest.mark.parametrize("nome, gravar", [
+    ("simples.txt", lambda c: open(c, "w", encoding="utf-8").write(TEXTO)),
+    ("utf16.txt", lambda c: open(c, "w", encoding="utf-16").write(TEXTO)),
+    ("comprimido.txt.gz", lambda c: gzip.open(c, "wt", encoding="utf-8").write(TEXTO)),
+])
+def test_parse_file_header(tmp_path, nome, gravar):
+    caminho = str(tmp_path / nome)
+    gravar(caminho)
+    clear_encoding_cache()
+    assert parse_file_header(caminho, LAYOUT) == (["nome|cpf"], ["João|123", "Ana|456"])
+    assert parse_file_header(caminho, LAYOUT, preview_limit=1) == (["nome|cpf"], ["João|123"])
+
+
+def test_previa_sem_indexar_o_arquivo(tmp_path):
+    caminho = str(tmp_path / "grande.txt")
+    with open(caminho, "w", encoding="latin-1", newline="") as f:
+        f.write("nome|cpf\r\n")
+        f.writelines(f"Conceição {i}|{i:011d}\r\n" for i in range(5000))
+    clear_encoding_cache()
+    previa = parse_file_header(caminho, LAYOUT, preview_limit=10)
+    # A prévia lê só o começo: nenhum índice do arquivo inteiro fica em memória
+    assert cached_line_index(caminho) is None
+    assert previa == (["nome|cpf"], [f"Conceição {i}|{i:011d}" for i in range(10)])
+
+    # Com o índice pronto o resultado é o mesmo
+    get_line_index(caminho)
+    assert parse_file_header(caminho, LAYOUT, preview_limit=10) == previa
+
+
+def test_indices_em_memoria_limitados(tmp_path, monkeypatch):
+    monkeypatch.setattr(line_index, "_INDEX_CACHE", OrderedDict())
+    caminhos = []
+    for i in range(line_index.INDEX_CACHE_SIZE + 2):
+        caminho = str(tmp_path / f"arquivo{i}.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("a\nb\n")
+        caminhos.append(caminho)
+        get_line_index(caminho)
+    assert len(line_index._INDEX_CACHE) == line_index.INDEX_CACHE_SIZE
+    assert cached_line_index(caminhos[0]) is None and cached_line_index(caminhos[1]) is None
+
+    # Um acesso recente mantém o índice: o descartado é o usado há mais tempo
+    assert cached_line_index(caminhos[2]) is not None
+    get_line_index(caminhos[0])
+    assert cached_line_index(caminhos[2]) is not None
+    assert cached_line_index(caminhos[3]) is None
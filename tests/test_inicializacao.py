@@ -0,0 +1,65 @@
+# ============================================================================
+# ARQUIVO: tests/test_inicializacao.py
+# Orçamento de inicialização e módulos pesados carregados só quando usados
+# ============================================================================
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.bench_startup import ORCAMENTO_CLI_S
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICOES = 3
+
+# Carregados só ao abrir o seletor de arquivos (tkinter) ou ao processar (numpy)
+_MODULOS_PESADOS = ("tkinter", "numpy")
+_ABAS = ("features.anonymizer.ui", "features.converter.ui", "features.validator.ui")
+
+_SONDA_CLI = (
+    "import contextlib, io, runpy, sys\n"
+    "sys.argv = ['features.anonymizer', '--help']\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    try:\n"
+    "        runpy.run_module('features.anonymizer', run_name='__main__')\n"
+    "    except SystemExit:\n"
+    "        pass\n"
+    "print(','.join(m for m in ('flet',) + {pesados!r} if m in sys.modules))\n"
+)
+
+_SONDA_GUI = (
+    "import importlib, sys\n"
+    "import main\n"
+    "abas = [m for m in {abas!r} if m in sys.modules]\n"
+    "for modulo in {abas!r}:\n"
+    "    importlib.import_module(modulo)\n"
+    "print(','.join(abas + [m for m in {pesados!r} if m in sys.modules]))\n"
+)
+
+
+def _executar(codigo):
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                               capture_output=True, text=True)
+    return resultado.stdout.strip().splitlines()[-1] if resultado.stdout.strip() else ""
+
+
+def test_help_dentro_do_orcamento():
+    tempos = []
+    for _ in range(REPETICOES):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "features.anonymizer", "--help"], cwd=RAIZ, check=True,
+                       capture_output=True)
+        tempos.append(time.perf_counter() - t)
+    assert sorted(tempos)[len(tempos) // 2] <= ORCAMENTO_CLI_S
+
+
+def test_cli_nao_carrega_gui_nem_numpy():
+    assert _executar(_SONDA_CLI.format(pesados=_MODULOS_PESADOS)) == ""
+
+
+def test_interface_carrega_abas_e_pesados_sob_demanda():
+    pytest.importorskip("flet")
+    assert _executar(_SONDA_GUI.format(abas=_ABAS, pesados=_MODULOS_PESADOS)) == ""
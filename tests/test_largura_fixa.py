@@ -0,0 +1,83 @@
+# ============================================================================
+# ARQUIVO: tests/test_largura_fixa.py
+# Arquivos de largura fixa: saída com a mesma largura, validador e conversor
+# ============================================================================
+
+import pytest
+
+from features.anonymizer.pipeline import layout_saida, processar
+from features.validator.validador import validar
+
+LARGURAS = [[0, 11], [13, 24], [40, 10]]
+NOMES = ["José", "Conceição", "Ana Lúcia", "João Paulo", "Zé"]
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    """Arquivo latin-1: CPF, nome completado com espaços e valor alinhado à direita."""
+    caminho = tmp_path / "posicional.txt"
+    with open(caminho, "w", encoding="latin-1", newline="") as f:
+        f.write(f"{'CPF':<11}  {'NOME':<24}   {'VALOR':>10}\n")
+        for i in range(3000):
+            nome = f"{NOMES[i % len(NOMES)]} Souza {i}"
+            f.write(f"{i * 7919 % 10 ** 11:011d}  {nome:<24}   {i * 12.5:>10.2f}\n")
+    return str(caminho)
+
+
+def _layout(larguras):
+    return {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "fixed_width": larguras}
+
+
+@pytest.mark.parametrize("larguras", [LARGURAS, "auto"])
+@pytest.mark.parametrize("modo_bytes", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_saida_mantem_largura_das_linhas(entrada, tmp_path, larguras, modo_bytes, workers):
+    saida = str(tmp_path / "saida.txt")
+    processar(entrada, "posicional.txt", _layout(larguras), workers=workers, tamanho_bloco=16 * 1024,
+              modo_bytes=modo_bytes, caminho_saida=saida)
+
+    with open(entrada, "rb") as f:
+        originais = f.read().splitlines()
+    with open(saida, "rb") as f:
+        novas = f.read().splitlines()
+    assert len(novas) == len(originais)
+    assert novas[0] == originais[0]
+    alteradas = 0
+    for original, nova in zip(originais[1:], novas[1:]):
+        # Mesmo encoding e mesmo tamanho em bytes: as posições continuam valendo
+        assert len(nova) == len(original)
+        texto = nova.decode("latin-1")
+        assert texto[11:13] == "  " and texto[37:40] == "   "
+        assert texto[:11].isdigit()
+        alteradas += nova != original
+    assert alteradas == len(originais) - 1
+
+
+@pytest.mark.parametrize("larguras", [LARGURAS, "auto"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validador_largura_fixa(entrada, tmp_path, larguras, workers):
+    layout = _layout(larguras)
+    relatorio = validar(entrada, layout, workers=workers, tamanho_bloco=16 * 1024)
+    assert relatorio.linhas == 3000
+    assert relatorio.nomes == ["CPF", "NOME", "VALOR"]
+    assert not any(verificacao == "colunas" for verificacao, _ in relatorio.problemas)
+
+    saida = str(tmp_path / "saida.txt")
+    processar(entrada, "posicional.txt", layout, caminho_saida=saida)
+    relatorio = validar(saida, layout_saida(layout), original=entrada, layout_original=layout, workers=workers)
+    assert relatorio.linhas == 3000
+    assert relatorio.ok, relatorio.problemas
+
+
+def test_conversor_largura_fixa(entrada, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from features.converter.conversor import converter
+
+    caminho, _ = converter(entrada, _layout("auto"), caminho_saida=str(tmp_path / "saida.parquet"),
+                           linhas_por_grupo=1000)
+    tabela = pq.read_table(caminho)
+    assert tabela.column_names == ["CPF", "NOME", "VALOR"]
+    assert tabela.num_rows == 3000
+    # Sem os espaços de preenchimento
+    assert tabela.column("NOME")[1].as_py() == f"{NOMES[1]} Souza 1"
+    assert str(tabela.column("VALOR")[2].as_py()) == "25.00"
@@ -0,0 +1,74 @@
+# ============================================================================
+# ARQUIVO: tests/test_mapeamento.py
+# Mapeamento persistente: pseudônimos reaproveitados entre execuções
+# ============================================================================
+
+import sqlite3
+
+import pytest
+
+from features.anonymizer import mapeamento
+from features.anonymizer.pipeline import processar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+
+
+def _escrever(caminho, inicio, fim):
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("cpf;nome;valor\n")
+        for i in range(inicio, fim):
+            f.write(f"{10 ** 10 + i * 7919:011d};Maria Souza {i};{i * 3.5:.2f}\n")
+    return str(caminho)
+
+
+def _entradas(caminho_mapa):
+    with sqlite3.connect(caminho_mapa) as conexao:
+        return conexao.execute("SELECT COUNT(*) FROM mapa").fetchone()[0]
+
+
+def _ler(caminho):
+    with open(caminho, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_segunda_execucao_reaproveita_o_mapeamento(tmp_path, monkeypatch, workers):
+    entrada = _escrever(tmp_path / "entrada.csv", 0, 400)
+    mapa = str(tmp_path / "mapa.sqlite")
+    primeira = str(tmp_path / "primeira.csv")
+    segunda = str(tmp_path / "segunda.csv")
+
+    _, _, estatisticas = processar(entrada, "entrada.csv", LAYOUT, workers=workers, tamanho_bloco=4096,
+                                   mapeamento=mapa, caminho_saida=primeira)
+    assert estatisticas.taxa_reuso_mapeamento == 0.0
+    entradas = _entradas(mapa)
+    assert entradas > 0
+
+    # Com tudo no mapeamento, nenhum valor volta a ser calculado
+    def falhar(*args, **kwargs):
+        raise AssertionError("valor recalculado apesar do mapeamento")
+
+    monkeypatch.setattr(mapeamento, "anonimizar_lote", falhar)
+    _, _, estatisticas = processar(entrada, "entrada.csv", LAYOUT, workers=workers, tamanho_bloco=4096,
+                                   mapeamento=mapa, caminho_saida=segunda)
+    assert estatisticas.taxa_reuso_mapeamento == 1.0
+    assert _entradas(mapa) == entradas
+    assert _ler(segunda) == _ler(primeira)
+
+
+def test_valores_novos_entram_no_mapeamento(tmp_path):
+    mapa = str(tmp_path / "mapa.sqlite")
+    primeira = str(tmp_path / "primeira.csv")
+    segunda = str(tmp_path / "segunda.csv")
+    processar(_escrever(tmp_path / "a.csv", 0, 100), "a.csv", LAYOUT, mapeamento=mapa, caminho_saida=primeira)
+    entradas = _entradas(mapa)
+
+    # Metade dos registros repete a primeira execução
+    _, _, estatisticas = processar(_escrever(tmp_path / "b.csv", 50, 150), "b.csv", LAYOUT,
+                                   mapeamento=mapa, caminho_saida=segunda)
+    assert 0.0 < estatisticas.taxa_reuso_mapeamento < 1.0
+    assert _entradas(mapa) > entradas
+    with open(primeira, encoding="utf-8") as f:
+        repetidas = f.read().splitlines()[51:]
+    with open(segunda, encoding="utf-8") as f:
+        assert f.read().splitlines()[1:51] == repetidas
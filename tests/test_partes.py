@@ -0,0 +1,94 @@
+# ============================================================================
+# ARQUIVO: tests/test_partes.py
+# Saída em partes: registros por parte, limite de bytes e manifesto com SHA-256
+# ============================================================================
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from core.compression import open_input
+from features.anonymizer.pipeline import processar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+REGISTROS = 4500
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    """CSV com alguns registros de várias linhas (quebra de linha entre aspas)."""
+    caminho = tmp_path / "entrada.csv"
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("cpf;nome;obs\n")
+        for i in range(REGISTROS):
+            obs = f'"primeira linha {i}\nsegunda linha"' if i % 7 == 0 else f"obs {i}"
+            f.write(f"{i * 7919 % 10 ** 11:011d};Beatriz Rocha {i};{obs}\n")
+    return str(caminho)
+
+
+def _manifesto(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _conferir_arquivos(manifesto, pasta):
+    """Tamanho e SHA-256 de cada parte conferem com o arquivo gravado; retorna o conteúdo descomprimido."""
+    conteudos = []
+    for parte in manifesto["partes"]:
+        caminho = os.path.join(pasta, parte["arquivo"])
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        assert parte["bytes"] == len(dados)
+        assert parte["sha256"] == hashlib.sha256(dados).hexdigest()
+        with open_input(caminho) as f:
+            conteudo = f.read()
+        assert parte["bytes_descomprimidos"] == len(conteudo)
+        conteudos.append(conteudo)
+    return conteudos
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_partes_por_registros(entrada, tmp_path, workers):
+    inteiro = str(tmp_path / "inteiro.csv")
+    processar(entrada, "entrada.csv", LAYOUT, caminho_saida=inteiro)
+
+    manifesto_caminho, _, _ = processar(entrada, "entrada.csv", LAYOUT, workers=workers, tamanho_bloco=16 * 1024,
+                                        caminho_saida=str(tmp_path / "saida.csv"), registros_por_parte=1000)
+    manifesto = _manifesto(manifesto_caminho)
+    assert [p["registros"] for p in manifesto["partes"]] == [1000, 1000, 1000, 1000, 500]
+    assert manifesto["registros"] == REGISTROS
+    assert [p["arquivo"] for p in manifesto["partes"]] == [f"saida-{n:05d}.csv" for n in range(5)]
+
+    conteudos = _conferir_arquivos(manifesto, str(tmp_path))
+    # Juntas, as partes são a saída sem divisão (o cabeçalho só na primeira)
+    with open(inteiro, "rb") as f:
+        assert b"".join(conteudos) == f.read()
+
+
+def test_partes_por_bytes_comprimidas_com_cabecalho(entrada, tmp_path):
+    limite = 32 * 1024
+    manifesto_caminho, _, _ = processar(entrada, "entrada.csv", LAYOUT, caminho_saida=str(tmp_path / "saida.csv.gz"),
+                                        bytes_por_parte=limite, repetir_cabecalho=True)
+    manifesto = _manifesto(manifesto_caminho)
+    assert manifesto["compressao"] == "gzip" and manifesto["cabecalho_repetido"]
+    assert len(manifesto["partes"]) > 1
+    assert manifesto["registros"] == REGISTROS
+
+    conteudos = _conferir_arquivos(manifesto, str(tmp_path))
+    for parte, conteudo in zip(manifesto["partes"], conteudos):
+        assert parte["arquivo"].endswith(".csv.gz")
+        assert conteudo.startswith(b"cpf;nome;obs\n")
+        assert len(conteudo) <= limite
+        # Nenhum registro cortado: as aspas abertas em uma parte fecham nela
+        assert conteudo.count(b'"') % 2 == 0
+
+
+def test_nova_execucao_remove_partes_antigas(entrada, tmp_path):
+    saida = str(tmp_path / "saida.csv")
+    processar(entrada, "entrada.csv", LAYOUT, caminho_saida=saida, registros_por_parte=500)
+    assert os.path.exists(str(tmp_path / "saida-00008.csv"))
+    manifesto_caminho, _, _ = processar(entrada, "entrada.csv", LAYOUT, caminho_saida=saida, registros_por_parte=3000)
+    assert len(_manifesto(manifesto_caminho)["partes"]) == 2
+    assert not os.path.exists(str(tmp_path / "saida-00002.csv"))
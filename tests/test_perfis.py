@@ -0,0 +1,83 @@
+# ============================================================================
+# ARQUIVO: tests/test_perfis.py
+# Perfis de layout: salvar, carregar e aplicar no processar
+# ============================================================================
+
+import json
+import os
+
+import pytest
+
+from features.anonymizer.perfis import (
+    PASTA_PERFIS, carregar_perfil, criar_perfil, layout_do_perfil, listar_perfis, salvar_perfil,
+)
+from features.anonymizer.pipeline import processar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    caminho = tmp_path / "clientes.csv"
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("cpf;nome;nascimento;codigo\n")
+        for i in range(500):
+            cpf = f"{i * 7919 % 10 ** 11:011d}"
+            f.write(f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]};Ana Costa {i};"
+                    f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/1985;X{i:04d}\n")
+    return str(caminho)
+
+
+def _linhas(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_salvar_e_carregar(entrada, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    perfil = criar_perfil(entrada, LAYOUT, manter=[3])
+    caminho = salvar_perfil(perfil, "clientes")
+    assert caminho == os.path.join(str(tmp_path), PASTA_PERFIS, "clientes.json")
+    assert listar_perfis() == ["clientes"]
+
+    carregado = carregar_perfil("clientes")
+    assert carregado == perfil
+    assert layout_do_perfil(carregado) == LAYOUT
+    colunas = {c["nome"]: c for c in carregado["colunas"]}
+    assert colunas["cpf"]["tipo"] == "cpf" and colunas["cpf"]["mascara"]
+    assert colunas["nascimento"]["formato"]
+    assert colunas["codigo"]["manter"]
+
+
+def test_perfil_invalido(tmp_path):
+    caminho = str(tmp_path / "ruim.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"versao": 1, "layout": {"data": {"start_line": 1}}, "colunas": []}, f)
+    with pytest.raises(ValueError):
+        carregar_perfil(caminho)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_processar_com_perfil(entrada, tmp_path, workers):
+    caminho = salvar_perfil(criar_perfil(entrada, LAYOUT, manter=[3]), str(tmp_path / "perfil.json"))
+    perfil = carregar_perfil(caminho)
+    saida = str(tmp_path / "saida.csv")
+    processar(entrada, "clientes.csv", None, workers=workers, tamanho_bloco=4096, perfil=perfil,
+              caminho_saida=saida)
+
+    originais, anonimizadas = _linhas(entrada), _linhas(saida)
+    assert len(anonimizadas) == len(originais)
+    assert anonimizadas[0] == originais[0]
+    for original, nova in zip(originais[1:], anonimizadas[1:]):
+        cpf, nome, nascimento, codigo = original.split(";")
+        cpf_novo, nome_novo, nascimento_novo, codigo_novo = nova.split(";")
+        # Coluna mantida é copiada; as outras mudam mas conservam o formato do perfil
+        assert codigo_novo == codigo
+        assert cpf_novo != cpf and len(cpf_novo) == len(cpf) and cpf_novo[3] == "." and cpf_novo[11] == "-"
+        assert nome_novo != nome
+        assert nascimento_novo != nascimento and nascimento_novo[2] == "/" and nascimento_novo[5] == "/"
+
+    # O mesmo perfil dá a mesma saída em outra execução
+    outra = str(tmp_path / "outra.csv")
+    processar(entrada, "clientes.csv", None, perfil=perfil, caminho_saida=outra)
+    assert _linhas(outra) == anonimizadas
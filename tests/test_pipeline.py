@@ -0,0 +1,165 @@
+# ============================================================================
+# ARQUIVO: tests/test_pipeline.py
+# Saída paralela idêntica à serial, limpeza, erros por execução, encoding completo, checkpoints e retomada
+# ============================================================================
+
+import functools
+import json
+import os
+import random
+import threading
+
+import pytest
+
+from core.file_utils import clear_encoding_cache
+from features.anonymizer import anonymizer_core, pipeline
+from features.anonymizer.anonymizer_core import estatisticas_erros
+from features.anonymizer.checkpoint import SUFIXO_CHECKPOINT, GravadorCheckpoint
+from features.anonymizer.leitura import ProcessamentoCancelado
+from features.anonymizer.pipeline import processar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    """CSV com cabeçalho e campos entre aspas com quebra de linha no meio."""
+    gerador = random.Random(7)
+    caminho = tmp_path / "entrada.csv"
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("cpf;nome;obs;nascimento;valor\n")
+        for i in range(6000):
+            obs = f'"linha 1; de {i}\nlinha 2 ""citada"""' if i % 9 == 0 else f"obs {i}"
+            f.write(f"{gerador.randrange(10 ** 11):011d};José Silva {i};{obs};"
+                    f"{gerador.randint(1, 28):02d}/{gerador.randint(1, 12):02d}/1980;"
+                    f"{gerador.randint(1, 99999) / 100:.2f}\n")
+    return str(caminho)
+
+
+@pytest.mark.parametrize("modo_bytes", [False, True])
+def test_paralelo_igual_ao_serial(entrada, tmp_path, modo_bytes):
+    serial = str(tmp_path / "serial.csv")
+    paralelo = str(tmp_path / "paralelo.csv")
+    processar(entrada, "entrada.csv", LAYOUT, workers=1, modo_bytes=modo_bytes, caminho_saida=serial)
+    # Blocos pequenos: vários blocos por worker, com limites caindo perto dos registros multilinha
+    processar(entrada, "entrada.csv", LAYOUT, workers=2, tamanho_bloco=16 * 1024, modo_bytes=modo_bytes,
+              caminho_saida=paralelo)
+
+    with open(serial, "rb") as f:
+        esperado = f.read()
+    with open(paralelo, "rb") as f:
+        obtido = f.read()
+    assert esperado.count(b"\n") > 6000  # Registros multilinha foram copiados com a quebra
+    assert obtido == esperado
+
+
+def test_erro_nas_estrategias_nao_deixa_parcial(entrada, tmp_path, monkeypatch):
+    def falhar(amostra, cfg):
+        raise RuntimeError("falha ao montar as tabelas")
+
+    monkeypatch.setattr(pipeline, "_definir_estrategias", falhar)
+    with pytest.raises(RuntimeError):
+        processar(entrada, "entrada.csv", LAYOUT, caminho_saida=str(tmp_path / "saida.csv"))
+    assert not any(nome.startswith("saida") for nome in os.listdir(tmp_path))
+
+
+def test_processar_zera_contagem_de_erros(entrada, tmp_path):
+    anonymizer_core._registrar_erro("x", "cpf", ValueError("erro de uma execução anterior"))
+    processar(entrada, "entrada.csv", LAYOUT, caminho_saida=str(tmp_path / "saida.csv"))
+    assert not estatisticas_erros()
+
+
+@pytest.mark.parametrize("encoding_completo", [False, True])
+def test_encoding_completo_com_inicio_ascii(tmp_path, encoding_completo):
+    """Latin-1 só depois da amostra: decodificado apenas com encoding_completo."""
+    clear_encoding_cache()
+    caminho = tmp_path / "latin1.csv"
+    with open(caminho, "w", encoding="latin-1", newline="") as f:
+        f.write("nome;cidade\n")
+        for i in range(2000):
+            f.write(f"Nome {i};Cidade {i}\n")
+        for i in range(20):
+            f.write(f"José da Conceição;São João {i}\n")
+
+    saida = str(tmp_path / "saida.csv")
+    processar(str(caminho), "latin1.csv", LAYOUT, caminho_saida=saida, encoding_completo=encoding_completo)
+    with open(saida, encoding="utf-8") as f:
+        ultimas = "".join(f.read().splitlines()[-20:])
+    assert ("\ufffd" in ultimas) != encoding_completo
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_incremental_com_ultima_linha_sem_quebra(tmp_path, workers):
+    """O último registro sem '\\n' cresce depois: o modo incremental o refaz inteiro."""
+    caminho = tmp_path / "entrada.txt"
+    layout = dict(LAYOUT, separator="|")
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("nome|cpf\n")
+        f.writelines(f"Ana {i}|123.456.789-{i % 100:02d}\n" for i in range(3000))
+        f.write("Bruno Lima|987.654.321-00")
+
+    incremental = str(tmp_path / "incremental.txt")
+    opcoes = {"workers": workers, "tamanho_bloco": 8 * 1024, "caminho_saida": incremental}
+    processar(str(caminho), "entrada.txt", layout, checkpoint=True, **opcoes)
+    with open(caminho, "a", encoding="utf-8", newline="") as f:
+        f.write("99\nCarla Souza|111.222.333-44\n")
+    processar(str(caminho), "entrada.txt", layout, incremental=True, **opcoes)
+
+    completo = str(tmp_path / "completo.txt")
+    processar(str(caminho), "entrada.txt", layout, workers=workers, caminho_saida=completo)
+    with open(incremental, "rb") as f, open(completo, "rb") as g:
+        assert f.read() == g.read()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_retomada_depois_de_interrupcao(entrada, tmp_path, monkeypatch, workers):
+    """Cancelada no meio, a execução com checkpoint continua do '.ckpt' e chega à saída completa."""
+    # Trechos pequenos e checkpoint a cada trecho: vários pontos de retomada num arquivo de teste
+    monkeypatch.setattr(pipeline, "TAMANHO_LEITURA_SERIAL", 16 * 1024)
+    monkeypatch.setattr(pipeline, "GravadorCheckpoint", functools.partial(GravadorCheckpoint, intervalo=0))
+    saida = str(tmp_path / "saida.csv")
+    opcoes = {"workers": workers, "tamanho_bloco": 16 * 1024, "caminho_saida": saida, "checkpoint": True}
+    tamanho = os.path.getsize(entrada)
+
+    cancelar = threading.Event()
+
+    def progresso(evento):
+        if evento["bytes_lidos"] > tamanho // 2:
+            cancelar.set()
+
+    with pytest.raises(ProcessamentoCancelado):
+        processar(entrada, "entrada.csv", LAYOUT, progresso=progresso, cancelar=cancelar, **opcoes)
+    assert not os.path.exists(saida)
+    assert os.path.exists(saida + pipeline.SUFIXO_PARCIAL)
+    with open(saida + SUFIXO_CHECKPOINT, encoding="utf-8") as f:
+        assert 0 < json.load(f)["bytes_entrada"] < tamanho
+
+    retomados = []
+    processar(entrada, "entrada.csv", LAYOUT, progresso=lambda evento: retomados.append(evento["bytes_lidos"]),
+              **opcoes)
+    assert min(retomados) > tamanho // 2
+    assert not os.path.exists(saida + pipeline.SUFIXO_PARCIAL)
+
+    completo = str(tmp_path / "completo.csv")
+    processar(entrada, "entrada.csv", LAYOUT, workers=workers, caminho_saida=completo)
+    with open(saida, "rb") as f, open(completo, "rb") as g:
+        assert f.read() == g.read()
+
+
+def test_paralelo_com_linhas_antes_do_cabecalho(tmp_path):
+    """Região inicial tratada no processo principal; comparação e contagem iguais às do serial."""
+    caminho = tmp_path / "relatorio.txt"
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write("RELATORIO DE CLIENTES\ngerado em 01/02/2024\nnome|cpf|cidade\n")
+        f.writelines(f"Cliente {i}|{i:03d}.111.222-{i % 100:02d}|Cidade {i % 7}\n" for i in range(4000))
+    layout = {"header": {"start_line": 2, "end_line": 2}, "data": {"start_line": 3}, "separator": "|"}
+
+    resultados = []
+    for workers in (1, 3):
+        saida = str(tmp_path / f"saida_{workers}.txt")
+        _, comparacao, estatisticas = processar(str(caminho), "relatorio.txt", layout, workers=workers,
+                                                tamanho_bloco=8 * 1024, caminho_saida=saida)
+        with open(saida, "rb") as f:
+            resultados.append((f.read(), comparacao, estatisticas.linhas))
+    assert resultados[0] == resultados[1]
+    assert resultados[0][0].startswith(b"nome|cpf|cidade\n")
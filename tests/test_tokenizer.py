@@ -0,0 +1,41 @@
+# ============================================================================
+# ARQUIVO: tests/test_tokenizer.py
+# Separação de campos com aspas de um ou mais caracteres e colunas de largura fixa
+# ============================================================================
+
+import pytest
+
+from core.tokenizer import infer_fixed_spans, is_complete, join_record, split_fixed, split_record
+
+
+@pytest.mark.parametrize("aspas", ['"', "~~"])
+@pytest.mark.parametrize("converter", [str, lambda t: t.encode("utf-8")])
+def test_aspas_de_um_ou_mais_caracteres(aspas, converter):
+    q = aspas
+    texto = converter(f"{q}a|b{q}|c|{q}x{q}{q}y{q}|{q}{q}")
+    campos, marcas = split_record(texto, converter("|"), converter(q))
+    assert campos == [converter(v) for v in ("a|b", "c", f"x{q}y", "")]
+    assert marcas == [True, False, True, True]
+    assert join_record(campos, converter("|"), marcas, converter(q)) == texto
+
+
+@pytest.mark.parametrize("aspas", ['"', "~~"])
+def test_registro_com_aspas_abertas(aspas):
+    assert not is_complete(f"1|{aspas}linha 1", "|", aspas)
+    assert is_complete(f"1|{aspas}linha 1\nlinha 2{aspas}", "|", aspas)
+
+
+def test_largura_fixa_nao_corta_nome_com_espaco_na_mesma_posicao():
+    # Todos os nomes com o espaço interno na coluna 16
+    linhas = [f"{cpf}  {nome:<12}  {valor:>8}" for cpf, nome, valor in (
+        ("12345678901", "Ana Maria", "10.00"),
+        ("23456789012", "Eva Costa", "200.50"),
+        ("34567890123", "Rui Souza", "3.75"),
+    )]
+    larguras = infer_fixed_spans(linhas)
+    assert larguras == [(0, 13), (13, 16), (29, 6)]
+    assert [campo.strip() for campo in split_fixed(linhas[0], larguras)] == ["12345678901", "Ana Maria", "10.00"]
+
+    # Um espaço só não separa colunas; com min_gap=1 volta o comportamento antigo
+    assert infer_fixed_spans(["ab cd", "ef gh"]) == [(0, 5)]
+    assert infer_fixed_spans(["ab cd", "ef gh"], min_gap=1) == [(0, 3), (3, 2)]
@@ -0,0 +1,71 @@
+# ============================================================================
+# ARQUIVO: tests/test_validador.py
+# CPF/CNPJ: dígitos verificadores conferidos no original e no gerador, não na saída anonimizada
+# ============================================================================
+
+import random
+
+import pytest
+
+from benchmarks.gerador import gerar_arquivo
+from features.anonymizer.pipeline import layout_saida, processar
+from features.validator.validador import validar
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+
+
+def _cpf_valido(gerador):
+    digitos = [gerador.randrange(10) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    """Original com CPFs válidos e a saída do anonimizador para ele."""
+    gerador = random.Random(3)
+    original = tmp_path / "original.csv"
+    with open(original, "w", encoding="utf-8", newline="") as f:
+        f.write("cpf;nome\n")
+        for i in range(500):
+            f.write(f"{_cpf_valido(gerador)};Maria Souza {i}\n")
+    anonimizado = str(tmp_path / "anonimizado.csv")
+    processar(str(original), "original.csv", LAYOUT, caminho_saida=anonimizado)
+    return str(original), anonimizado
+
+
+def _problemas_cpf(relatorio):
+    return sum(q for (verificacao, _), q in relatorio.problemas.items() if verificacao == "cpf")
+
+
+def test_original_valido(arquivos):
+    original, _ = arquivos
+    relatorio = validar(original, LAYOUT)
+    assert relatorio.tipos[0] == "cpf"
+    assert relatorio.ok
+
+
+def test_saida_anonimizada_nao_confere_digitos(arquivos):
+    original, anonimizado = arquivos
+    relatorio = validar(anonimizado, layout_saida(LAYOUT), original=original, layout_original=LAYOUT)
+    assert relatorio.anonimizado
+    assert relatorio.ok
+    assert _problemas_cpf(validar(anonimizado, layout_saida(LAYOUT), anonimizado=True)) == 0
+
+
+def test_anonimizado_false_confere_digitos(arquivos):
+    original, anonimizado = arquivos
+    relatorio = validar(anonimizado, layout_saida(LAYOUT), original=original, layout_original=LAYOUT,
+                        anonimizado=False)
+    assert _problemas_cpf(relatorio) > 0
+
+
+def test_arquivo_do_gerador_valido(tmp_path):
+    caminho = str(tmp_path / "gerado.txt")
+    gerar_arquivo(caminho, 2000)
+    layout = dict(LAYOUT, separator="|")
+    relatorio = validar(caminho, layout)
+    assert {relatorio.tipos[1], relatorio.tipos[7]} == {"cpf", "cnpj"}
+    assert relatorio.ok
@@ -0,0 +1,34 @@
+# ============================================================================
+# ARQUIVO: tests/test_visualizacao.py
+# Comparação lado a lado lida com os encodings de entrada e saída da execução
+# ============================================================================
+
+import pytest
+
+from features.anonymizer.pipeline import processar
+from features.anonymizer.visualizacao import LeitorComparacao
+
+LAYOUT = {"header": {"start_line": 0, "end_line": 0}, "data": {"start_line": 1}, "separator": ";"}
+
+
+@pytest.mark.parametrize("modo_bytes, manter_encoding", [(False, False), (True, False), (True, True)])
+def test_comparacao_no_encoding_da_saida(tmp_path, modo_bytes, manter_encoding):
+    entrada = tmp_path / "latin1.csv"
+    with open(entrada, "w", encoding="latin-1", newline="") as f:
+        f.write("nome;cidade;código\n")
+        f.writelines(f"Conceição {i};São João;ação {i}\n" for i in range(3000))
+    saida = str(tmp_path / "saida.csv")
+    _, _, estatisticas = processar(str(entrada), "latin1.csv", LAYOUT, modo_bytes=modo_bytes,
+                                   manter_encoding=manter_encoding, caminho_saida=saida)
+    assert estatisticas.encoding_saida == (estatisticas.encoding if manter_encoding else "utf-8")
+    assert estatisticas.como_dict()["encoding_saida"] == estatisticas.encoding_saida
+
+    leitor = LeitorComparacao(str(entrada), saida, LAYOUT, estatisticas.encoding, estatisticas.encoding_saida)
+    try:
+        pares = leitor.pares(2500, 10)
+    finally:
+        leitor.fechar()
+    assert len(pares) == 10
+    for _, original, _, anonimizado in pares:
+        assert original.startswith("Conceição 25")
+        assert "�" not in anonimizado and anonimizado.count(";") == 2